@@ -23,6 +23,8 @@ class PFTauDiscriminantManager {
       typedef std::map<std::string, Discriminant* const> discriminantHolder;
       /// add a discriminant 
       void addDiscriminant(Discriminant* const aDiscriminant);
+      /// add the discriminants named in [inputs] (all of them if [inputs] is empty), returns the number added.  Throws if a name in [inputs] is not in [discriminants]
+      size_t addDiscriminants(const std::vector<Discriminant*>& discriminants, const std::vector<std::string>& inputs);
       /// add a set of branches ot the TTree 
       bool branchTree(TTree* const treeToBranch, bool addTargetBranch = false, bool addWeightBranch = false);
       /// connect to an MVA computer
@@ -5,9 +5,16 @@
  *
  * Author: Evan K. Friis (UC Davis)
  *
+ * Optional slimming: if [jets] is given, only the candidates within
+ * [maxDeltaR] of one of the jets are kept (and their tracks and muons).  The
+ * number of objects and the approximate number of bytes saved are reported at
+ * the end of the job.
+ *
  */
 
 
+#include <iostream>
+
 #include "FWCore/Framework/interface/Frameworkfwd.h"
 #include "FWCore/Framework/interface/Event.h"
 #include "FWCore/Framework/interface/EventSetup.h"
@@ -15,6 +22,9 @@
 #include "FWCore/Framework/interface/EDProducer.h"
 
 #include "DataFormats/Common/interface/OrphanHandle.h"
+#include "DataFormats/Common/interface/View.h"
+#include "DataFormats/Candidate/interface/Candidate.h"
+#include "DataFormats/Math/interface/deltaR.h"
 
 #include "DataFormats/ParticleFlowCandidate/interface/PFCandidate.h"
 #include "DataFormats/ParticleFlowCandidate/interface/PFCandidateFwd.h"
@@ -33,18 +43,31 @@ class PFCandidateCollectionCopier : public edm::EDProducer {
     PFCandidateCollectionCopier(const edm::ParameterSet& pset);
     virtual ~PFCandidateCollectionCopier(){}
     void produce(edm::Event& evt, const edm::EventSetup& es);
+    void endJob();
   private:
+    bool nearJet(const reco::PFCandidate& cand,
+                 const edm::View<reco::Candidate>& jets) const;
     edm::InputTag src_;
-    // Mapping between old and new refs
-    std::map<reco::TrackRef, size_t> trackMap_;
-    std::map<reco::GsfTrackRef, size_t> gsfTrackMap_;
-    std::map<reco::MuonRef, size_t> muonMap_;
+    // Index of the new track/gsf track/muon of each output candidate (-1 if
+    // it has none)
+    std::vector<int> trackIndex_;
+    std::vector<int> gsfTrackIndex_;
+    std::vector<int> muonIndex_;
 
     std::auto_ptr<StringCutObjectSelector<reco::PFCandidate> > cut_;
 
     bool embedTracks_;
     bool embedGsfTracks_;
     bool embedMuons_;
+
+    // Slimming
+    edm::InputTag jetSrc_;
+    double maxDeltaR_;
+    // Total number of [all, kept] objects of each type
+    size_t candidates_[2];
+    size_t tracks_[2];
+    size_t gsfTracks_[2];
+    size_t muons_[2];
 };
 
 PFCandidateCollectionCopier::PFCandidateCollectionCopier(const edm::ParameterSet& pset) {
@@ -60,6 +83,17 @@ PFCandidateCollectionCopier::PFCandidateCollectionCopier(const edm::ParameterSet
     cut_.reset(new StringCutObjectSelector<reco::PFCandidate>(cut));
   }
 
+  if (pset.exists("jets")) {
+    jetSrc_ = pset.getParameter<edm::InputTag>("jets");
+    maxDeltaR_ = pset.getParameter<double>("maxDeltaR");
+  }
+  for (size_t i = 0; i < 2; ++i) {
+    candidates_[i] = 0;
+    tracks_[i] = 0;
+    gsfTracks_[i] = 0;
+    muons_[i] = 0;
+  }
+
   if (embedTracks_) produces<reco::TrackCollection>("tracks");
   if (embedGsfTracks_) produces<reco::GsfTrackCollection>("gsfTracks");
   if (embedMuons_) produces<reco::MuonCollection>("muons");
@@ -67,13 +101,23 @@ PFCandidateCollectionCopier::PFCandidateCollectionCopier(const edm::ParameterSet
   produces<reco::PFCandidateCollection>();
 }
 
+bool PFCandidateCollectionCopier::nearJet(
+    const reco::PFCandidate& cand,
+    const edm::View<reco::Candidate>& jets) const {
+  for (size_t i = 0; i < jets.size(); ++i) {
+    if (deltaR(cand, jets[i]) < maxDeltaR_)
+      return true;
+  }
+  return false;
+}
+
 void PFCandidateCollectionCopier::produce(edm::Event& evt,
     const edm::EventSetup& es) {
 
-  // Clear the maps
-  trackMap_.clear();
-  gsfTrackMap_.clear();
-  muonMap_.clear();
+  // Clear the index vectors
+  trackIndex_.clear();
+  gsfTrackIndex_.clear();
+  muonIndex_.clear();
 
   // Create output collection
   std::auto_ptr<reco::PFCandidateCollection> output(
@@ -88,14 +132,27 @@ void PFCandidateCollectionCopier::produce(edm::Event& evt,
   edm::Handle<reco::PFCandidateCollection> particleFlow;
   evt.getByLabel(src_, particleFlow);
 
+  edm::Handle<edm::View<reco::Candidate> > jets;
+  bool slim = (jetSrc_.label() != "");
+  if (slim)
+    evt.getByLabel(jetSrc_, jets);
+
   // If we aren't cutting, we know how big the collection will be a priori
-  if (!cut_.get())
+  if (!cut_.get() && !slim)
     output->reserve(particleFlow->size());
 
   // First loop over all the PFCandidates and get the associated tracks
   for(size_t i = 0; i < particleFlow->size(); ++i) {
     reco::PFCandidateRef pfCand(particleFlow, i);
 
+    bool hasTrack = pfCand->trackRef().isNonnull();
+    bool hasGsfTrack = pfCand->gsfTrackRef().isNonnull();
+    bool hasMuon = pfCand->muonRef().isNonnull();
+    candidates_[0]++;
+    tracks_[0] += (embedTracks_ && hasTrack);
+    gsfTracks_[0] += (embedGsfTracks_ && hasGsfTrack);
+    muons_[0] += (embedMuons_ && hasMuon);
+
     // Check if we are applying selections to the PFCandidates
     if (cut_.get()) {
       // Skip if it doesn't pass our cut.
@@ -104,28 +161,39 @@ void PFCandidateCollectionCopier::produce(edm::Event& evt,
       }
     }
 
+    // Skip candidates away from all the jets
+    if (slim && !nearJet(*pfCand, *jets))
+      continue;
+
     // Add a copy to our output collection (w/ a source ptr to the original)
     output->push_back(reco::PFCandidate(refToPtr(pfCand)));
+    candidates_[1]++;
 
     // Check if it has a trackRef
-    if (embedTracks_ && pfCand->trackRef().isNonnull()) {
+    trackIndex_.push_back(-1);
+    if (embedTracks_ && hasTrack) {
       tracks->push_back(*pfCand->trackRef());
       // The last index in the new track collection corresponds to current ref
-      trackMap_[pfCand->trackRef()] = tracks->size()-1;
+      trackIndex_.back() = tracks->size()-1;
     }
 
     // Check if it has a GSF track ref
-    if (embedGsfTracks_ && pfCand->gsfTrackRef().isNonnull()) {
+    gsfTrackIndex_.push_back(-1);
+    if (embedGsfTracks_ && hasGsfTrack) {
       gsfTracks->push_back(*pfCand->gsfTrackRef());
       // The last index in the new track collection corresponds to current ref
-      gsfTrackMap_[pfCand->gsfTrackRef()] = gsfTracks->size()-1;
+      gsfTrackIndex_.back() = gsfTracks->size()-1;
     }
 
-    if (embedMuons_ && pfCand->muonRef().isNonnull()) {
+    muonIndex_.push_back(-1);
+    if (embedMuons_ && hasMuon) {
       muons->push_back(*pfCand->muonRef());
-      muonMap_[pfCand->muonRef()] = muons->size()-1;
+      muonIndex_.back() = muons->size()-1;
     }
   }
+  tracks_[1] += tracks->size();
+  gsfTracks_[1] += gsfTracks->size();
+  muons_[1] += muons->size();
 
 
   // Update the different types of refs of our output
@@ -136,10 +204,9 @@ void PFCandidateCollectionCopier::produce(edm::Event& evt,
 
     for (size_t i = 0; i < output->size(); ++i) {
       reco::PFCandidate& cand = output->at(i);
-      if (cand.trackRef().isNonnull()) {
-        // Find the index in the owned collection
-        size_t newCollectionIndex = trackMap_[cand.trackRef()];
-        reco::TrackRef newRef(tracksPut, newCollectionIndex);
+      if (trackIndex_[i] >= 0) {
+        // The index in the owned collection
+        reco::TrackRef newRef(tracksPut, trackIndex_[i]);
         // Update the output candidate
         cand.setTrackRef(newRef);
       }
@@ -153,10 +220,9 @@ void PFCandidateCollectionCopier::produce(edm::Event& evt,
 
     for (size_t i = 0; i < output->size(); ++i) {
       reco::PFCandidate& cand = output->at(i);
-      if (cand.gsfTrackRef().isNonnull()) {
-        // Find the index in the owned collection
-        size_t newCollectionIndex = gsfTrackMap_[cand.gsfTrackRef()];
-        reco::GsfTrackRef newRef(gsfTracksPut, newCollectionIndex);
+      if (gsfTrackIndex_[i] >= 0) {
+        // The index in the owned collection
+        reco::GsfTrackRef newRef(gsfTracksPut, gsfTrackIndex_[i]);
         // Update the output candidate
         cand.setGsfTrackRef(newRef);
       }
@@ -170,9 +236,9 @@ void PFCandidateCollectionCopier::produce(edm::Event& evt,
     // track.  We have to do this before we put them in the event.
     if (embedTracks_) {
       for (size_t i = 0; i < output->size(); ++i) {
-        if (output->at(i).muonRef().isNonnull()) {
+        if (muonIndex_[i] >= 0) {
           // Get our local copy of the muon
-          reco::Muon& muon = muons->at(muonMap_[output->at(i).muonRef()]);
+          reco::Muon& muon = muons->at(muonIndex_[i]);
           muon.setTrack(output->at(i).trackRef());
         }
       }
@@ -184,10 +250,9 @@ void PFCandidateCollectionCopier::produce(edm::Event& evt,
 
     for (size_t i = 0; i < output->size(); ++i) {
       reco::PFCandidate& cand = output->at(i);
-      if (cand.muonRef().isNonnull()) {
-        // Find the index in the owned collection
-        size_t newCollectionIndex = muonMap_[cand.muonRef()];
-        reco::MuonRef newRef(muonsPut, newCollectionIndex);
+      if (muonIndex_[i] >= 0) {
+        // The index in the owned collection
+        reco::MuonRef newRef(muonsPut, muonIndex_[i]);
         // Update the output candidate
         cand.setMuonRef(newRef);
       }
@@ -197,5 +262,22 @@ void PFCandidateCollectionCopier::produce(edm::Event& evt,
   evt.put(output);
 }
 
+void PFCandidateCollectionCopier::endJob() {
+  // Approximate, the objects also own some variable size data
+  size_t bytesSaved =
+    (candidates_[0] - candidates_[1])*sizeof(reco::PFCandidate) +
+    (tracks_[0] - tracks_[1])*sizeof(reco::Track) +
+    (gsfTracks_[0] - gsfTracks_[1])*sizeof(reco::GsfTrack) +
+    (muons_[0] - muons_[1])*sizeof(reco::Muon);
+  std::cout << "PFCandidateCollectionCopier " << src_ << " summary:"
+    << std::endl;
+  std::cout << " Kept " << candidates_[1] << " of " << candidates_[0]
+    << " PFCandidates, " << tracks_[1] << " of " << tracks_[0] << " tracks, "
+    << gsfTracks_[1] << " of " << gsfTracks_[0] << " GSF tracks and "
+    << muons_[1] << " of " << muons_[0] << " muons." << std::endl;
+  std::cout << " Saved about " << bytesSaved/1024 << " kB (uncompressed)."
+    << std::endl;
+}
+
 #include "FWCore/Framework/interface/MakerMacros.h"
 DEFINE_FWK_MODULE(PFCandidateCollectionCopier);
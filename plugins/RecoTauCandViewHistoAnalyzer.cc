@@ -0,0 +1,215 @@
+/*
+ * RecoTauCandViewHistoAnalyzer
+ *
+ * Drop in replacement for CandViewHistoAnalyzer, with the same src and
+ * histograms parameters.  The quantities used in the common jet and tau plot
+ * sets (see RecoTauCommonJetSelections_cfi) are computed directly from the
+ * jet/tau accessors instead of evaluating the string expression for each
+ * candidate.  Any other plotquantity is evaluated as a string expression, as
+ * in CandViewHistoAnalyzer.
+ *
+ * The recognized quantities are (spaces are ignored):
+ *
+ *  pt(), eta(), phi(), mass()
+ *  jetRef().X(), alternatLorentzVect().X() for X in the above (taus)
+ *  X()-alternatLorentzVect().X() for X in pt, eta, mass (taus)
+ *  deltaPhi(phi(),alternatLorentzVect().phi()) (taus)
+ *  decayMode, decayMode() (taus)
+ *  decayMode()-bremsRecoveryEOverPLead() (taus)
+ *  pt()*sqrt(etaetaMoment()) (jets)
+ */
+
+#include <cmath>
+#include <map>
+#include <string>
+#include <vector>
+#include <boost/foreach.hpp>
+#include <boost/shared_ptr.hpp>
+
+#include "FWCore/Framework/interface/EDAnalyzer.h"
+#include "FWCore/Framework/interface/Event.h"
+#include "FWCore/ParameterSet/interface/ParameterSet.h"
+#include "FWCore/ServiceRegistry/interface/Service.h"
+#include "FWCore/Utilities/interface/Exception.h"
+#include "FWCore/Utilities/interface/InputTag.h"
+#include "CommonTools/UtilAlgos/interface/TFileService.h"
+#include "CommonTools/Utils/interface/StringObjectFunction.h"
+
+#include "DataFormats/Candidate/interface/Candidate.h"
+#include "DataFormats/Common/interface/View.h"
+#include "DataFormats/JetReco/interface/Jet.h"
+#include "DataFormats/TauReco/interface/PFTau.h"
+#include "DataFormats/Math/interface/deltaPhi.h"
+
+#include <TH1F.h>
+
+namespace {
+
+// The candidate, cast once to the types needed by the native quantities
+struct CandidateTypes {
+  explicit CandidateTypes(const reco::Candidate& cand)
+    :cand(cand),
+     jet(dynamic_cast<const reco::Jet*>(&cand)),
+     tau(dynamic_cast<const reco::PFTau*>(&cand)) {}
+  const reco::Candidate& cand;
+  const reco::Jet* jet;
+  const reco::PFTau* tau;
+};
+
+typedef double (*NativeQuantity)(const CandidateTypes&);
+
+const reco::Jet& asJet(const CandidateTypes& cand) {
+  if (!cand.jet)
+    throw cms::Exception("WrongType") << "This plot requires jets";
+  return *cand.jet;
+}
+
+const reco::PFTau& asTau(const CandidateTypes& cand) {
+  if (!cand.tau)
+    throw cms::Exception("WrongType") << "This plot requires PFTaus";
+  return *cand.tau;
+}
+
+double pt(const CandidateTypes& c) { return c.cand.pt(); }
+double eta(const CandidateTypes& c) { return c.cand.eta(); }
+double phi(const CandidateTypes& c) { return c.cand.phi(); }
+double mass(const CandidateTypes& c) { return c.cand.mass(); }
+
+double jetPt(const CandidateTypes& c) { return asTau(c).jetRef()->pt(); }
+double jetEta(const CandidateTypes& c) { return asTau(c).jetRef()->eta(); }
+double jetPhi(const CandidateTypes& c) { return asTau(c).jetRef()->phi(); }
+double jetMass(const CandidateTypes& c) { return asTau(c).jetRef()->mass(); }
+
+double matchedPt(const CandidateTypes& c) {
+  return asTau(c).alternatLorentzVect().Pt();
+}
+double matchedEta(const CandidateTypes& c) {
+  return asTau(c).alternatLorentzVect().Eta();
+}
+double matchedPhi(const CandidateTypes& c) {
+  return asTau(c).alternatLorentzVect().Phi();
+}
+double matchedMass(const CandidateTypes& c) {
+  return asTau(c).alternatLorentzVect().M();
+}
+
+double ptRes(const CandidateTypes& c) { return pt(c) - matchedPt(c); }
+double etaRes(const CandidateTypes& c) { return eta(c) - matchedEta(c); }
+double phiRes(const CandidateTypes& c) {
+  return reco::deltaPhi(phi(c), matchedPhi(c));
+}
+double massRes(const CandidateTypes& c) { return mass(c) - matchedMass(c); }
+
+double decayMode(const CandidateTypes& c) { return asTau(c).decayMode(); }
+// The truth matched taus store the true decay mode in this field
+double decayModeRes(const CandidateTypes& c) {
+  return asTau(c).decayMode() - asTau(c).bremsRecoveryEOverPLead();
+}
+
+double collimation(const CandidateTypes& c) {
+  return asJet(c).pt()*std::sqrt(asJet(c).etaetaMoment());
+}
+
+typedef std::map<std::string, NativeQuantity> NativeQuantityMap;
+
+NativeQuantityMap nativeQuantities() {
+  NativeQuantityMap output;
+  output["pt()"] = &pt;
+  output["eta()"] = &eta;
+  output["phi()"] = &phi;
+  output["mass()"] = &mass;
+  output["jetRef().pt()"] = &jetPt;
+  output["jetRef().eta()"] = &jetEta;
+  output["jetRef().phi()"] = &jetPhi;
+  output["jetRef().mass()"] = &jetMass;
+  output["alternatLorentzVect().pt()"] = &matchedPt;
+  output["alternatLorentzVect().eta()"] = &matchedEta;
+  output["alternatLorentzVect().phi()"] = &matchedPhi;
+  output["alternatLorentzVect().mass()"] = &matchedMass;
+  output["pt()-alternatLorentzVect().pt()"] = &ptRes;
+  output["eta()-alternatLorentzVect().eta()"] = &etaRes;
+  output["deltaPhi(phi(),alternatLorentzVect().phi())"] = &phiRes;
+  output["mass()-alternatLorentzVect().mass()"] = &massRes;
+  output["decayMode"] = &decayMode;
+  output["decayMode()"] = &decayMode;
+  output["decayMode()-bremsRecoveryEOverPLead()"] = &decayModeRes;
+  output["pt()*sqrt(etaetaMoment())"] = &collimation;
+  return output;
+}
+
+std::string removeSpaces(const std::string& input) {
+  std::string output;
+  BOOST_FOREACH(char c, input) {
+    if (c != ' ' && c != '\t')
+      output += c;
+  }
+  return output;
+}
+
+}
+
+class RecoTauCandViewHistoAnalyzer : public edm::EDAnalyzer {
+  public:
+    explicit RecoTauCandViewHistoAnalyzer(const edm::ParameterSet& pset);
+    virtual ~RecoTauCandViewHistoAnalyzer() {}
+    virtual void analyze(const edm::Event& evt, const edm::EventSetup& es);
+  private:
+    typedef StringObjectFunction<reco::Candidate> StringQuantity;
+    struct Plot {
+      TH1* histo;
+      // Exactly one of these is set
+      NativeQuantity native;
+      boost::shared_ptr<StringQuantity> expression;
+    };
+    edm::InputTag src_;
+    std::vector<Plot> plots_;
+};
+
+RecoTauCandViewHistoAnalyzer::RecoTauCandViewHistoAnalyzer(
+    const edm::ParameterSet& pset) {
+  src_ = pset.getParameter<edm::InputTag>("src");
+  edm::Service<TFileService> fs;
+  NativeQuantityMap natives = nativeQuantities();
+  typedef std::vector<edm::ParameterSet> VPSet;
+  BOOST_FOREACH(const edm::ParameterSet& histogram,
+                pset.getParameter<VPSet>("histograms")) {
+    std::string name = histogram.getUntrackedParameter<std::string>("name");
+    std::string description =
+      histogram.getUntrackedParameter<std::string>("description", name);
+    std::string quantity =
+      histogram.getUntrackedParameter<std::string>("plotquantity");
+    Plot plot;
+    plot.histo = fs->make<TH1F>(name.c_str(), description.c_str(),
+        histogram.getUntrackedParameter<int>("nbins"),
+        histogram.getUntrackedParameter<double>("min"),
+        histogram.getUntrackedParameter<double>("max"));
+    NativeQuantityMap::const_iterator native =
+      natives.find(removeSpaces(quantity));
+    if (native != natives.end()) {
+      plot.native = native->second;
+    } else {
+      plot.native = NULL;
+      plot.expression.reset(new StringQuantity(quantity,
+            histogram.getUntrackedParameter<bool>("lazyParsing", false)));
+    }
+    plots_.push_back(plot);
+  }
+}
+
+void RecoTauCandViewHistoAnalyzer::analyze(const edm::Event& evt,
+                                           const edm::EventSetup& es) {
+  edm::Handle<edm::View<reco::Candidate> > cands;
+  evt.getByLabel(src_, cands);
+  for (size_t i = 0; i < cands->size(); ++i) {
+    CandidateTypes cand(cands->at(i));
+    BOOST_FOREACH(const Plot& plot, plots_) {
+      if (plot.native)
+        plot.histo->Fill(plot.native(cand));
+      else
+        plot.histo->Fill((*plot.expression)(cand.cand));
+    }
+  }
+}
+
+#include "FWCore/Framework/interface/MakerMacros.h"
+DEFINE_FWK_MODULE(RecoTauCandViewHistoAnalyzer);
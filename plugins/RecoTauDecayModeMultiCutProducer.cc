@@ -0,0 +1,186 @@
+/*
+ * RecoTauDecayModeMultiCutProducer
+ *
+ * Apply several sets of decay mode dependent cuts (i.e. the TaNC working
+ * points) to a discriminator in a single loop over the taus.  This does the
+ * same thing as one RecoTauDecayModeCutMultiplexer for each working point,
+ * but the taus, the prediscriminants and the input discriminator are only
+ * read once.
+ *
+ * Takes as input:
+ *
+ * PFTauProducer : the taus
+ *
+ * toMultiplex : the discriminator to cut on
+ *
+ * Prediscriminants : the usual discriminator requirements, taus failing them
+ * get 0 for all the working points.
+ *
+ * decayModes : VPSet with nCharged, nPiZeros and a PSet [cuts] mapping each
+ * working point name to the cut for that decay mode.  Taus with a decay mode
+ * that is not listed fail all the working points.
+ *
+ * Produces one PFTauDiscriminator for each working point, with the working
+ * point name as the instance label.
+ */
+
+#include <algorithm>
+#include <map>
+#include <string>
+#include <vector>
+#include <boost/foreach.hpp>
+
+#include "FWCore/Framework/interface/EDProducer.h"
+#include "FWCore/Framework/interface/Event.h"
+#include "FWCore/ParameterSet/interface/ParameterSet.h"
+#include "FWCore/Utilities/interface/Exception.h"
+#include "DataFormats/TauReco/interface/PFTau.h"
+#include "DataFormats/TauReco/interface/PFTauFwd.h"
+#include "DataFormats/TauReco/interface/PFTauDiscriminator.h"
+
+class RecoTauDecayModeMultiCutProducer : public edm::EDProducer {
+  public:
+    explicit RecoTauDecayModeMultiCutProducer(const edm::ParameterSet& pset);
+    virtual ~RecoTauDecayModeMultiCutProducer() {}
+    virtual void produce(edm::Event& evt, const edm::EventSetup& es);
+  private:
+    typedef std::pair<unsigned int, unsigned int> DecayMode;
+    // Cut for each working point
+    typedef std::vector<double> Cuts;
+    typedef std::map<DecayMode, Cuts> CutMap;
+    struct Prediscriminant {
+      edm::InputTag src;
+      double cut;
+    };
+    bool passesPrediscriminants(
+        const std::vector<edm::Handle<reco::PFTauDiscriminator> >& handles,
+        const reco::PFTauRef& tau) const;
+    edm::InputTag tauSrc_;
+    edm::InputTag toMultiplex_;
+    bool andPrediscriminants_;
+    std::vector<Prediscriminant> prediscriminants_;
+    std::vector<std::string> workingPoints_;
+    CutMap cuts_;
+};
+
+RecoTauDecayModeMultiCutProducer::RecoTauDecayModeMultiCutProducer(
+    const edm::ParameterSet& pset) {
+  tauSrc_ = pset.getParameter<edm::InputTag>("PFTauProducer");
+  toMultiplex_ = pset.getParameter<edm::InputTag>("toMultiplex");
+
+  const edm::ParameterSet& prediscriminants =
+    pset.getParameter<edm::ParameterSet>("Prediscriminants");
+  std::string booleanOperator =
+    prediscriminants.getParameter<std::string>("BooleanOperator");
+  if (booleanOperator != "and" && booleanOperator != "or") {
+    throw cms::Exception("BadBooleanOperator")
+      << "Prediscriminants BooleanOperator must be 'and' or 'or', not "
+      << booleanOperator << std::endl;
+  }
+  andPrediscriminants_ = (booleanOperator == "and");
+  BOOST_FOREACH(const std::string& name,
+      prediscriminants.getParameterNamesForType<edm::ParameterSet>()) {
+    const edm::ParameterSet& requirement =
+      prediscriminants.getParameter<edm::ParameterSet>(name);
+    Prediscriminant prediscriminant;
+    prediscriminant.src = requirement.getParameter<edm::InputTag>("Producer");
+    prediscriminant.cut = requirement.getParameter<double>("cut");
+    prediscriminants_.push_back(prediscriminant);
+  }
+
+  // The working points are the union of the ones defined for each decay mode
+  typedef std::vector<edm::ParameterSet> VPSet;
+  const VPSet& decayModes = pset.getParameter<VPSet>("decayModes");
+  BOOST_FOREACH(const edm::ParameterSet& decayMode, decayModes) {
+    BOOST_FOREACH(const std::string& workingPoint,
+        decayMode.getParameter<edm::ParameterSet>("cuts").
+        getParameterNamesForType<double>()) {
+      if (std::find(workingPoints_.begin(), workingPoints_.end(),
+                    workingPoint) == workingPoints_.end())
+        workingPoints_.push_back(workingPoint);
+    }
+  }
+  BOOST_FOREACH(const edm::ParameterSet& decayMode, decayModes) {
+    DecayMode key(decayMode.getParameter<uint32_t>("nCharged"),
+                  decayMode.getParameter<uint32_t>("nPiZeros"));
+    const edm::ParameterSet& cuts =
+      decayMode.getParameter<edm::ParameterSet>("cuts");
+    Cuts& decayModeCuts = cuts_[key];
+    BOOST_FOREACH(const std::string& workingPoint, workingPoints_) {
+      if (!cuts.existsAs<double>(workingPoint)) {
+        throw cms::Exception("MissingCut")
+          << "No cut for working point " << workingPoint << " in decay mode "
+          << key.first << " prong " << key.second << " pi0" << std::endl;
+      }
+      decayModeCuts.push_back(cuts.getParameter<double>(workingPoint));
+    }
+  }
+
+  BOOST_FOREACH(const std::string& workingPoint, workingPoints_) {
+    produces<reco::PFTauDiscriminator>(workingPoint);
+  }
+}
+
+bool RecoTauDecayModeMultiCutProducer::passesPrediscriminants(
+    const std::vector<edm::Handle<reco::PFTauDiscriminator> >& handles,
+    const reco::PFTauRef& tau) const {
+  if (prediscriminants_.empty())
+    return true;
+  for (size_t i = 0; i < prediscriminants_.size(); ++i) {
+    bool passes = (*handles[i])[tau] > prediscriminants_[i].cut;
+    if (andPrediscriminants_ && !passes)
+      return false;
+    if (!andPrediscriminants_ && passes)
+      return true;
+  }
+  return andPrediscriminants_;
+}
+
+void RecoTauDecayModeMultiCutProducer::produce(edm::Event& evt,
+                                               const edm::EventSetup& es) {
+  edm::Handle<reco::PFTauCollection> taus;
+  evt.getByLabel(tauSrc_, taus);
+
+  edm::Handle<reco::PFTauDiscriminator> toMultiplex;
+  evt.getByLabel(toMultiplex_, toMultiplex);
+
+  std::vector<edm::Handle<reco::PFTauDiscriminator> > prediscriminants(
+      prediscriminants_.size());
+  for (size_t i = 0; i < prediscriminants_.size(); ++i) {
+    evt.getByLabel(prediscriminants_[i].src, prediscriminants[i]);
+  }
+
+  // The output for each working point
+  std::vector<reco::PFTauDiscriminator*> outputs;
+  for (size_t iWP = 0; iWP < workingPoints_.size(); ++iWP) {
+    outputs.push_back(
+        new reco::PFTauDiscriminator(reco::PFTauRefProd(taus)));
+  }
+
+  for (size_t iTau = 0; iTau < taus->size(); ++iTau) {
+    reco::PFTauRef tau(taus, iTau);
+    // Taus failing the prediscriminants or with an unknown decay mode fail
+    // all the working points.
+    CutMap::const_iterator cuts = cuts_.end();
+    if (passesPrediscriminants(prediscriminants, tau)) {
+      cuts = cuts_.find(DecayMode(tau->signalPFChargedHadrCands().size(),
+                                  tau->signalPiZeroCandidates().size()));
+    }
+    if (cuts == cuts_.end()) {
+      for (size_t iWP = 0; iWP < outputs.size(); ++iWP)
+        outputs[iWP]->setValue(iTau, 0.0);
+      continue;
+    }
+    double value = (*toMultiplex)[tau];
+    for (size_t iWP = 0; iWP < outputs.size(); ++iWP)
+      outputs[iWP]->setValue(iTau, value > cuts->second[iWP]);
+  }
+
+  for (size_t iWP = 0; iWP < outputs.size(); ++iWP) {
+    evt.put(std::auto_ptr<reco::PFTauDiscriminator>(outputs[iWP]),
+            workingPoints_[iWP]);
+  }
+}
+
+#include "FWCore/Framework/interface/MakerMacros.h"
+DEFINE_FWK_MODULE(RecoTauDecayModeMultiCutProducer);
@@ -1,3 +1,21 @@
+/*
+ * RecoTauDifferenceAnalyzer
+ *
+ * Author: Evan K. Friis (UC Davis)
+ *
+ * Compare the result of a discriminator on two tau collections, and dump the
+ * taus where they differ.  Each tau in src1 is matched to the tau in src2
+ * built from the same seed jet.  If there is none, the closest tau within
+ * maxDeltaR (default 0.5) of the seed jets is used, found through an eta-phi
+ * grid of the src2 taus.  Taus without a match count as failing in src2.
+ */
+
+#include <algorithm>
+#include <cmath>
+#include <map>
+#include <set>
+#include <vector>
+
 #include "FWCore/Framework/interface/EDFilter.h"
 #include "FWCore/Framework/interface/Event.h"
 #include "FWCore/ParameterSet/interface/ParameterSet.h"
@@ -44,6 +62,12 @@ RecoTauDifferenceAnalyzer::RecoTauDifferenceAnalyzer(
   allPassed2_ = 0;
   allPassed1_ = 0;
   filter_ = pset.exists("filter") ? pset.getParameter<bool>("filter") : false;
+  maxDeltaR_ = pset.exists("maxDeltaR") ?
+    pset.getParameter<double>("maxDeltaR") : 0.5;
+  if (maxDeltaR_ <= 0) {
+    throw cms::Exception("BadMaxDeltaR")
+      << "maxDeltaR must be positive" << std::endl;
+  }
 }
 
 namespace {
@@ -54,6 +78,79 @@ namespace {
       return tau.pfTauTagInfoRef()->pfjetRef();
     else throw cms::Exception("cant find jet ref");
   }
+
+  // The seed jet of a tau, resolved once
+  struct TauJet {
+    reco::PFTauRef tau;
+    reco::PFJetRef jet;
+    double eta;
+    double phi;
+  };
+
+  typedef std::pair<edm::ProductID, size_t> JetKey;
+
+  JetKey jetKey(const reco::PFJetRef& jet) {
+    return JetKey(jet.id(), jet.key());
+  }
+
+  // Index of the taus in cells of at least maxDeltaR in eta and phi, so the
+  // taus within maxDeltaR of a point are in the neighbouring cells.
+  class EtaPhiGrid {
+    public:
+      explicit EtaPhiGrid(double cellSize)
+        :cellSize_(cellSize) {
+        nPhiCells_ = std::max(1, int(std::floor(2*M_PI/cellSize)));
+      }
+      void add(size_t index, double eta, double phi) {
+        cells_[cell(eta, phi)].push_back(index);
+      }
+      // Get the indices of the taus in the cells around eta, phi
+      std::vector<size_t> near(double eta, double phi) const {
+        std::vector<size_t> output;
+        Cell center = cell(eta, phi);
+        // With few phi cells the neighbours can be the same cell
+        std::set<int> phiCells;
+        for (int dPhi = -1; dPhi <= 1; ++dPhi)
+          phiCells.insert((center.second + dPhi + nPhiCells_) % nPhiCells_);
+        for (int dEta = -1; dEta <= 1; ++dEta) {
+          for (std::set<int>::const_iterator phiCell = phiCells.begin();
+               phiCell != phiCells.end(); ++phiCell) {
+            CellMap::const_iterator found =
+              cells_.find(Cell(center.first + dEta, *phiCell));
+            if (found != cells_.end())
+              output.insert(output.end(), found->second.begin(),
+                            found->second.end());
+          }
+        }
+        return output;
+      }
+    private:
+      typedef std::pair<int, int> Cell;
+      typedef std::map<Cell, std::vector<size_t> > CellMap;
+      Cell cell(double eta, double phi) const {
+        int phiCell = int(std::floor((phi + M_PI)*nPhiCells_/(2*M_PI)));
+        return Cell(int(std::floor(eta/cellSize_)),
+                    (phiCell % nPhiCells_ + nPhiCells_) % nPhiCells_);
+      }
+      double cellSize_;
+      int nPhiCells_;
+      CellMap cells_;
+  };
+
+  std::vector<TauJet> tauJets(
+      const edm::Handle<reco::PFTauCollection>& taus) {
+    std::vector<TauJet> output;
+    output.reserve(taus->size());
+    for (size_t iTau = 0; iTau < taus->size(); ++iTau) {
+      TauJet tauJet;
+      tauJet.tau = reco::PFTauRef(taus, iTau);
+      tauJet.jet = getJetRef(*tauJet.tau);
+      tauJet.eta = tauJet.jet->eta();
+      tauJet.phi = tauJet.jet->phi();
+      output.push_back(tauJet);
+    }
+    return output;
+  }
 }
 
 bool RecoTauDifferenceAnalyzer::filter(
@@ -71,27 +168,45 @@ bool RecoTauDifferenceAnalyzer::filter(
   edm::Handle<reco::PFTauDiscriminator> disc2;
   evt.getByLabel(disc2_, disc2);
 
+  // Resolve the jet refs once, and index the second collection by seed jet
+  // and by position.
+  std::vector<TauJet> tauJets1 = tauJets(taus1);
+  std::vector<TauJet> tauJets2 = tauJets(taus2);
+  std::map<JetKey, size_t> byJet2;
+  EtaPhiGrid grid2(maxDeltaR_);
+  for (size_t iTau2 = 0; iTau2 < tauJets2.size(); ++iTau2) {
+    byJet2.insert(std::make_pair(jetKey(tauJets2[iTau2].jet), iTau2));
+    grid2.add(iTau2, tauJets2[iTau2].eta, tauJets2[iTau2].phi);
+  }
+
   bool differenceFound = false;
   // Loop over first collection
-  for (size_t iTau1 = 0; iTau1 < taus1->size(); ++iTau1) {
+  for (size_t iTau1 = 0; iTau1 < tauJets1.size(); ++iTau1) {
     tausExamined_++;
-    reco::PFTauRef tau1(taus1, iTau1);
+    const TauJet& tauJet1 = tauJets1[iTau1];
+    reco::PFTauRef tau1 = tauJet1.tau;
     // Find the best match in the other collection
     reco::PFTauRef bestMatch;
-    double bestDeltaR = -1;
-    for (size_t iTau2 = 0; iTau2 < taus2->size(); ++iTau2) {
-      reco::PFTauRef tau2(taus2, iTau2);
-      reco::PFJetRef jet1 = getJetRef(*tau1);
-      reco::PFJetRef jet2 = getJetRef(*tau2);
-      double deltaRVal = deltaR(jet2->p4(), jet1->p4());
-      if (bestMatch.isNull() || deltaRVal < bestDeltaR) {
-        bestMatch = tau2;
-        bestDeltaR = deltaRVal;
+    std::map<JetKey, size_t>::const_iterator sameJet =
+      byJet2.find(jetKey(tauJet1.jet));
+    if (sameJet != byJet2.end()) {
+      bestMatch = tauJets2[sameJet->second].tau;
+    } else {
+      double bestDeltaR = maxDeltaR_;
+      std::vector<size_t> candidates = grid2.near(tauJet1.eta, tauJet1.phi);
+      for (size_t i = 0; i < candidates.size(); ++i) {
+        const TauJet& tauJet2 = tauJets2[candidates[i]];
+        double deltaRVal = deltaR(tauJet1.eta, tauJet1.phi,
+                                  tauJet2.eta, tauJet2.phi);
+        if (deltaRVal < bestDeltaR) {
+          bestMatch = tauJet2.tau;
+          bestDeltaR = deltaRVal;
+        }
       }
     }
     // See what's up with the discriminators
     bool result1 = ((*disc1)[tau1] > 0.5);
-    bool result2 = ((*disc2)[bestMatch] > 0.5);
+    bool result2 = (bestMatch.isNonnull() && (*disc2)[bestMatch] > 0.5);
     allPassed1_ += result1;
     allPassed2_ += result2;
     if (result1 ^ result2) {
@@ -119,6 +234,10 @@ bool RecoTauDifferenceAnalyzer::filter(
 
       std::cout << "---------       Tau 2                  -------------"
           << std::endl;
+      if (bestMatch.isNull()) {
+        std::cout << "no match within deltaR " << maxDeltaR_ << std::endl;
+        continue;
+      }
       std::cout << *bestMatch << std::endl;
 
       if (bestMatch->leadPFChargedHadrCand().isNonnull() &&
@@ -0,0 +1,49 @@
+/*
+ * RecoTauDiscriminationFromJetValueMap
+ *
+ * Build a PFTauDiscriminator from a ValueMap<float> keyed on the jets the taus
+ * were built from, made by RecoTauJetValueMapFromDiscriminator.  Used to get
+ * the value of a discriminator that was computed in an earlier step for taus
+ * that are rebuilt from the same jets, without matching the old and new taus.
+ *
+ * Takes as input:
+ *
+ * PFTauProducer : tau collection to make the discriminator for
+ *
+ * src : the ValueMap<float> keyed on the jets.  Taus built from jets that are
+ * not in the ValueMap get the prediscriminant fail value.
+ */
+
+#include "RecoTauTag/RecoTau/interface/TauDiscriminationProducerBase.h"
+#include "DataFormats/Common/interface/ValueMap.h"
+
+class RecoTauDiscriminationFromJetValueMap
+  : public PFTauDiscriminationProducerBase {
+  public:
+    RecoTauDiscriminationFromJetValueMap(const edm::ParameterSet& pset)
+      :PFTauDiscriminationProducerBase(pset) {
+      src_ = pset.getParameter<edm::InputTag>("src");
+    }
+    virtual ~RecoTauDiscriminationFromJetValueMap() {}
+    double discriminate(const reco::PFTauRef& tau);
+    void beginEvent(const edm::Event& evt, const edm::EventSetup& evtSetup);
+  private:
+    edm::InputTag src_;
+    edm::Handle<edm::ValueMap<float> > values_;
+};
+
+void RecoTauDiscriminationFromJetValueMap::beginEvent(
+    const edm::Event& evt, const edm::EventSetup& evtSetup) {
+  evt.getByLabel(src_, values_);
+}
+
+double
+RecoTauDiscriminationFromJetValueMap::discriminate(const reco::PFTauRef& tau) {
+  reco::PFJetRef jet = tau->jetRef();
+  if (jet.isNull() || !values_->contains(jet.id()))
+    return prediscriminantFailValue_;
+  return (*values_)[jet];
+}
+
+#include "FWCore/Framework/interface/MakerMacros.h"
+DEFINE_FWK_MODULE(RecoTauDiscriminationFromJetValueMap);
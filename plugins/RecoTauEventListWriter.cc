@@ -0,0 +1,70 @@
+/*
+ * RecoTauEventListWriter
+ *
+ * Write the run:lumi:event ID of each event it sees to a text file, one event
+ * per line.  Put it in a path after a filter to record the events passing it.
+ * The lines are in the format taken by the eventsToProcess parameter of
+ * PoolSource, so a later job can read only these events.
+ *
+ * Takes as input:
+ *
+ * fileName : the output file
+ *
+ * header : optional vstring, written at the top of the file with each line
+ * prefixed by '#' (i.e. to record which selection made the list)
+ */
+
+#include <fstream>
+#include <iostream>
+#include <string>
+#include <vector>
+
+#include "FWCore/Framework/interface/EDAnalyzer.h"
+#include "FWCore/Framework/interface/Event.h"
+#include "FWCore/ParameterSet/interface/ParameterSet.h"
+#include "FWCore/Utilities/interface/Exception.h"
+
+class RecoTauEventListWriter : public edm::EDAnalyzer {
+  public:
+    explicit RecoTauEventListWriter(const edm::ParameterSet& pset);
+    virtual ~RecoTauEventListWriter() {}
+    virtual void analyze(const edm::Event& evt, const edm::EventSetup& es);
+    virtual void endJob();
+  private:
+    std::string fileName_;
+    std::ofstream output_;
+    size_t nEvents_;
+};
+
+RecoTauEventListWriter::RecoTauEventListWriter(const edm::ParameterSet& pset) {
+  fileName_ = pset.getParameter<std::string>("fileName");
+  output_.open(fileName_.c_str());
+  if (!output_) {
+    throw cms::Exception("BadFile") << "Can't open event list "
+      << fileName_ << " for writing" << std::endl;
+  }
+  if (pset.exists("header")) {
+    std::vector<std::string> header =
+      pset.getParameter<std::vector<std::string> >("header");
+    for (size_t i = 0; i < header.size(); ++i) {
+      output_ << "# " << header[i] << std::endl;
+    }
+  }
+  nEvents_ = 0;
+}
+
+void RecoTauEventListWriter::analyze(const edm::Event& evt,
+                                     const edm::EventSetup& es) {
+  output_ << evt.id().run() << ":" << evt.id().luminosityBlock() << ":"
+    << evt.id().event() << std::endl;
+  nEvents_++;
+}
+
+void RecoTauEventListWriter::endJob() {
+  output_.close();
+  std::cout << "Wrote " << nEvents_ << " events to " << fileName_
+    << std::endl;
+}
+
+#include "FWCore/Framework/interface/MakerMacros.h"
+DEFINE_FWK_MODULE(RecoTauEventListWriter);
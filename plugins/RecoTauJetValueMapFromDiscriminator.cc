@@ -0,0 +1,76 @@
+/*
+ * RecoTauJetValueMapFromDiscriminator
+ *
+ * Stores the values of a PFTauDiscriminator in a ValueMap<float> keyed on the
+ * jets the taus were built from.  Unlike the discriminator itself, the
+ * ValueMap stays valid when the taus are rebuilt from the same jets in a later
+ * step, where the discriminator can't be recomputed (i.e. the flight path
+ * significance, when the vertices aren't available anymore).  See
+ * RecoTauDiscriminationFromJetValueMap.
+ *
+ * Takes as input:
+ *
+ * jetSrc : the PFJet collection the taus were built from
+ *
+ * discriminator : the PFTauDiscriminator to store
+ *
+ * defaultValue : the value stored for jets without a tau
+ */
+
+#include "FWCore/Framework/interface/EDProducer.h"
+#include "FWCore/Framework/interface/Event.h"
+#include "FWCore/ParameterSet/interface/ParameterSet.h"
+#include "FWCore/Utilities/interface/Exception.h"
+#include "DataFormats/Common/interface/ValueMap.h"
+#include "DataFormats/JetReco/interface/PFJetCollection.h"
+#include "DataFormats/TauReco/interface/PFTau.h"
+#include "DataFormats/TauReco/interface/PFTauDiscriminator.h"
+
+class RecoTauJetValueMapFromDiscriminator : public edm::EDProducer {
+  public:
+    RecoTauJetValueMapFromDiscriminator(const edm::ParameterSet& pset);
+    virtual ~RecoTauJetValueMapFromDiscriminator() {}
+    void produce(edm::Event& evt, const edm::EventSetup& es);
+  private:
+    edm::InputTag jetSrc_;
+    edm::InputTag discriminatorSrc_;
+    double defaultValue_;
+};
+
+RecoTauJetValueMapFromDiscriminator::RecoTauJetValueMapFromDiscriminator(
+    const edm::ParameterSet& pset) {
+  jetSrc_ = pset.getParameter<edm::InputTag>("jetSrc");
+  discriminatorSrc_ = pset.getParameter<edm::InputTag>("discriminator");
+  defaultValue_ = pset.getParameter<double>("defaultValue");
+  produces<edm::ValueMap<float> >();
+}
+
+void RecoTauJetValueMapFromDiscriminator::produce(
+    edm::Event& evt, const edm::EventSetup& es) {
+  edm::Handle<reco::PFJetCollection> jets;
+  evt.getByLabel(jetSrc_, jets);
+
+  edm::Handle<reco::PFTauDiscriminator> discriminator;
+  evt.getByLabel(discriminatorSrc_, discriminator);
+
+  std::vector<float> values(jets->size(), defaultValue_);
+  for (size_t iTau = 0; iTau < discriminator->size(); ++iTau) {
+    reco::PFTauRef tau = (*discriminator)[iTau].first;
+    reco::PFJetRef jet = tau->jetRef();
+    if (jet.id() != jets.id()) {
+      throw cms::Exception("MismatchedJets")
+        << "The taus in " << discriminatorSrc_
+        << " were not built from the jets in " << jetSrc_ << std::endl;
+    }
+    values[jet.key()] = (*discriminator)[iTau].second;
+  }
+
+  std::auto_ptr<edm::ValueMap<float> > output(new edm::ValueMap<float>());
+  edm::ValueMap<float>::Filler filler(*output);
+  filler.insert(jets, values.begin(), values.end());
+  filler.fill();
+  evt.put(output);
+}
+
+#include "FWCore/Framework/interface/MakerMacros.h"
+DEFINE_FWK_MODULE(RecoTauJetValueMapFromDiscriminator);
@@ -1,7 +1,9 @@
 /*
  * RecoTauPlotDiscriminator
  *
- * Plot the output of a PFTauDiscriminator using TFileService.
+ * Plot the output of a PFTauDiscriminator using TFileService.  The histograms
+ * are named after the discriminator label, followed by its instance label if
+ * it has one.
  *
  * Author: Evan K. Friis (UC Davis)
  */
@@ -52,6 +54,13 @@ class RecoTauPlotDiscriminator : public edm::EDAnalyzer {
     DiscMap histos_;
 };
 
+namespace {
+  // Name of the histograms of a discriminator
+  std::string histoName(const edm::InputTag& tag) {
+    return tag.label() + tag.instance();
+  }
+}
+
 RecoTauPlotDiscriminator::RecoTauPlotDiscriminator(const edm::ParameterSet &pset)
   :src_(pset.getParameter<edm::InputTag>("src")) {
   uint32_t nbins = pset.getParameter<uint32_t>("nbins");
@@ -71,60 +80,61 @@ RecoTauPlotDiscriminator::RecoTauPlotDiscriminator(const edm::ParameterSet &pset
 
   BOOST_FOREACH(const edm::InputTag &tag, discs_) {
     HistoMap discMap;
+    std::string name = histoName(tag);
     discMap["plain"] =
-        fs->make<TH1F>(tag.label().c_str(), tag.label().c_str(),
+        fs->make<TH1F>(name.c_str(), name.c_str(),
                        nbins, min, max);
 
     // Make correlation plots w.r.t tau pt
-    std::string vs_pt_name = tag.label()+"_pt";
+    std::string vs_pt_name = name+"_pt";
     discMap["vs_pt"] =
         fs->make<TH2F>(vs_pt_name.c_str(), vs_pt_name.c_str(),
                        nbins, min, max, 100, 0, 200);
 
     // W.r.t. jet pt
-    std::string vs_jetpt_name = tag.label()+"_jetPt";
+    std::string vs_jetpt_name = name+"_jetPt";
     discMap["vs_jetPt"] =
         fs->make<TH2F>(vs_jetpt_name.c_str(), vs_jetpt_name.c_str(),
                        nbins, min, max, 100, 0, 200);
 
     // W.r.t. embedded pt in alternat lorentz vector (used to hold gen tau pt)
-    std::string vs_embedpt_name = tag.label()+"_embedPt";
+    std::string vs_embedpt_name = name+"_embedPt";
     discMap["vs_embedPt"] =
         fs->make<TH2F>(vs_embedpt_name.c_str(), vs_embedpt_name.c_str(),
                        nbins, min, max, 100, 0, 200);
 
     // 3D histogram with tau pt & jet pt
-    std::string vs_pt_jetPt_name = tag.label()+"_pt_jetPt";
+    std::string vs_pt_jetPt_name = name+"_pt_jetPt";
     discMap["vs_pt_jetPt"] =
         fs->make<TH3F>(vs_pt_jetPt_name.c_str(), vs_pt_jetPt_name.c_str(),
                        nbins, min, max, 100, 0, 200, 100, 0, 200);
 
-    std::string vs_pt_embedPt_name = tag.label()+"_pt_embedPt";
+    std::string vs_pt_embedPt_name = name+"_pt_embedPt";
     discMap["vs_pt_embedPt"] =
         fs->make<TH3F>(vs_pt_embedPt_name.c_str(), vs_pt_embedPt_name.c_str(),
                        nbins, min, max, 100, 0, 200, 100, 0, 200);
 
 
-    std::string vs_eta_name = tag.label()+"_eta";
+    std::string vs_eta_name = name+"_eta";
     discMap["vs_eta"] =
         fs->make<TH2F>(vs_eta_name.c_str(), vs_eta_name.c_str(),
                        nbins, min, max, 100, -2.5, 2.5);
 
-    std::string vs_dm_name = tag.label()+"_dm";
+    std::string vs_dm_name = name+"_dm";
     discMap["vs_dm"] =
         fs->make<TH2F>(vs_dm_name.c_str(), vs_dm_name.c_str(),
                        nbins, min, max, 15, -0.5, 14.5);
 
     if (plotPU_) {
-      std::string vs_truePU_name = tag.label()+"_truePU";
+      std::string vs_truePU_name = name+"_truePU";
       discMap["vs_truePU"] = fs->make<TH2F>(vs_truePU_name.c_str(),
           vs_truePU_name.c_str(), nbins, min, max, 15, -0.5, 14.5);
-      std::string vs_recoPU_name = tag.label()+"_recoPU";
+      std::string vs_recoPU_name = name+"_recoPU";
       discMap["vs_recoPU"] = fs->make<TH2F>(vs_recoPU_name.c_str(),
           vs_recoPU_name.c_str(), nbins, min, max, 15, -0.5, 14.5);
     }
 
-    histos_[tag.label()] = discMap;
+    histos_[name] = discMap;
   }
 }
 
@@ -154,7 +164,7 @@ RecoTauPlotDiscriminator::analyze(const edm::Event &evt,
       evt.getByLabel(tag, discHandle);
       //const HistoMap &discHistos = disc.second;
       double result = (*discHandle)[tau];
-      HistoMap& mymap = histos_[tag.label()];
+      HistoMap& mymap = histos_[histoName(tag)];
       mymap["plain"]->Fill(result);
       mymap["vs_pt"]->Fill(result, tau->pt());
       mymap["vs_jetPt"]->Fill(result, tau->jetRef()->pt());
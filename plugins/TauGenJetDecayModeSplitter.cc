@@ -0,0 +1,95 @@
+/*
+ * TauGenJetDecayModeSplitter
+ *
+ * Split a collection of tau GenJets into several collections by decay mode,
+ * in a single pass.  This does the same thing as one TauGenJetDecayModeSelector
+ * for each category, but the decay mode of each tau is only found once.
+ *
+ * Takes as input:
+ *
+ * src : the tau GenJets (i.e. tauGenJets)
+ *
+ * categories : PSet mapping each category name to the list of decay modes it
+ * selects, as given by JetMCTagUtils::genTauDecayMode (i.e. 'oneProng0Pi0',
+ * 'muon').  A tau can be in more than one category.
+ *
+ * Produces a GenJetCollection for each category, with the category name as
+ * the instance label.
+ */
+
+#include <map>
+#include <set>
+#include <string>
+#include <vector>
+#include <boost/foreach.hpp>
+
+#include "FWCore/Framework/interface/EDProducer.h"
+#include "FWCore/Framework/interface/Event.h"
+#include "FWCore/ParameterSet/interface/ParameterSet.h"
+
+#include "DataFormats/Common/interface/View.h"
+#include "DataFormats/JetReco/interface/GenJetCollection.h"
+#include "DataFormats/JetReco/interface/GenJet.h"
+
+#include "PhysicsTools/JetMCUtils/interface/JetMCTag.h"
+
+class TauGenJetDecayModeSplitter : public edm::EDProducer {
+  public:
+    explicit TauGenJetDecayModeSplitter(const edm::ParameterSet& pset);
+    virtual ~TauGenJetDecayModeSplitter() {}
+    virtual void produce(edm::Event& evt, const edm::EventSetup& es);
+  private:
+    edm::InputTag src_;
+    std::vector<std::string> categories_;
+    // The categories (indices into categories_) of each decay mode
+    typedef std::map<std::string, std::vector<size_t> > DecayModeMap;
+    DecayModeMap decayModes_;
+};
+
+TauGenJetDecayModeSplitter::TauGenJetDecayModeSplitter(
+    const edm::ParameterSet& pset) {
+  src_ = pset.getParameter<edm::InputTag>("src");
+  const edm::ParameterSet& categories =
+    pset.getParameter<edm::ParameterSet>("categories");
+  categories_ =
+    categories.getParameterNamesForType<std::vector<std::string> >();
+  for (size_t i = 0; i < categories_.size(); ++i) {
+    std::set<std::string> decayModes;
+    BOOST_FOREACH(const std::string& decayMode,
+        categories.getParameter<std::vector<std::string> >(categories_[i])) {
+      // Don't add a tau twice if a decay mode is listed twice
+      if (decayModes.insert(decayMode).second)
+        decayModes_[decayMode].push_back(i);
+    }
+    produces<reco::GenJetCollection>(categories_[i]);
+  }
+}
+
+void TauGenJetDecayModeSplitter::produce(edm::Event& evt,
+                                         const edm::EventSetup& es) {
+  edm::Handle<edm::View<reco::GenJet> > genJets;
+  evt.getByLabel(src_, genJets);
+
+  std::vector<reco::GenJetCollection*> outputs;
+  for (size_t i = 0; i < categories_.size(); ++i) {
+    outputs.push_back(new reco::GenJetCollection());
+  }
+
+  BOOST_FOREACH(const reco::GenJet& genJet, *genJets) {
+    DecayModeMap::const_iterator categories =
+      decayModes_.find(JetMCTagUtils::genTauDecayMode(genJet));
+    if (categories == decayModes_.end())
+      continue;
+    BOOST_FOREACH(size_t category, categories->second) {
+      outputs[category]->push_back(genJet);
+    }
+  }
+
+  for (size_t i = 0; i < categories_.size(); ++i) {
+    evt.put(std::auto_ptr<reco::GenJetCollection>(outputs[i]),
+            categories_[i]);
+  }
+}
+
+#include "FWCore/Framework/interface/MakerMacros.h"
+DEFINE_FWK_MODULE(TauGenJetDecayModeSplitter);
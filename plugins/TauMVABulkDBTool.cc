@@ -0,0 +1,164 @@
+/*
+ * TauMVABulkDBTool
+ *
+ * Dump, merge and re-tag the MVA computers from several databases and .mva
+ * files in a single job.  The computers are collected from (in this order,
+ * later ones replace earlier ones with the same name):
+ *
+ * databases : the EventSetup labels of TauTagMVAComputerRcd containers, i.e.
+ * one labeled PoolDBESSource for each input database.  All the computers in
+ * each container are used.
+ *
+ * mvaFiles : PSet mapping computer name -> .mva file
+ *
+ * copies : PSet mapping new computer name -> name of a computer to copy
+ *
+ * If [computers] is not empty, only the computers it lists are kept.  Each
+ * computer is written to [dumpDir]/<computer>.mva if dumpDir is not empty,
+ * and all of them are put in one container in the PoolDBOutputService under
+ * [outputRecord] if it is not empty.
+ */
+
+#include <map>
+#include <string>
+#include <vector>
+#include <boost/foreach.hpp>
+
+#include "FWCore/Framework/interface/EDAnalyzer.h"
+#include "FWCore/Framework/interface/ESHandle.h"
+#include "FWCore/Framework/interface/Event.h"
+#include "FWCore/Framework/interface/EventSetup.h"
+#include "FWCore/ParameterSet/interface/ParameterSet.h"
+#include "FWCore/ServiceRegistry/interface/Service.h"
+#include "FWCore/Utilities/interface/Exception.h"
+#include "CondCore/DBOutputService/interface/PoolDBOutputService.h"
+#include "CondFormats/PhysicsToolsObjects/interface/MVAComputer.h"
+#include "PhysicsTools/MVAComputer/interface/MVAComputer.h"
+
+#include "RecoTauTag/TauTagTools/interface/TauMVADBConfiguration.h"
+
+class TauMVABulkDBTool : public edm::EDAnalyzer {
+  public:
+    explicit TauMVABulkDBTool(const edm::ParameterSet& pset);
+    virtual ~TauMVABulkDBTool() {}
+    virtual void analyze(const edm::Event& evt, const edm::EventSetup& es);
+  private:
+    typedef PhysicsTools::Calibration::MVAComputer Calibration;
+    typedef PhysicsTools::Calibration::MVAComputerContainer Container;
+    typedef std::map<std::string, Calibration> CalibrationMap;
+    typedef std::map<std::string, std::string> NameMap;
+    std::vector<std::string> databases_;
+    NameMap mvaFiles_;
+    NameMap copies_;
+    std::vector<std::string> computers_;
+    std::string dumpDir_;
+    std::string outputRecord_;
+    bool done_;
+};
+
+namespace {
+  // Read a PSet of name -> string parameters
+  std::map<std::string, std::string> readNameMap(
+      const edm::ParameterSet& pset) {
+    std::map<std::string, std::string> output;
+    BOOST_FOREACH(const std::string& name, pset.getParameterNames()) {
+      output[name] = pset.getParameter<std::string>(name);
+    }
+    return output;
+  }
+}
+
+TauMVABulkDBTool::TauMVABulkDBTool(const edm::ParameterSet& pset)
+  :done_(false) {
+  databases_ = pset.getParameter<std::vector<std::string> >("databases");
+  mvaFiles_ = readNameMap(pset.getParameter<edm::ParameterSet>("mvaFiles"));
+  copies_ = readNameMap(pset.getParameter<edm::ParameterSet>("copies"));
+  computers_ = pset.getParameter<std::vector<std::string> >("computers");
+  dumpDir_ = pset.getParameter<std::string>("dumpDir");
+  outputRecord_ = pset.getParameter<std::string>("outputRecord");
+}
+
+void TauMVABulkDBTool::analyze(const edm::Event& evt,
+                               const edm::EventSetup& es) {
+  // Everything is done for the first event
+  if (done_)
+    return;
+  done_ = true;
+
+  CalibrationMap calibrations;
+
+  BOOST_FOREACH(const std::string& label, databases_) {
+    edm::ESHandle<Container> container;
+    es.get<TauMVAFrameworkDBRcd>().get(label, container);
+    BOOST_FOREACH(const Container::Entry& entry, container->entries) {
+      std::cout << "TauMVABulkDBTool: " << entry.first << " from database "
+        << label << std::endl;
+      calibrations[entry.first] = entry.second;
+    }
+  }
+
+  BOOST_FOREACH(const NameMap::value_type& mvaFile, mvaFiles_) {
+    std::cout << "TauMVABulkDBTool: " << mvaFile.first << " from "
+      << mvaFile.second << std::endl;
+    Calibration* calibration = PhysicsTools::MVAComputer::readCalibration(
+        mvaFile.second.c_str());
+    calibrations[mvaFile.first] = *calibration;
+    delete calibration;
+  }
+
+  BOOST_FOREACH(const NameMap::value_type& copy, copies_) {
+    if (!calibrations.count(copy.second)) {
+      throw cms::Exception("MissingComputer")
+        << "Can't copy " << copy.second << " to " << copy.first
+        << ", there is no computer " << copy.second << std::endl;
+    }
+    std::cout << "TauMVABulkDBTool: " << copy.first << " copied from "
+      << copy.second << std::endl;
+    calibrations[copy.first] = calibrations[copy.second];
+  }
+
+  // Select the computers to keep
+  if (!computers_.empty()) {
+    CalibrationMap selected;
+    BOOST_FOREACH(const std::string& computer, computers_) {
+      if (!calibrations.count(computer)) {
+        throw cms::Exception("MissingComputer")
+          << "There is no computer " << computer << " in the inputs"
+          << std::endl;
+      }
+      selected[computer] = calibrations[computer];
+    }
+    calibrations.swap(selected);
+  }
+
+  if (!dumpDir_.empty()) {
+    BOOST_FOREACH(const CalibrationMap::value_type& calibration,
+                  calibrations) {
+      std::string fileName = dumpDir_ + "/" + calibration.first + ".mva";
+      std::cout << "TauMVABulkDBTool: writing " << fileName << std::endl;
+      PhysicsTools::MVAComputer::writeCalibration(
+          fileName.c_str(), &calibration.second);
+    }
+  }
+
+  if (!outputRecord_.empty()) {
+    edm::Service<cond::service::PoolDBOutputService> dbService;
+    if (!dbService.isAvailable()) {
+      throw cms::Exception("NoPoolDBOutputService")
+        << "The PoolDBOutputService is needed to write the computers"
+        << std::endl;
+    }
+    // The PoolDBOutputService takes ownership of the container
+    Container* output = new Container();
+    BOOST_FOREACH(const CalibrationMap::value_type& calibration,
+                  calibrations) {
+      output->add(calibration.first) = calibration.second;
+    }
+    dbService->createNewIOV<Container>(
+        output, dbService->beginOfTime(), dbService->endOfTime(),
+        outputRecord_);
+  }
+}
+
+#include "FWCore/Framework/interface/MakerMacros.h"
+DEFINE_FWK_MODULE(TauMVABulkDBTool);
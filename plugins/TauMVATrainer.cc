@@ -102,13 +102,12 @@ TauMVATrainer::TauMVATrainer(const edm::ParameterSet& iConfig):
    discriminantManager_.setSignalFlag(iAmSignal_);
 
    edm::LogInfo("TauMVATrainer") << "Adding discriminants to TauDiscriminantManager...";
-   // add the discriminants to the discriminant manager
-   for(DiscriminantList::const_iterator aDiscriminant  = myDiscriminants_.begin();
-                                        aDiscriminant != myDiscriminants_.end();
-                                      ++aDiscriminant)
-   {
-      discriminantManager_.addDiscriminant(*aDiscriminant);
-   }
+   // add the discriminants to the discriminant manager.  If [discriminants] is given, only those
+   // are computed and stored (i.e. the inputs used by the MVA configurations)
+   std::vector<std::string> selectedDiscriminants;
+   if (iConfig.exists("discriminants"))
+      selectedDiscriminants = iConfig.getParameter<std::vector<std::string> >("discriminants");
+   discriminantManager_.addDiscriminants(myDiscriminants_.discriminantList(), selectedDiscriminants);
 
    //create tree to hold truth variables
    edm::LogInfo("TauMVATrainer") << "Building truth tree...";
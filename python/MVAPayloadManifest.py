@@ -0,0 +1,236 @@
+"""
+        MVAPayloadManifest.py
+
+        Keep track of the MVA computer payloads that have already been
+        written to each conditions database tag, so the upload configs can
+        skip the upload when none of the computers changed.
+
+        The manifest is a JSON file mapping "<connect>|<tag>" to the content
+        hash of each computer written there.  A computer container is stored
+        as a whole in each IOV, so if any computer changed, all of them are
+        written again.
+
+        The upload is only skipped if the target database still has the
+        tag (see TargetHasTag), so a deleted or recreated sqlite file is
+        written again.
+
+        The upload configs only mark their payload as pending, since they
+        can't know if cmsRun succeeded.  Run them through
+
+            python -m RecoTauTag.TauTagTools.MVAPayloadManifest run \
+                    upload_cfg.py [options]
+
+        which runs cmsRun and records the pending payloads only if it
+        succeeds.  If cmsRun is run directly, nothing is recorded and the
+        next upload writes the payload again.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+
+DefaultManifest = "uploaded_payloads.json"
+
+def FileHash(path):
+   ''' Content hash of a file (i.e. a .mva or sqlite file) '''
+   hash = hashlib.sha1()
+   input = open(path, 'rb')
+   while True:
+      block = input.read(1 << 20)
+      if not block:
+         break
+      hash.update(block)
+   input.close()
+   return hash.hexdigest()
+
+def PayloadHashes(mvaFiles):
+   ''' Hash each computer, given a dictionary of computer -> .mva file '''
+   return dict((computer, FileHash(mvaFile))
+               for computer, mvaFile in mvaFiles.iteritems())
+
+def SourceHashes(computers, source, sourceTag):
+   '''
+   Hash the computers copied from another database.  If the source is a
+   local sqlite file, its contents are hashed, otherwise (i.e. a global tag)
+   the source name is assumed to identify the payload.  Returns None if the
+   payload can't be identified.
+   '''
+   for prefix in ['sqlite_file:', 'sqlite:']:
+      if source.startswith(prefix):
+         sourceFile = source[len(prefix):]
+         if not os.path.exists(sourceFile):
+            return None
+         sourceId = FileHash(sourceFile)
+         break
+   else:
+      if source.startswith('oracle:') or source.startswith('frontier:'):
+         # These can change under the same name
+         return None
+      sourceId = source
+   return dict(
+      (computer, hashlib.sha1(
+         "%s|%s|%s" % (sourceId, sourceTag, computer)).hexdigest())
+      for computer in computers)
+
+def LoadManifest(manifestFile):
+   if not os.path.exists(manifestFile):
+      return {}
+   input = open(manifestFile, 'r')
+   manifest = json.load(input)
+   input.close()
+   return manifest
+
+def SaveManifest(manifestFile, manifest):
+   # Write to a temporary file first, so a crash doesn't lose the manifest
+   tempFile = manifestFile + '.tmp'
+   output = open(tempFile, 'w')
+   json.dump(manifest, output, indent=2, sort_keys=True)
+   output.close()
+   os.rename(tempFile, manifestFile)
+
+def _Target(connect, tag):
+   return "%s|%s" % (connect, tag)
+
+def _SqliteFile(connect):
+   for prefix in ['sqlite_file:', 'sqlite:']:
+      if connect.startswith(prefix):
+         return connect[len(prefix):]
+   return None
+
+def TargetHasTag(connect, tag):
+   '''
+   Check if [tag] exists in the database [connect].  Local sqlite files are
+   read directly, otherwise cmscond_list_iov is used.  Returns False if it
+   can't be checked.
+   '''
+   sqliteFile = _SqliteFile(connect)
+   if sqliteFile is not None:
+      if not os.path.exists(sqliteFile):
+         return False
+      try:
+         db = sqlite3.connect(sqliteFile)
+         try:
+            # The tag table of the old (POOL) and new conditions schemas
+            for table in ['METADATA', 'TAG']:
+               try:
+                  rows = db.execute(
+                     "SELECT NAME FROM %s WHERE NAME = ?" % table,
+                     (tag,)).fetchall()
+                  return len(rows) > 0
+               except sqlite3.OperationalError:
+                  continue
+         finally:
+            db.close()
+      except sqlite3.DatabaseError:
+         return False
+   try:
+      devnull = open(os.devnull, 'w')
+      result = subprocess.call(['cmscond_list_iov', '-c', connect, '-t', tag],
+                               stdout=devnull, stderr=devnull)
+      devnull.close()
+      return result == 0
+   except OSError:
+      return False
+
+def ChangedComputers(manifestFile, connect, tag, hashes):
+   '''
+   Get the computers whose payload differs from the one already written to
+   [tag] in [connect].  If the payload can't be identified ([hashes] is None)
+   or the tag isn't in [connect] anymore, returns None: everything has to be
+   written.
+   '''
+   if hashes is None:
+      return None
+   if not TargetHasTag(connect, tag):
+      return None
+   written = LoadManifest(manifestFile).get(
+      _Target(connect, tag), {}).get('computers', {})
+   return sorted(computer for computer, hash in hashes.iteritems()
+                 if written.get(computer) != hash)
+
+def MarkPending(manifestFile, connect, tag, hashes):
+   ''' Record the payload about to be written, to be committed later '''
+   if hashes is None:
+      return
+   manifest = LoadManifest(manifestFile)
+   manifest.setdefault(_Target(connect, tag), {})['pending'] = hashes
+   SaveManifest(manifestFile, manifest)
+
+def CommitPending(manifestFile):
+   ''' Record the pending payloads as written '''
+   manifest = LoadManifest(manifestFile)
+   committed = []
+   for target, entry in manifest.iteritems():
+      if 'pending' in entry:
+         # The whole container is replaced by the new IOV
+         entry['computers'] = entry.pop('pending')
+         committed.append(target)
+   SaveManifest(manifestFile, manifest)
+   return committed
+
+def DiscardPending(manifestFile):
+   ''' Forget the pending payloads (i.e. the upload failed) '''
+   manifest = LoadManifest(manifestFile)
+   for entry in manifest.itervalues():
+      entry.pop('pending', None)
+   SaveManifest(manifestFile, manifest)
+
+def CheckUpload(manifestFile, connect, tag, hashes, force=False):
+   '''
+   Decide if the payload with [hashes] has to be written to [tag] in
+   [connect], and mark it as pending if so.
+   '''
+   changedComputers = ChangedComputers(manifestFile, connect, tag, hashes)
+   if not force and changedComputers is not None and not changedComputers:
+      print "* None of the computers changed, nothing to upload"
+      return False
+   if changedComputers:
+      print "* Changed computers: %s" % " ".join(changedComputers)
+   elif changedComputers is None:
+      print "* %s isn't in %s or the payload is unknown, uploading all" % (
+         tag, connect)
+   MarkPending(manifestFile, connect, tag, hashes)
+   return True
+
+def _ManifestFromArgs(args):
+   ''' Find the manifest=... VarParsing option in the cmsRun arguments '''
+   manifestFile = DefaultManifest
+   for arg in args:
+      if arg.startswith('manifest='):
+         manifestFile = arg[len('manifest='):]
+   return manifestFile
+
+def RunUpload(args):
+   ''' Run cmsRun with [args], and record its payloads if it succeeds '''
+   manifestFile = _ManifestFromArgs(args)
+   # Don't commit the leftovers of an earlier run
+   if os.path.exists(manifestFile):
+      DiscardPending(manifestFile)
+   result = subprocess.call(['cmsRun'] + args)
+   if not os.path.exists(manifestFile):
+      return result
+   if result == 0:
+      for target in CommitPending(manifestFile):
+         print "Recorded upload to %s" % target
+   else:
+      print "cmsRun failed, nothing recorded"
+      DiscardPending(manifestFile)
+   return result
+
+if __name__ == "__main__":
+   if len(sys.argv) < 2 or sys.argv[1] not in ['run', 'show']:
+      print "Usage: %s run upload_cfg.py [options]" % sys.argv[0]
+      print "       %s show [manifest.json]" % sys.argv[0]
+      sys.exit(1)
+   if sys.argv[1] == 'run':
+      sys.exit(RunUpload(sys.argv[2:]))
+   manifestFile = len(sys.argv) > 2 and sys.argv[2] or DefaultManifest
+   for target, entry in sorted(LoadManifest(manifestFile).items()):
+      print target
+      for computer, hash in sorted(entry.get('computers', {}).items()):
+         print "   %-30s %s" % (computer, hash)
+      if 'pending' in entry:
+         print "   (pending upload of %i computers)" % len(entry['pending'])
@@ -6,16 +6,17 @@
                 - which neural net 
                 - which algorithms (shrinkingConePFTauDecayModeProducer, etc)
         Define locations of train/test ROOT files
+
+        The train/test file lists are only found when they are first used, and
+        are cached in a manifest which is refreshed when the modification time
+        of the directory changes.  Importing this file has no side effects;
+        call EverythingInItsRightPlace() to check the setup.
 """
 
-import sys
 import os
-# Get CMSSW base
-try:
-   Project_Area = os.environ["CMSSW_BASE"]
-except KeyError:
-   print "$CMSSW_BASE enviroment variable not set!  Please run eval `scramv1 ru -[c]sh`"
-   sys.exit(1)
+import json
+# Get CMSSW base (checked when it is needed)
+Project_Area = os.environ.get("CMSSW_BASE", "")
 
 import FWCore.ParameterSet.Config as cms
 import glob
@@ -94,7 +95,12 @@ BackgroundFileTestingGlob = "%s/*4.root" % BackgroundRootDir
 #####  DO NOT MODIFY BELOW THIS LINE (experts only) #############
 #################################################################
 
+def CheckProjectArea():
+   if not Project_Area:
+      raise EnvironmentError, "$CMSSW_BASE enviroment variable not set!  Please run eval `scramv1 ru -[c]sh`"
+
 def GetTrainingFile(computerName, anAlgo):
+   CheckProjectArea()
    return os.path.join(TauTagToolsWorkingDirectory, "test", "TrainDir_%s_%s" % (computerName, anAlgo), "%s.mva" % computerName)
 
 #Find the unique mva types to train
@@ -109,14 +115,80 @@ myModules = []
 for name, _mva in listOfMVANames.iteritems():
    myModules.append(_mva)
 
-SignalTrainFiles         = glob.glob(SignalFileTrainingGlob)
-BackgroundTrainFiles     = glob.glob(BackgroundFileTrainingGlob)
-
-SignalTestingFiles         = glob.glob(SignalFileTestingGlob)
-BackgroundTestingFiles     = glob.glob(BackgroundFileTestingGlob)
+# Cache of the file lists matching each glob
+FileManifest = os.path.join(TauTagToolsWorkingDirectory, "test", ".mva_files.json")
+
+def _DirectoryTime(pattern):
+   # Only a glob in a single directory can be checked
+   directory = os.path.dirname(pattern)
+   if glob.has_magic(directory) or not os.path.isdir(directory):
+      return None
+   return os.stat(directory).st_mtime
+
+def GlobWithManifest(pattern, manifestFile=None):
+   ''' Get the files matching [pattern], using the cached list if the directory is unchanged '''
+   if manifestFile is None:
+      manifestFile = FileManifest
+   mtime = _DirectoryTime(pattern)
+   if mtime is None:
+      return glob.glob(pattern)
+   manifest = {}
+   if os.path.exists(manifestFile):
+      try:
+         input = open(manifestFile, 'r')
+         manifest = json.load(input)
+         input.close()
+      except ValueError:
+         # Corrupt manifest, rebuild it
+         manifest = {}
+   entry = manifest.get(pattern)
+   if entry is not None and entry['mtime'] == mtime:
+      return list(entry['files'])
+   files = glob.glob(pattern)
+   manifest[pattern] = {'mtime' : mtime, 'files' : files}
+   try:
+      tempFile = "%s.%i.tmp" % (manifestFile, os.getpid())
+      output = open(tempFile, 'w')
+      json.dump(manifest, output, indent=2, sort_keys=True)
+      output.close()
+      os.rename(tempFile, manifestFile)
+   except (IOError, OSError):
+      # The cache is optional
+      pass
+   return files
+
+class LazyFileList(object):
+   ''' List of the files matching a glob, found when it is first used '''
+   def __init__(self, pattern):
+      self.pattern = pattern
+      self._files = None
+   def files(self):
+      if self._files is None:
+         CheckProjectArea()
+         self._files = GlobWithManifest(self.pattern)
+      return self._files
+   def __iter__(self):
+      return iter(self.files())
+   def __len__(self):
+      return len(self.files())
+   def __getitem__(self, index):
+      return self.files()[index]
+   def __contains__(self, file):
+      return file in self.files()
+   def __add__(self, other):
+      return self.files() + list(other)
+   def __repr__(self):
+      return repr(self.files())
+
+SignalTrainFiles         = LazyFileList(SignalFileTrainingGlob)
+BackgroundTrainFiles     = LazyFileList(BackgroundFileTrainingGlob)
+
+SignalTestingFiles         = LazyFileList(SignalFileTestingGlob)
+BackgroundTestingFiles     = LazyFileList(BackgroundFileTestingGlob)
 
 # Catch dumb errors before we begin
 def EverythingInItsRightPlace():
+   CheckProjectArea()
    if not len(SignalTrainFiles) or not len(BackgroundTrainFiles) or not len(SignalTestingFiles) or not len(BackgroundTestingFiles):
       raise IOError, "The signal/background root file training/testing file list is empty! Check the SignalFileTrainingGlob etc. in MVASteering.py"
 
@@ -0,0 +1,111 @@
+import FWCore.ParameterSet.Config as cms
+
+'''
+
+MinimalPathTools
+
+Build a path that runs only the modules needed to produce a given set of
+products.  The dependencies of each module are found by following all of its
+InputTag parameters (including those in nested PSets and VPSets) to the
+modules of the process that produce them.  String parameters that are exactly
+the label of a module in the process are followed as well, as some tau
+modules refer to their inputs by name.  Labels that are not modules of the
+process are assumed to be read from the input file.
+
+Example:
+
+    process.path = cms.Path(minimalSequence(
+        process, discriminatorLabels(discriminators) + ['plotTaus']))
+
+'''
+
+def _moduleLabels(process):
+    ''' Get the labels of all the modules that can be put on a path '''
+    output = set()
+    output.update(process.producers_().keys())
+    output.update(process.filters_().keys())
+    output.update(process.analyzers_().keys())
+    return output
+
+def _parameterLabels(parameter):
+    ''' Get all the module labels referred to by a parameter '''
+    if isinstance(parameter, cms.InputTag):
+        yield parameter.getModuleLabel()
+    elif isinstance(parameter, cms.VInputTag):
+        for tag in parameter:
+            if isinstance(tag, cms.InputTag):
+                yield tag.getModuleLabel()
+            else:
+                yield str(tag).split(':')[0]
+    elif isinstance(parameter, cms.string):
+        yield parameter.value()
+    elif isinstance(parameter, cms.vstring):
+        for value in parameter:
+            yield value
+    elif isinstance(parameter, cms.VPSet):
+        for pset in parameter:
+            for label in _parameterLabels(pset):
+                yield label
+    elif isinstance(parameter, cms.PSet):
+        for name in parameter.parameterNames_():
+            for label in _parameterLabels(getattr(parameter, name)):
+                yield label
+
+def moduleInputs(process, label, modules=None):
+    ''' Get the labels of the modules of the process that [label] reads '''
+    if modules is None:
+        modules = _moduleLabels(process)
+    module = getattr(process, label)
+    output = []
+    for name in module.parameterNames_():
+        for input in _parameterLabels(getattr(module, name)):
+            if input in modules and input != label and input not in output:
+                output.append(input)
+    return output
+
+def moduleDependencies(process, labels):
+    '''
+    Get the labels of the modules needed to run the modules [labels],
+    including themselves, in an order where each module comes after all the
+    modules it reads from.
+    '''
+    modules = _moduleLabels(process)
+    output = []
+    visited = set()
+    def visit(label, stack):
+        if label in visited:
+            return
+        if label in stack:
+            raise ValueError("Circular dependency between modules: %s" %
+                             " -> ".join(stack + [label]))
+        for input in moduleInputs(process, label, modules):
+            visit(input, stack + [label])
+        visited.add(label)
+        output.append(label)
+    for label in labels:
+        if label not in modules:
+            raise KeyError("No module %s in the process" % label)
+        visit(label, [])
+    return output
+
+def discriminatorLabels(discriminators):
+    '''
+    Flatten a dictionary mapping tau producer -> [discriminators] into a list
+    of module labels.  Discriminators may be given as "label:instance".
+    '''
+    output = []
+    for producer, producerDiscriminators in sorted(discriminators.items()):
+        for tag in [producer] + list(producerDiscriminators):
+            label = tag.split(':')[0]
+            if label not in output:
+                output.append(label)
+    return output
+
+def minimalSequence(process, labels):
+    ''' Build a sequence containing only the modules needed by [labels] '''
+    modules = [getattr(process, label)
+               for label in moduleDependencies(process, labels)]
+    output = cms.Sequence(modules[0])
+    for module in modules[1:]:
+        output += module
+    return output
@@ -18,7 +18,8 @@ kinematic_selection = cms.string('pt > 5.0 & abs(eta) < 2.5')
 # Lead object jet selection
 lead_object_jet_selection = cms.string("getPFConstituent(0).pt() > 1.0")
 
-# Basic kinematic plots
+# Basic kinematic plots.  The plotquantities in this file are computed
+# natively by RecoTauCandViewHistoAnalyzer, keep it in sync when adding new ones.
 kin_plots = cms.VPSet(
     cms.PSet(
         min = cms.untracked.double(0),
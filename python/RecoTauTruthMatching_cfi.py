@@ -3,7 +3,7 @@ import FWCore.ParameterSet.Config as cms
 recoTauTruthMatcher = cms.EDProducer(
     "GenJetMatcher",
     src = cms.InputTag("combinatoricRecoTaus"),
-    matched = cms.InputTag("trueHadronicTaus"),
+    matched = cms.InputTag("trueTausByDecayMode", "hadronic"),
     mcPdgId     = cms.vint32(),                      # n/a
     mcStatus    = cms.vint32(),                      # n/a
     checkCharge = cms.bool(True),                    # Require charge is correct
@@ -60,26 +60,43 @@ TauDecayModeCutMutliplexerPrototype = cms.EDProducer(
     )
 )
 
-shrinkingConePFTauDiscriminationByTaNCfrOnePercent = copy.deepcopy(TauDecayModeCutMutliplexerPrototype)
-UpdateCuts(shrinkingConePFTauDiscriminationByTaNCfrOnePercent, CutSet_TaNC_OnePercent)
-
-shrinkingConePFTauDiscriminationByTaNCfrOnePercent = copy.deepcopy(TauDecayModeCutMutliplexerPrototype)
-UpdateCuts(shrinkingConePFTauDiscriminationByTaNCfrOnePercent, CutSet_TaNC_OnePercent)
-
-shrinkingConePFTauDiscriminationByTaNCfrHalfPercent = copy.deepcopy(TauDecayModeCutMutliplexerPrototype)
-UpdateCuts(shrinkingConePFTauDiscriminationByTaNCfrHalfPercent, CutSet_TaNC_HalfPercent)
-
-shrinkingConePFTauDiscriminationByTaNCfrQuarterPercent = copy.deepcopy(TauDecayModeCutMutliplexerPrototype)
-UpdateCuts(shrinkingConePFTauDiscriminationByTaNCfrQuarterPercent, CutSet_TaNC_QuarterPercent)
+def MultiWorkingPointCuts(producer, cut_sets):
+    """
+    Build a RecoTauDecayModeMultiCutProducer applying all the [cut_sets]
+    (working point name -> CutSet) in one module, from a
+    RecoTauDecayModeCutMultiplexer [producer].  Each working point is
+    produced with its name as the instance label.
+    """
+    output = cms.EDProducer(
+        "RecoTauDecayModeMultiCutProducer",
+        PFTauProducer = producer.PFTauProducer,
+        toMultiplex = producer.toMultiplex,
+        Prediscriminants = copy.deepcopy(producer.Prediscriminants),
+        decayModes = cms.VPSet(),
+    )
+    for dm in producer.decayModes:
+        cuts = cms.PSet()
+        for name, cut_set in cut_sets.iteritems():
+            cut = cut_set[dmCodeTrans[(dm.nCharged.value(), dm.nPiZeros.value())]]
+            setattr(cuts, name, cms.double((cut + 1.0)/2.0))
+        output.decayModes.append(cms.PSet(
+            nCharged = dm.nCharged,
+            nPiZeros = dm.nPiZeros,
+            cuts = cuts,
+        ))
+    return output
 
-shrinkingConePFTauDiscriminationByTaNCfrTenthPercent = copy.deepcopy(TauDecayModeCutMutliplexerPrototype)
-UpdateCuts(shrinkingConePFTauDiscriminationByTaNCfrTenthPercent, CutSet_TaNC_TenthPercent)
+# All the working points in one module, i.e.
+#  cms.InputTag("shrinkingConePFTauDiscriminationByTaNCWorkingPoints", "OnePercent")
+# replaces the shrinkingConePFTauDiscriminationByTaNCfr[WorkingPoint] modules
+shrinkingConePFTauDiscriminationByTaNCWorkingPoints = MultiWorkingPointCuts(
+    TauDecayModeCutMutliplexerPrototype, {
+        'OnePercent' : CutSet_TaNC_OnePercent,
+        'HalfPercent' : CutSet_TaNC_HalfPercent,
+        'QuarterPercent' : CutSet_TaNC_QuarterPercent,
+        'TenthPercent' : CutSet_TaNC_TenthPercent,
+    })
 
 RunTanc = cms.Sequence(
-      shrinkingConePFTauDiscriminationByTaNCfrOnePercent+
-      shrinkingConePFTauDiscriminationByTaNCfrHalfPercent+
-      shrinkingConePFTauDiscriminationByTaNCfrQuarterPercent+
-      shrinkingConePFTauDiscriminationByTaNCfrTenthPercent
+      shrinkingConePFTauDiscriminationByTaNCWorkingPoints
       )
-
-
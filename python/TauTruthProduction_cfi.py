@@ -5,36 +5,26 @@ from PhysicsTools.HepMCCandAlgos.genParticles_cfi import genParticles
 from RecoJets.JetProducers.ak5GenJets_cfi import ak5GenJets
 from RecoJets.Configuration.GenJetParticles_cff import genParticlesForJets
 
-trueHadronicTaus = cms.EDFilter(
-    "TauGenJetDecayModeSelector",
-    src = cms.InputTag("tauGenJets"),
-    select = cms.vstring(
-        'oneProng0Pi0', 'oneProng1Pi0', 'oneProng2Pi0', 'oneProngOther',
-        'threeProng0Pi0', 'threeProng1Pi0', 'threeProngOther', 'rare'),
-    filter = cms.bool(False)
-)
+_hadronicDecayModes = [
+    'oneProng0Pi0', 'oneProng1Pi0', 'oneProng2Pi0', 'oneProngOther',
+    'threeProng0Pi0', 'threeProng1Pi0', 'threeProngOther', 'rare']
 
-trueCommonHadronicTaus = cms.EDFilter(
-    "TauGenJetDecayModeSelector",
-    src = cms.InputTag("tauGenJets"),
-    select = cms.vstring(
-        'oneProng0Pi0', 'oneProng1Pi0', 'oneProng2Pi0',
-        'threeProng0Pi0', 'threeProng1Pi0'),
-    filter = cms.bool(False)
-)
-
-trueMuonicTaus = cms.EDFilter(
-    "TauGenJetDecayModeSelector",
-    src = cms.InputTag("tauGenJets"),
-    select = cms.vstring('muon'),
-    filter = cms.bool(False)
-)
+_commonHadronicDecayModes = [
+    'oneProng0Pi0', 'oneProng1Pi0', 'oneProng2Pi0',
+    'threeProng0Pi0', 'threeProng1Pi0']
 
-trueElecronicTaus = cms.EDFilter(
-    "TauGenJetDecayModeSelector",
+# Split the tau GenJets by decay mode in one pass.  Each category is produced
+# with the category name as the instance label, i.e.
+#  cms.InputTag("trueTausByDecayMode", "commonHadronic")
+trueTausByDecayMode = cms.EDProducer(
+    "TauGenJetDecayModeSplitter",
     src = cms.InputTag("tauGenJets"),
-    select = cms.vstring('electron'),
-    filter = cms.bool(False)
+    categories = cms.PSet(
+        hadronic = cms.vstring(_hadronicDecayModes),
+        commonHadronic = cms.vstring(_commonHadronicDecayModes),
+        muonic = cms.vstring('muon'),
+        electronic = cms.vstring('electron'),
+    )
 )
 
 tauTruthSequence = cms.Sequence(
@@ -42,6 +32,4 @@ tauTruthSequence = cms.Sequence(
     genParticlesForJets *
     ak5GenJets *
     tauGenJets *
-    trueHadronicTaus *
-    trueMuonicTaus *
-    trueElecronicTaus)
+    trueTausByDecayMode)
@@ -1,4 +1,6 @@
 #include "RecoTauTag/TauTagTools/interface/PFTauDiscriminantManager.h"
+#include "FWCore/Utilities/interface/Exception.h"
+#include <set>
 
 namespace PFTauDiscriminants
 {
@@ -29,6 +31,43 @@ PFTauDiscriminantManager::addDiscriminant(Discriminant* const discriminant)
    myDiscriminants_.insert(make_pair(discriminantName, discriminant));
 }
 
+size_t
+PFTauDiscriminantManager::addDiscriminants(const std::vector<Discriminant*>& discriminants, const std::vector<std::string>& inputs)
+{
+   std::set<std::string> selected(inputs.begin(), inputs.end());
+   std::set<std::string> available;
+   size_t nAdded = 0;
+   for(std::vector<Discriminant*>::const_iterator iDiscriminant  = discriminants.begin();
+                                                  iDiscriminant != discriminants.end();
+                                                ++iDiscriminant)
+   {
+      available.insert((*iDiscriminant)->name());
+      if (!selected.empty() && !selected.count((*iDiscriminant)->name()))
+         continue;
+      addDiscriminant(*iDiscriminant);
+      ++nAdded;
+   }
+   // Don't silently drop a misspelled discriminant
+   for(std::set<std::string>::const_iterator iInput  = selected.begin();
+                                             iInput != selected.end();
+                                           ++iInput)
+   {
+      if (!available.count(*iInput))
+      {
+         cms::Exception exception("UnknownDiscriminant");
+         exception << "No discriminant named " << *iInput << ", the available discriminants are:";
+         for(std::set<std::string>::const_iterator iName  = available.begin();
+                                                   iName != available.end();
+                                                 ++iName)
+         {
+            exception << " " << *iName;
+         }
+         throw exception;
+      }
+   }
+   return nAdded;
+}
+
 void 
 PFTauDiscriminantManager::clearCache()
 {
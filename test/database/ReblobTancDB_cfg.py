@@ -1,16 +1,32 @@
 #!/usr/bin/env cmsRun
 
 import FWCore.ParameterSet.Config as cms
+import FWCore.ParameterSet.VarParsing as VarParsing
 import RecoTauTag.TauTagTools.TauMVAConfigurations_cfi
 import os
 
 from RecoTauTag.TauTagTools.MVASteering_cfi import *
+from RecoTauTag.TauTagTools.MVAPayloadManifest import \
+        DefaultManifest, SourceHashes, CheckUpload
 
 # Copy TaNC training files into a local SQLite file
 # Adapted from PhysicsTools/MVATrainer/test/testWriteMVAComputerCondDB_cfg.py
 # Original author: Christopher Saout
 # Modifications by Evan Friis
 
+options = VarParsing.VarParsing ('standard')
+options.register ('manifest',
+                  DefaultManifest, # default value
+                  VarParsing.VarParsing.multiplicity.singleton, # singleton or list
+                  VarParsing.VarParsing.varType.string,          # string, int, or float
+                  "Manifest of the payloads already uploaded")
+options.register ('force',
+                  0, # default value
+                  VarParsing.VarParsing.multiplicity.singleton, # singleton or list
+                  VarParsing.VarParsing.varType.int,          # string, int, or float
+                  "Copy even if the computers didn't change")
+options.parseArguments()
+
 # Make sure we are only dealing w/ one algorithm...
 if len(myTauAlgorithms) > 1:
    raise RuntimeError, "ERROR: more than one tau algorithm is defined in MVASteering.py; this feature should be used only for algorithm evaluation.  \
@@ -46,6 +62,16 @@ for aNeuralNet in RecoTauTag.TauTagTools.TauMVAConfigurations_cfi.TaNC.value():
    neuralNetName = aNeuralNet.computerName.value()
    toCopyList.append(neuralNetName)
 
+# Skip the copy if these computers were already written to the local tag
+payloadHashes = SourceHashes(
+   toCopyList, process.GlobalTag.globaltag.value(), 'GlobalTag')
+if CheckUpload(options.manifest, myconnect.value(), mytag.value(),
+               payloadHashes, options.force):
+   print "* To record the copy, run this through:"
+   print "*   python -m RecoTauTag.TauTagTools.MVAPayloadManifest run"
+else:
+   process.maxEvents.input = 0
+
 process.MVAComputerSave = cms.EDAnalyzer("TauMVATrainerSave",
 	toPut = cms.vstring(),
         #list of labels to add into the tag given in the PoolDBOutputService
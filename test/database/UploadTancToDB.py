@@ -11,6 +11,8 @@ import RecoTauTag.TauTagTools.TauMVAConfigurations_cfi
 import os
 from RecoTauTag.TauTagTools.MVASteering_cfi import myTauAlgorithms, GetTrainingFile
 import FWCore.ParameterSet.VarParsing as VarParsing
+from RecoTauTag.TauTagTools.MVAPayloadManifest import \
+        DefaultManifest, PayloadHashes, CheckUpload
 
 options = VarParsing.VarParsing ('standard')
 options.register ('tag',
@@ -24,6 +26,17 @@ options.register ('db',
                   VarParsing.VarParsing.varType.string,          # string, int, or float
                   "Local database to connect to")
 
+options.register ('manifest',
+                  DefaultManifest, # default value
+                  VarParsing.VarParsing.multiplicity.singleton, # singleton or list
+                  VarParsing.VarParsing.varType.string,          # string, int, or float
+                  "Manifest of the payloads already uploaded")
+options.register ('force',
+                  0, # default value
+                  VarParsing.VarParsing.multiplicity.singleton, # singleton or list
+                  VarParsing.VarParsing.varType.int,          # string, int, or float
+                  "Upload even if the computers didn't change")
+
 options.parseArguments()
 
 # Make sure we are only dealing w/ one algorithm...
@@ -61,12 +74,25 @@ for aNeuralNet in RecoTauTag.TauTagTools.TauMVAConfigurations_cfi.TaNC.value():
    toCopyList.append(neuralNetName)
    print "* %-20s %-20s      " % (neuralNetName, mvaFileLocation )
 
+# Check which computers changed since the last upload to this tag
+payloadHashes = PayloadHashes(dict(
+   (neuralNetName, getattr(tempPSet, neuralNetName).value())
+   for neuralNetName in toCopyList))
+upload = CheckUpload(options.manifest, myconnect.value(), mytag.value(),
+                     payloadHashes, options.force)
+if upload:
+   print "* To record the upload, run this through:"
+   print "*   python -m RecoTauTag.TauTagTools.MVAPayloadManifest run"
+
 process = cms.Process("TaNCCondUpload")
 
 process.source = cms.Source("EmptySource")
 
 process.maxEvents = cms.untracked.PSet(	input = cms.untracked.int32(1) )
 
+if not upload:
+   process.maxEvents.input = 0
+
 process.MVAComputerESSource = cms.ESSource("TauMVAComputerESSource",
       tempPSet  # defined above, maps the Tanc NN names to their trained MVA weights files
 )
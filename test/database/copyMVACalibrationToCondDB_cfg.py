@@ -1,4 +1,7 @@
 import FWCore.ParameterSet.Config as cms
+import FWCore.ParameterSet.VarParsing as VarParsing
+from RecoTauTag.TauTagTools.MVAPayloadManifest import \
+        DefaultManifest, PayloadHashes, CheckUpload
 
 # Copy example MVA training into a local SQLite file
 # Adapted from PhysicsTools/MVATrainer/test/testWriteMVAComputerCondDB_cfg.py
@@ -8,6 +11,23 @@ import FWCore.ParameterSet.Config as cms
 # The files specified in the MVAComputerES source (i.e. ZTauTauTraining, can be more than one) will be added to an MVAComputerContainer
 # This computer containiner will be added to the specified database (in this case, Example.db) with the 'tag' given (i.e. MyTestMVATag)
 # The 'toCopy' parameter lists the computers in the computer container to put into the database
+# The copy is skipped if the computers are unchanged since the last copy (see MVAPayloadManifest)
+
+options = VarParsing.VarParsing ('standard')
+options.register ('manifest',
+                  DefaultManifest, # default value
+                  VarParsing.VarParsing.multiplicity.singleton, # singleton or list
+                  VarParsing.VarParsing.varType.string,          # string, int, or float
+                  "Manifest of the payloads already uploaded")
+options.register ('force',
+                  0, # default value
+                  VarParsing.VarParsing.multiplicity.singleton, # singleton or list
+                  VarParsing.VarParsing.varType.int,          # string, int, or float
+                  "Copy even if the computers didn't change")
+options.parseArguments()
+
+myconnect = cms.string('sqlite_file:Example.db')  #or frontier, etc
+mytag     = cms.string('MyTestMVATag')
 
 process = cms.Process("TauMVACondUpload")
 
@@ -32,14 +52,25 @@ process.MVAComputerSave = cms.EDAnalyzer("TauMVATrainerSave",
 	toCopy = cms.vstring('ZTauTauTraining')
 )
 
+# Only the computers in toCopy are written
+payloadHashes = PayloadHashes(dict(
+	(computer, getattr(process.MVAComputerESSource, computer).value())
+	for computer in process.MVAComputerSave.toCopy))
+if CheckUpload(options.manifest, myconnect.value(), mytag.value(),
+               payloadHashes, options.force):
+	print "* To record the copy, run this through:"
+	print "*   python -m RecoTauTag.TauTagTools.MVAPayloadManifest run"
+else:
+	process.maxEvents.input = 0
+
 process.PoolDBOutputService = cms.Service("PoolDBOutputService",
 	BlobStreamerName = cms.untracked.string('TBufferBlobStreamingService'),
 	DBParameters = cms.PSet( messageLevel = cms.untracked.int32(0) ),
 	timetype = cms.untracked.string('runnumber'),
-	connect = cms.string('sqlite_file:Example.db'),  #or frontier, etc
+	connect = myconnect,
 	toPut = cms.VPSet(cms.PSet(
 		record = cms.string('TauTagMVAComputerRcd'),
-		tag = cms.string('MyTestMVATag')                               
+		tag = mytag
 	))
 )
 
@@ -0,0 +1,141 @@
+#!/usr/bin/env cmsRun
+
+'''
+
+Dump, merge and re-tag MVA computers from any number of sqlite databases and
+.mva files in a single cmsRun job (see the TauMVABulkDBTool plugin).  This
+replaces running dump_db.py for each database followed by merge_dbs.py.
+
+Usage: bulk_db.py db=db/training.db:Train mva=db/3prong0pi0.mva \
+        copy=1prong2pi0:1prong1pi0 dumpDir=db \
+        outputDB=db/computers.db outputTag=Tanc
+
+    db        : input databases, with the tag to read (default: Train)
+    mva       : input .mva files, the computer name is taken from the file
+                name (i.e. db/1prong1pi0_blah.mva -> 1prong1pi0)
+    copy      : new_computer:existing_computer, add a copy of a computer
+    computers : only keep these computers (default: all)
+    dumpDir   : write each computer to <dumpDir>/<computer>.mva
+    outputDB  : write all the computers to this database (must not exist)
+    outputTag : tag of the output database (default: Tanc)
+
+'''
+
+import FWCore.ParameterSet.Config as cms
+import FWCore.ParameterSet.VarParsing as VarParsing
+import os
+
+options = VarParsing.VarParsing()
+
+options.register(
+    'db', '',
+    VarParsing.VarParsing.multiplicity.list,
+    VarParsing.VarParsing.varType.string,
+    "Input databases (file.db or file.db:Tag)")
+
+options.register(
+    'mva', '',
+    VarParsing.VarParsing.multiplicity.list,
+    VarParsing.VarParsing.varType.string,
+    "Input .mva files")
+
+options.register(
+    'copy', '',
+    VarParsing.VarParsing.multiplicity.list,
+    VarParsing.VarParsing.varType.string,
+    "Copy computers (new_computer:existing_computer)")
+
+options.register(
+    'computers', '',
+    VarParsing.VarParsing.multiplicity.list,
+    VarParsing.VarParsing.varType.string,
+    "Computers to keep")
+
+options.register(
+    'dumpDir', '',
+    VarParsing.VarParsing.multiplicity.singleton,
+    VarParsing.VarParsing.varType.string,
+    "Directory to write the .mva files to")
+
+options.register(
+    'outputDB', '',
+    VarParsing.VarParsing.multiplicity.singleton,
+    VarParsing.VarParsing.varType.string,
+    "Output database")
+
+options.register(
+    'outputTag', 'Tanc',
+    VarParsing.VarParsing.multiplicity.singleton,
+    VarParsing.VarParsing.varType.string,
+    "Tag of the output database")
+
+options.parseArguments()
+
+def get_mva_name(file):
+    # map db/1prong1pi0_blah.mva -> 1prong1pi0
+    filename = os.path.splitext(os.path.basename(file))[0]
+    return filename.split('_')[0]
+
+process = cms.Process("bulk_db")
+process.source = cms.Source("EmptySource")
+process.maxEvents = cms.untracked.PSet( input = cms.untracked.int32(1) )
+
+# Each input database gets its own label in the EventSetup
+from CondCore.DBCommon.CondDBSetup_cfi import CondDBSetup
+db_labels = []
+for index, db in enumerate(options.db):
+    db_file, tag = (db.split(':', 1) + ['Train'])[:2]
+    label = 'bulkInput%i' % index
+    print "Reading computers with tag %s from %s" % (tag, db_file)
+    setattr(process, label, cms.ESSource(
+        "PoolDBESSource",
+        CondDBSetup,
+        timetype = cms.string('runnumber'),
+        toGet = cms.VPSet(cms.PSet(
+            record = cms.string('TauTagMVAComputerRcd'),
+            tag = cms.string(tag),
+            label = cms.untracked.string(label),
+        )),
+        connect = cms.string('sqlite:%s' % db_file),
+        BlobStreamerName = cms.untracked.string('TBufferBlobStreamingService')
+    ))
+    db_labels.append(label)
+
+process.bulk = cms.EDAnalyzer(
+    "TauMVABulkDBTool",
+    databases = cms.vstring(db_labels),
+    mvaFiles = cms.PSet(),
+    copies = cms.PSet(),
+    computers = cms.vstring(options.computers),
+    dumpDir = cms.string(options.dumpDir),
+    outputRecord = cms.string(''),
+)
+
+for mva_file in options.mva:
+    setattr(process.bulk.mvaFiles, get_mva_name(mva_file),
+            cms.string(mva_file))
+
+for copy in options.copy:
+    new_computer, existing_computer = copy.split(':')
+    setattr(process.bulk.copies, new_computer, cms.string(existing_computer))
+
+if options.dumpDir and not os.path.exists(options.dumpDir):
+    os.makedirs(options.dumpDir)
+
+if options.outputDB:
+    print "Writing computers with tag %s to %s" % (
+        options.outputTag, options.outputDB)
+    process.bulk.outputRecord = 'TauTagMVAComputerRcd'
+    process.PoolDBOutputService = cms.Service(
+        "PoolDBOutputService",
+        BlobStreamerName = cms.untracked.string('TBufferBlobStreamingService'),
+        DBParameters = cms.PSet( messageLevel = cms.untracked.int32(4) ),
+        timetype = cms.untracked.string('runnumber'),
+        connect = cms.string('sqlite:%s' % options.outputDB),
+        toPut = cms.VPSet(cms.PSet(
+            record = cms.string('TauTagMVAComputerRcd'),
+            tag = cms.string(options.outputTag)
+        ))
+    )
+
+process.outpath = cms.EndPath(process.bulk)
@@ -22,6 +22,9 @@ parser = argparse.ArgumentParser(
 parser.add_argument('-s', metavar='file', help='Signal transform file')
 parser.add_argument('-b', metavar='file', help='Background transform file')
 parser.add_argument('-o',  help='Output file')
+parser.add_argument('-m', metavar='mode', default='',
+                    help='Decay mode (i.e. 1prong0pi0) to use, for files made'
+                    ' by evaluateMode_cfg.py with several modes')
 
 options=parser.parse_args()
 
@@ -38,14 +41,15 @@ background_file = ROOT.TFile(options.b, "READ")
 
 signal_denominator_histo = signal_file.Get("plotInputJets/pt")
 background_denominator_histo = background_file.Get("plotInputJets/pt")
+clean_tau_plots = "cleanTauPlots" + options.m
 signal_histo = signal_file.Get(
-    "cleanTauPlots/hpsTancTausDiscriminationByTancRaw")
+    clean_tau_plots + "/hpsTancTausDiscriminationByTancRaw")
 # Right now this is versus RECO pt.  in the future, embed the truth information
 # so we can use the generator pt.
 signal_histo_vs_truept = signal_file.Get(
-    "cleanTauPlots/hpsTancTausDiscriminationByTancRaw_pt")
+    clean_tau_plots + "/hpsTancTausDiscriminationByTancRaw_pt")
 background_histo = background_file.Get(
-    "cleanTauPlots/hpsTancTausDiscriminationByTancRaw")
+    clean_tau_plots + "/hpsTancTausDiscriminationByTancRaw")
 
 print "Signal has %i entries in clean, %i in total" % (
     signal_histo.Integral(), signal_denominator_histo.Integral())
@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+'''
+
+config_cache
+
+Run a cmsRun configuration, caching the fully assembled process so that later
+jobs with the same configuration don't have to import the _cff files and
+rebuild the sequences again.
+
+The assembled process is pickled in the cache directory, keyed on a hash of
+the configuration file, its arguments and the CMSSW release.  The python
+modules imported while building the process are recorded with their size and
+modification time, and the cached process is rebuilt if any of them changed.
+
+The input and output file arguments (inputFiles, inputFiles_load and
+outputFile) are left out of the key if the configuration only uses them as the
+source file names and the TFileService/output module file names.  In that
+case a single cached process is shared by all the shards of a job, and the
+file names are replaced when it is loaded.  This is decided when the process
+is first built, so a configuration whose modules depend on the input file
+names must not be run through the cache with different file lists.
+
+The cache directory is locked while an entry is looked up and built, so
+when several jobs start at the same time, the first one builds the process
+and the others wait for it and use the cached entry.
+
+Configurations that write auxiliary files while they are being assembled
+should do so with config_cache.write_file, so the files are written again
+when the cached process is used.
+
+Usage: config_cache.py [--cache-dir dir] evaluate_cfg.py [arg=value ...]
+
+'''
+
+import cPickle as pickle
+import fcntl
+import hashlib
+import json
+import os
+import sys
+
+# Arguments which are only the file names used by a job
+_JOB_ARGUMENTS = ['inputFiles', 'inputFiles_load', 'outputFile']
+
+# The config which loads a cached process in cmsRun
+_LOADER = '''import sys
+sys.path.insert(0, %r)
+import config_cache
+process = config_cache.load_process(sys.argv)
+'''
+
+# Auxiliary files written while the process is assembled
+_written_files = {}
+
+def write_file(file_name, contents):
+    ''' Write an auxiliary file, and record it for the config cache '''
+    output = open(file_name, 'w')
+    output.write(contents)
+    output.close()
+    _written_files[file_name] = contents
+
+def split_arguments(arguments):
+    ''' Split VarParsing [arguments] into (job, other) argument lists '''
+    job = []
+    other = []
+    for argument in arguments:
+        if argument.split('=', 1)[0] in _JOB_ARGUMENTS:
+            job.append(argument)
+        else:
+            other.append(argument)
+    return job, other
+
+def job_files(job_arguments):
+    ''' Get the (input files, output file) given by the job arguments '''
+    input_files = []
+    output_file = None
+    for argument in job_arguments:
+        name, value = argument.split('=', 1)
+        if name == 'inputFiles':
+            input_files.extend(file for file in value.split(',') if file)
+        elif name == 'inputFiles_load':
+            file_list = open(value, 'r')
+            input_files.extend(line.strip() for line in file_list
+                               if line.strip() and
+                               not line.strip().startswith('#'))
+            file_list.close()
+        elif name == 'outputFile':
+            output_file = value
+    return input_files, output_file
+
+def _file_stat(path):
+    if not os.path.isfile(path):
+        return None
+    stat = os.stat(path)
+    return [stat.st_size, int(stat.st_mtime)]
+
+def cache_key(config, arguments):
+    ''' Hash the configuration file, its [arguments] and the release '''
+    key = hashlib.sha1()
+    key.update(os.path.abspath(config))
+    config_file = open(config, 'rb')
+    key.update(config_file.read())
+    config_file.close()
+    for variable in ['CMSSW_VERSION', 'CMSSW_BASE', 'SCRAM_ARCH']:
+        key.update('%s=%s' % (variable, os.environ.get(variable, '')))
+    for argument in arguments:
+        key.update(argument)
+        # Arguments which refer to files
+        value = argument.split('=', 1)[-1]
+        key.update(repr(_file_stat(value)))
+    return key.hexdigest()
+
+def _imported_files(modules):
+    ''' Get the source files of [modules] with their size and mtime '''
+    output = {}
+    for module in modules:
+        file = getattr(module, '__file__', None)
+        if not file:
+            continue
+        if file.endswith('.pyc') or file.endswith('.pyo'):
+            file = file[:-1]
+        stat = _file_stat(file)
+        if stat is not None:
+            output[os.path.abspath(file)] = stat
+    return output
+
+def _entry_files(cache_dir, key):
+    return (os.path.join(cache_dir, key + '.json'),
+            os.path.join(cache_dir, key + '.pkl'))
+
+def _write_atomic(file_name, contents):
+    # Concurrent jobs can build the same entry, don't leave partial files
+    temp_name = '%s.%i.tmp' % (file_name, os.getpid())
+    output = open(temp_name, 'wb')
+    output.write(contents)
+    output.close()
+    os.rename(temp_name, file_name)
+
+def lookup(cache_dir, key):
+    ''' Get the cache entry for [key] if it is still valid '''
+    info_file, pickle_file = _entry_files(cache_dir, key)
+    if not os.path.exists(info_file) or not os.path.exists(pickle_file):
+        return None
+    input = open(info_file, 'r')
+    entry = json.load(input)
+    input.close()
+    for file, stat in entry['imports'].iteritems():
+        if _file_stat(file) != stat:
+            return None
+    entry['pickle'] = pickle_file
+    return entry
+
+def _output_slots(process):
+    ''' Get the parameters holding the names of the output files '''
+    slots = []
+    if hasattr(process, 'TFileService'):
+        slots.append(process.TFileService.fileName)
+    for module in process.outputModules_().values():
+        slots.append(module.fileName)
+    return slots
+
+def _can_replace_job_files(process, job_arguments):
+    '''
+    Check if the process only uses the job file names as the source files and
+    output file names, so they can be replaced in a shared cached process.
+    '''
+    if _written_files:
+        return False
+    input_files, output_file = job_files(job_arguments)
+    dump = process.dumpPython()
+    if input_files:
+        if list(process.source.fileNames) != input_files:
+            return False
+        if [file for file in input_files if dump.count(file) != 1]:
+            return False
+    if output_file is not None:
+        slots = [slot for slot in _output_slots(process)
+                 if slot.value() == output_file]
+        output_stem = os.path.splitext(output_file)[0]
+        if not slots or dump.count(output_stem) != len(slots):
+            return False
+    return True
+
+def build(config, arguments, cache_dir):
+    ''' Assemble the process of [config] and store it in the cache '''
+    job_arguments, other_arguments = split_arguments(arguments)
+    modules_before = set(sys.modules.keys())
+    # VarParsing reads the arguments following the config file
+    sys.argv = ['cmsRun', config] + arguments
+    sys.path.insert(0, os.path.dirname(os.path.abspath(config)))
+    namespace = {'__name__' : '__main__', '__file__' : config}
+    execfile(config, namespace)
+    process = namespace['process']
+
+    shared = _can_replace_job_files(process, job_arguments)
+    if shared:
+        key = cache_key(config, other_arguments)
+    else:
+        key = cache_key(config, arguments)
+    entry = {
+        'config' : config,
+        'arguments' : shared and other_arguments or arguments,
+        'shared' : shared,
+        'written_files' : _written_files,
+        'imports' : _imported_files(
+            module for name, module in sys.modules.items()
+            if name not in modules_before and module is not None),
+    }
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+    info_file, pickle_file = _entry_files(cache_dir, key)
+    _write_atomic(pickle_file, pickle.dumps(process, pickle.HIGHEST_PROTOCOL))
+    _write_atomic(info_file, json.dumps(entry, indent=2, sort_keys=True))
+    entry['pickle'] = pickle_file
+    return entry
+
+def get(config, arguments, cache_dir):
+    ''' Get a valid cache entry for the job, building it if necessary '''
+    job_arguments, other_arguments = split_arguments(arguments)
+    if not os.path.exists(cache_dir):
+        try:
+            os.makedirs(cache_dir)
+        except OSError:
+            # Made by a concurrent job
+            pass
+    # Only one job builds a given entry, the others wait and then find it
+    lock = open(os.path.join(cache_dir, '.lock'), 'a')
+    fcntl.flock(lock, fcntl.LOCK_EX)
+    try:
+        entry = lookup(cache_dir, cache_key(config, other_arguments))
+        if entry is None:
+            entry = lookup(cache_dir, cache_key(config, arguments))
+        if entry is None:
+            entry = build(config, arguments, cache_dir)
+    finally:
+        fcntl.flock(lock, fcntl.LOCK_UN)
+        lock.close()
+    return entry
+
+def load_process(argv):
+    '''
+    Load a cached process in cmsRun, i.e. cmsRun loader.py pickle=file.pkl
+    [inputFiles_load=...] [outputFile=...].  The job file names are replaced
+    if the cache entry is shared.
+    '''
+    import FWCore.ParameterSet.Config as cms
+    # Skip the arguments of cmsRun itself
+    arguments = argv[[i for i, arg in enumerate(argv)
+                      if arg.endswith('.py')][0]+1:]
+    pickle_file = [arg.split('=', 1)[1] for arg in arguments
+                   if arg.startswith('pickle=')][0]
+    input = open(pickle_file, 'rb')
+    process = pickle.load(input)
+    input.close()
+    input = open(os.path.splitext(pickle_file)[0] + '.json', 'r')
+    entry = json.load(input)
+    input.close()
+
+    for file_name, contents in entry['written_files'].iteritems():
+        output = open(file_name, 'w')
+        output.write(contents)
+        output.close()
+
+    if entry['shared']:
+        input_files, output_file = job_files(
+            split_arguments(arguments)[0])
+        if input_files:
+            process.source.fileNames = cms.untracked.vstring(input_files)
+        if output_file is not None:
+            for slot in _output_slots(process):
+                slot.setValue(output_file)
+    return process
+
+def loader(cache_dir):
+    ''' Get the loader config for the cache, creating it if necessary '''
+    loader_file = os.path.join(cache_dir, 'load_cfg.py')
+    contents = _LOADER % os.path.dirname(os.path.abspath(__file__))
+    if not os.path.exists(loader_file) or \
+       open(loader_file, 'r').read() != contents:
+        _write_atomic(loader_file, contents)
+    return loader_file
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print "Usage: %s [--cache-dir dir] config.py [arg=value ...]" % (
+            sys.argv[0])
+        sys.exit(1)
+    arguments = sys.argv[1:]
+    cache_dir = '.config_cache'
+    if arguments[0] == '--cache-dir':
+        cache_dir = arguments[1]
+        arguments = arguments[2:]
+    config = arguments[0]
+    arguments = arguments[1:]
+
+    # Use the importable module, so the files written by the config with
+    # config_cache.write_file are recorded in the same place.
+    import config_cache
+    entry = config_cache.get(config, arguments, cache_dir)
+    command = ['cmsRun', config_cache.loader(cache_dir),
+               'pickle=' + entry['pickle']]
+    if entry['shared']:
+        command.extend(config_cache.split_arguments(arguments)[0])
+    sys.stdout.flush()
+    os.execvp(command[0], command)
@@ -4,6 +4,12 @@
 
 Convert an MVA training stored in a sqlite database to a .mva binary file.
 
+Usage: dump_db.py db/1prong0pi0.db [computer ...]
+
+If the database contains several computers (i.e. it was made by training
+several decay modes at once), the computers to dump can be given after the
+database file.  Each is written to <computer>.mva next to the database.
+
 Author: Evan K. Friis (UC Davis)
 
 '''
@@ -15,8 +21,14 @@ import os
 print sys.argv
 
 db_file = sys.argv[2]
-mva_file = db_file.replace('.db', '.mva')
-calibration_record = os.path.splitext(os.path.basename(db_file))[0]
+if len(sys.argv) > 3:
+    mva_files = dict(
+        (calibration_record, os.path.join(
+            os.path.dirname(db_file), calibration_record + '.mva'))
+        for calibration_record in sys.argv[3:])
+else:
+    calibration_record = os.path.splitext(os.path.basename(db_file))[0]
+    mva_files = {calibration_record : db_file.replace('.db', '.mva')}
 
 process = cms.Process("dump_db")
 
@@ -40,7 +52,8 @@ process.save = cms.EDAnalyzer(
     "TauMVATrainerFileSave",
     trained = cms.untracked.bool(False),
 )
-setattr(process.save, calibration_record, cms.string(mva_file))
+for calibration_record, mva_file in mva_files.iteritems():
+    setattr(process.save, calibration_record, cms.string(mva_file))
 
 process.outpath = cms.EndPath(
     process.save
@@ -7,6 +7,18 @@ Run the combinatoric tau production & TaNC cleaner selection for a given tau
 decay mode on the validation sample.  Produces output histograms containing the
 TaNC output for *clean* signal and background taus.
 
+Several decay modes can be evaluated in a single pass over the input files with
+the [modes] option (i.e. modes=1prong0pi0,1prong1pi0).  In that case the TaNC
+output for each decay mode is put in the cleanTauPlots<mode> directory.
+
+To speed up the evaluation, only about [eventQuota] events are used.  By
+default these are the first events of the input files (sampling=none).  They
+can instead be drawn evenly from all the input files (sampling=file) or from
+each sample (sampling=sample), see sampling.py.  The sampling plan is then
+written to <outputFile>.sampling.json.  If the number of events in an input
+file can't be found, the sampling is skipped.  Use eventQuota=-1 to process
+all the events.
+
 Author: Evan K. Friis (UC Davis)
 
 '''
@@ -37,6 +49,12 @@ options.register(
     VarParsing.VarParsing.varType.int,
     "Number of pi zeros in decay mode")
 
+options.register(
+    'modes', '',
+    VarParsing.VarParsing.multiplicity.list,
+    VarParsing.VarParsing.varType.string,
+    "Decay modes (i.e. 1prong0pi0) to evaluate in one pass")
+
 options.register(
     'signal', 0,
     VarParsing.VarParsing.multiplicity.singleton,
@@ -44,24 +62,63 @@ options.register(
     "If signal=1, only jets matched to gen-level taus will be used"
 )
 
+options.register(
+    'sampling', 'none',
+    VarParsing.VarParsing.multiplicity.singleton,
+    VarParsing.VarParsing.varType.string,
+    "How to draw the sub-sample of events: file, sample or none"
+)
+
+options.register(
+    'eventQuota', 60000,
+    VarParsing.VarParsing.multiplicity.singleton,
+    VarParsing.VarParsing.varType.int,
+    "Approximate number of events to use"
+)
+
+options.register(
+    'eventCounts', 'eventcounts.json',
+    VarParsing.VarParsing.multiplicity.singleton,
+    VarParsing.VarParsing.varType.string,
+    "Cache of the number of events in each input file"
+)
+
 options.parseArguments()
 
 
-if options.tracks < 0 or options.pizeros < 0:
-    print "You must specify the [tracks] and [pizeros] arguments."
-    sys.exit(1)
-# Make a nice tuple of the decay mode
-_decay_mode = (options.tracks, options.pizeros)
 decay_mode_map = {
     (1, 0): 0,
     (1, 1): 1,
     (1, 2): 2,
     (3, 0): 10
 }
-_decay_mode_name = decay_mode_map[_decay_mode]
+# Map the names of the decay modes to the (tracks, pizeros) tuple
+decay_mode_names = {
+    '1prong0pi0' : (1, 0),
+    '1prong1pi0' : (1, 1),
+    '1prong2pi0' : (1, 2),
+    '3prong0pi0' : (3, 0),
+}
+
+# The output directory suffix for each decay mode.  In single mode, the
+# directories aren't suffixed.
+_decay_modes = {}
+if options.modes:
+    for mode in options.modes:
+        _decay_modes[mode] = decay_mode_map[decay_mode_names[mode]]
+else:
+    if options.tracks < 0 or options.pizeros < 0:
+        print "You must specify the [tracks] and [pizeros] arguments."
+        sys.exit(1)
+    # Make a nice tuple of the decay mode
+    _decay_mode = (options.tracks, options.pizeros)
+    _decay_modes[''] = decay_mode_map[_decay_mode]
 
 process = cms.Process("Eval")
-process.maxEvents = cms.untracked.PSet( input = cms.untracked.int32(60000) )
+process.maxEvents = cms.untracked.PSet(
+    input = cms.untracked.int32(options.maxEvents) )
+if options.maxEvents < 0 and options.sampling == 'none':
+    process.maxEvents.input = options.eventQuota
 
 process.load("FWCore.MessageService.MessageLogger_cfi")
 process.MessageLogger.cerr.FwkReport.reportEvery = 2000
@@ -76,11 +133,34 @@ process.TFileService = cms.Service(
 )
 
 print "WARNING: input branch workaround!"
+_input_files = [file for file in options.inputFiles if 'Multi' not in file]
+
+# Draw a representative sub-sample of the input events
+_sampling_plan = None
+if options.sampling != 'none':
+    import sampling
+    try:
+        _event_counts = sampling.event_counts(_input_files,
+                                              options.eventCounts)
+    except IOError, error:
+        print "WARNING: %s" % error
+        print "WARNING: Can't sample the input, processing it unsampled"
+        if options.maxEvents < 0:
+            process.maxEvents.input = options.eventQuota
+    else:
+        _sampling_plan = sampling.plan(
+            _input_files, _event_counts, options.eventQuota, options.sampling)
+if _sampling_plan is not None:
+    sampling.write_plan(_sampling_plan, options.outputFile + '.sampling.json')
+    _input_files = _sampling_plan['files']
+    print "Sampling %i of %i events from %i files" % (
+        _sampling_plan['selected_events'], _sampling_plan['total_events'],
+        len(_input_files))
+
 # Input files
 process.source = cms.Source(
     "PoolSource",
-    fileNames = cms.untracked.vstring(
-        file for file in options.inputFiles if 'Multi' not in file),
+    fileNames = cms.untracked.vstring(_input_files),
 )
 
 # Load PiZero algorithm
@@ -105,21 +185,24 @@ process.selectedBaseDecayModeTaus = cms.EDFilter(
     cut = cms.double(0.5),
 )
 
-process.selectedDecayModeTaus = cms.EDFilter(
-    "PFTauViewRefSelector",
-    src = cms.InputTag(
-        ("selectedHpsTancTrainTausDecayMode%i" % _decay_mode_name) + _TYPE_LABEL),
-    cut = cms.string(_KIN_CUT)
-)
-
 process.main = cms.Sequence(
     process.selectedBaseTaus*
-    process.selectedBaseDecayModeTaus*
-    process.selectedDecayModeTaus)
+    process.selectedBaseDecayModeTaus)
+
+for suffix, decay_mode_name in sorted(_decay_modes.items()):
+    selectedDecayModeTaus = cms.EDFilter(
+        "PFTauViewRefSelector",
+        src = cms.InputTag(
+            ("selectedHpsTancTrainTausDecayMode%i" % decay_mode_name)
+            + _TYPE_LABEL),
+        cut = cms.string(_KIN_CUT)
+    )
+    setattr(process, "selectedDecayModeTaus" + suffix, selectedDecayModeTaus)
+    process.main += selectedDecayModeTaus
 
 # Plot the input jets to use in weighting the transformation
 process.plotInputJets = cms.EDAnalyzer(
-    "CandViewHistoAnalyzer",
+    "RecoTauCandViewHistoAnalyzer",
     src = cms.InputTag("selectedBaseDecayModeTaus"),
     histograms = common.tau_histograms
 )
@@ -131,10 +214,14 @@ process.load("RecoTauTag.Configuration.RecoPFTauTag_cff")
 # Dont compute MVAs for ones that don't matter.  We make a discriminator that
 # selects taus taht should have an MVA value computed for them.
 from RecoTauTag.RecoTau.TauDiscriminatorTools import noPrediscriminants
+# The MVA output of all the requested decay modes is computed by the same
+# discriminator.
 process.selectedTausDiscriminator = cms.EDProducer(
     "PFRecoTauDiscriminationByStringCut",
     PFTauProducer = cms.InputTag("hpsTancTaus" + _TYPE_LABEL),
-    cut = cms.string(_KIN_CUT + " && decayMode == %i" % _decay_mode_name),
+    cut = cms.string(_KIN_CUT + " && (%s)" % " || ".join(
+        "decayMode == %i" % decay_mode_name
+        for decay_mode_name in sorted(_decay_modes.values()))),
     Prediscriminants = noPrediscriminants,
 )
 
@@ -184,7 +271,7 @@ process.TauTagMVAComputerRecord.appendToDataLabel = cms.string("hpstanc")
 # It doesn't really matter for evaluating the mode.
 pileup_cut = 'pt > 15 & jetRef().pt > 20'
 
-process.cleanTauPlots = cms.EDAnalyzer(
+cleanTauPlotsPrototype = cms.EDAnalyzer(
     "RecoTauPlotDiscriminator",
     src = cms.InputTag("selectedDecayModeTaus"),
     plotPU = cms.bool(True),
@@ -199,10 +286,26 @@ process.cleanTauPlots = cms.EDAnalyzer(
     max = cms.double(1.5),
 )
 
-process.main += process.cleanTauPlots
-
-process.path = cms.Path(process.main)
+for suffix in sorted(_decay_modes.keys()):
+    cleanTauPlots = cleanTauPlotsPrototype.clone(
+        src = cms.InputTag("selectedDecayModeTaus" + suffix))
+    setattr(process, "cleanTauPlots" + suffix, cleanTauPlots)
+    process.main += cleanTauPlots
+
+if _sampling_plan is not None and _sampling_plan['prescale'] > 1:
+    # Only process every Nth event.  The products of the rejected events are
+    # never read.
+    process.sampler = cms.EDFilter(
+        "Prescaler",
+        prescaleFactor = cms.uint32(_sampling_plan['prescale']),
+        prescaleOffset = cms.uint32(0),
+    )
+    process.path = cms.Path(process.sampler*process.main)
+else:
+    process.path = cms.Path(process.main)
 
 process.options = cms.untracked.PSet(
     IgnoreCompletely = cms.untracked.vstring("MismatchedInputFIles"),
+    # Needed to count the processed events in the resource ledger
+    wantSummary = cms.untracked.bool(True),
 )
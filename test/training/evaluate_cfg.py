@@ -6,6 +6,9 @@ evaluate_cfg
 Compute the MVA training's performance on the validation sample and compare it
 to the other default algorithms.
 
+Only the tau modules needed to produce the plotted discriminators (see the
+[discriminators] dictionary) are run.
+
 Author: Evan K. Friis (UC Davis)
 
 '''
@@ -39,6 +42,17 @@ options.register(
     "Python file containing TaNC transform"
 )
 
+options.register(
+    'rekeyFlightPath', -1,
+    VarParsing.VarParsing.multiplicity.singleton,
+    VarParsing.VarParsing.varType.int,
+    "If rekeyFlightPath=1, match the taus to the skim taus to get the flight"
+    " path significance (for skims without hpsTancTausFlightPathByJet)."
+    " If 0, use hpsTancTausFlightPathByJet.  By default, use it only if the"
+    " first input file has it (pass it explicitly when the process is shared"
+    " by several jobs, i.e. with config_cache.py)."
+)
+
 options.parseArguments()
 
 _SIGNAL = False
@@ -125,15 +139,9 @@ process.kinematicBackgroundJets = cms.EDFilter(
 )
 process.backgroundSpecific = cms.Sequence(process.kinematicBackgroundJets)
 
-# Load the tau sequence
+# Load the tau sequence.  Only the modules needed for the discriminators we
+# plot are put on the path (see below).
 process.load("RecoTauTag.Configuration.RecoPFTauTag_cff")
-# Remove the lepton discrimination
-lepton_discriminants = [name for name in process.PFTau.moduleNames()
-                        if 'Muon' in name or 'Electron' in name]
-print "Removing lepton discriminants: %s" % " ".join(lepton_discriminants)
-for lepton_discriminant in lepton_discriminants:
-    module = getattr(process, lepton_discriminant)
-    process.PFTau.remove(module)
 
 # RecoTau modifier that takes a PFJet -> tau GenJet matching and embed the true
 # four vector and decay mode in unused PFTau variables
@@ -161,12 +169,13 @@ else:
 process.mediumShrinkingTaus = cms.EDFilter(
     "RecoTauDiscriminatorRefSelector",
     src = cms.InputTag("shrinkingConePFTauProducer"),
-    discriminator = cms.InputTag("shrinkingConePFTauDiscriminationByTaNCfrHalfPercent"),
+    discriminator = cms.InputTag(
+        "shrinkingConePFTauDiscriminationByTaNCWorkingPoints", "HalfPercent"),
     cut = cms.double(0.5),
     filter = cms.bool(False)
 )
 process.plotShrinkingRes = cms.EDAnalyzer(
-    "CandViewHistoAnalyzer",
+    "RecoTauCandViewHistoAnalyzer",
     src = cms.InputTag("mediumShrinkingTaus"),
     histograms = common.tau_histograms
 )
@@ -193,64 +202,105 @@ process.plotHPSTancRes = process.plotShrinkingRes.clone(
     src = cms.InputTag("mediumHPSTancTaus")
 )
 
-process.main = cms.Sequence(process.specific*process.ak5PFJets*process.PFTau)
-#process.main = cms.Sequence(process.specific*process.ak5PFJets*process.ak5PFJetsRecoTauPiZeros*process.combinatoricRecoTaus*process.hpsTancTauSequence)
-
-if _SIGNAL:
-    process.main += process.mediumShrinkingTaus
-    process.main += process.plotShrinkingRes
-    process.main += process.mediumHPSTaus
-    process.main += process.plotHPSRes
-    process.main += process.mediumHPSTancTaus
-    process.main += process.plotHPSTancRes
-
 ################################################################################
-##         Rekey flight path discriminators from skimming                    ###
+##         Get the flight path discriminators from skimming                  ###
 ################################################################################
-# We don't save the vertex, beamspot stuff, so we need to rekey our
-# discriminators for the flight path significance from the ones we made in the
-# skim
-process.load("RecoTauTag.TauTagTools.PFTauMatching_cfi")
-process.matchForRekeying = process.pfTauMatcher.clone(
-    src = cms.InputTag("hpsTancTaus"),
-    matched = cms.InputTag(
-        _SIGNAL and "hpsTancTausSignal" or "hpsTancTausBackground"),
-    resolveAmbiguities = cms.bool(True),
-    resolveByMatchQuality = cms.bool(True),
-)
-
+# We don't save the vertex, beamspot stuff, so the flight path significance
+# can't be recomputed.  The skim stores it keyed by the jets the taus are built
+# from, which are the same jets we rebuild the taus from here.
 from RecoTauTag.RecoTau.TauDiscriminatorTools import noPrediscriminants
 
-process.hpsTancTausDiscriminationByFlightPathRekey = cms.EDProducer(
-    "RecoTauRekeyDiscriminator",
-    PFTauProducer = cms.InputTag("hpsTancTaus"),
-    Prediscriminants = noPrediscriminants,
-    otherDiscriminator = cms.InputTag(
-        _SIGNAL and "hpsTancTausDiscriminationByFlightPathSignal"
-        or "hpsTancTausDiscriminationByFlightPathBackground"),
-    matching = cms.InputTag("matchForRekeying"),
-    verbose = cms.untracked.bool(False)
-)
-process.rekeyFlight = cms.Sequence(
-    process.matchForRekeying*process.hpsTancTausDiscriminationByFlightPathRekey)
+_FLIGHT_PATH_BY_JET = (_SIGNAL and "hpsTancTausFlightPathByJetSignal"
+                       or "hpsTancTausFlightPathByJetBackground")
+
+def _InputHasProduct(inputFiles, label):
+    ''' Check if the first input file has a product with module [label] '''
+    if not inputFiles:
+        return False
+    fileName = inputFiles[0]
+    if fileName.startswith('file:'):
+        fileName = fileName[len('file:'):]
+    # Remote files (i.e. /store/...) can't be checked here
+    if not os.path.isfile(fileName):
+        print "Can't check %s for %s, it isn't a local file" % (
+            fileName, label)
+        return False
+    import ROOT
+    ROOT.PyConfig.IgnoreCommandLineOptions = True
+    file = ROOT.TFile.Open(fileName)
+    if not file or file.IsZombie():
+        print "Can't check %s for %s, it can't be read" % (fileName, label)
+        return False
+    events = file.Get("Events")
+    found = bool(events) and any(
+        "_%s_" % label in branch.GetName()
+        for branch in events.GetListOfBranches())
+    file.Close()
+    print "Checked %s for %s: %s" % (
+        fileName, label, found and "found" or "not found")
+    return found
+
+_REKEY_FLIGHT_PATH = (options.rekeyFlightPath == 1)
+if options.rekeyFlightPath < 0:
+    _REKEY_FLIGHT_PATH = not _InputHasProduct(
+        options.inputFiles, _FLIGHT_PATH_BY_JET)
+    print "Flight path significance from %s" % (
+        _REKEY_FLIGHT_PATH and "rekeying the skim taus"
+        or _FLIGHT_PATH_BY_JET)
+
+if _REKEY_FLIGHT_PATH:
+    # Older skims: rekey the discriminators we made in the skim by matching
+    # the taus
+    process.load("RecoTauTag.TauTagTools.PFTauMatching_cfi")
+    process.matchForRekeying = process.pfTauMatcher.clone(
+        src = cms.InputTag("hpsTancTaus"),
+        matched = cms.InputTag(
+            _SIGNAL and "hpsTancTausSignal" or "hpsTancTausBackground"),
+        resolveAmbiguities = cms.bool(True),
+        resolveByMatchQuality = cms.bool(True),
+    )
+
+    process.hpsTancTausDiscriminationByFlightPathRekey = cms.EDProducer(
+        "RecoTauRekeyDiscriminator",
+        PFTauProducer = cms.InputTag("hpsTancTaus"),
+        Prediscriminants = noPrediscriminants,
+        otherDiscriminator = cms.InputTag(
+            _SIGNAL and "hpsTancTausDiscriminationByFlightPathSignal"
+            or "hpsTancTausDiscriminationByFlightPathBackground"),
+        matching = cms.InputTag("matchForRekeying"),
+        verbose = cms.untracked.bool(False)
+    )
+    process.skimFlightPath = cms.Sequence(
+        process.matchForRekeying*
+        process.hpsTancTausDiscriminationByFlightPathRekey)
+    _FLIGHT_PATH_DISCRIMINATOR = "hpsTancTausDiscriminationByFlightPathRekey"
+else:
+    process.hpsTancTausDiscriminationByFlightPathFromSkim = cms.EDProducer(
+        "RecoTauDiscriminationFromJetValueMap",
+        PFTauProducer = cms.InputTag("hpsTancTaus"),
+        Prediscriminants = noPrediscriminants,
+        src = cms.InputTag(_FLIGHT_PATH_BY_JET),
+    )
+    process.skimFlightPath = cms.Sequence(
+        process.hpsTancTausDiscriminationByFlightPathFromSkim)
+    _FLIGHT_PATH_DISCRIMINATOR = \
+            "hpsTancTausDiscriminationByFlightPathFromSkim"
 
 process.PFTau.replace(
     process.hpsTancTausDiscriminationByFlightPath,
-    process.rekeyFlight
+    process.skimFlightPath
 )
 process.hpsTancTausDiscriminationByTancRaw.discriminantOptions.\
         FlightPathSignificance.discSrc = cms.InputTag(
-            "hpsTancTausDiscriminationByFlightPathRekey"
-        )
+            _FLIGHT_PATH_DISCRIMINATOR)
 process.hpsTancTausDiscriminationByTancRaw.remapOutput = False
 
 # Plot the input jets to use in weighting the transformation
 process.plotAK5PFJets = cms.EDAnalyzer(
-    "CandViewHistoAnalyzer",
+    "RecoTauCandViewHistoAnalyzer",
     src = cms.InputTag("ak5PFJets"),
     histograms = common.jet_histograms
 )
-process.main += process.plotAK5PFJets
 
 ################################################################################
 ##         Prepare new TaNC discriminator                                    ###
@@ -302,10 +352,10 @@ discriminators['shrinkingConePFTauProducer'] = [
     #'shrinkingConePFTauDiscriminationByTrackIsolation',
     #'shrinkingConePFTauDiscriminationByECALIsolation',
     'shrinkingConePFTauDiscriminationByTaNC',
-    #'shrinkingConePFTauDiscriminationByTaNCfrOnePercent',
-    'shrinkingConePFTauDiscriminationByTaNCfrHalfPercent',
-    #'shrinkingConePFTauDiscriminationByTaNCfrQuarterPercent',
-    #'shrinkingConePFTauDiscriminationByTaNCfrTenthPercent'
+    #'shrinkingConePFTauDiscriminationByTaNCWorkingPoints:OnePercent',
+    'shrinkingConePFTauDiscriminationByTaNCWorkingPoints:HalfPercent',
+    #'shrinkingConePFTauDiscriminationByTaNCWorkingPoints:QuarterPercent',
+    #'shrinkingConePFTauDiscriminationByTaNCWorkingPoints:TenthPercent'
 ]
 
 discriminators['hpsTancTaus'] = [
@@ -350,14 +400,25 @@ process.plothpsPFTauProducer = process.plothpsTancTaus.clone(
     )
 )
 
-process.plots = cms.Sequence(
-    process.mediumHPSTaus *
-    process.plothpsTancTaus *
-    process.plotshrinkingConePFTauProducer *
-    process.plothpsPFTauProducer
-)
-
-process.main += process.plots
+_PLOTTERS = [
+    'plotAK5PFJets',
+    'plothpsTancTaus',
+    'plotshrinkingConePFTauProducer',
+    'plothpsPFTauProducer',
+]
+if _SIGNAL:
+    _PLOTTERS.extend(['plotShrinkingRes', 'plotHPSRes', 'plotHPSTancRes'])
+
+# Build a path with only the modules needed to produce the discriminators and
+# the plots, in dependency order.
+from RecoTauTag.TauTagTools.MinimalPathTools import \
+        minimalSequence, moduleDependencies, discriminatorLabels
+_NEEDED_MODULES = discriminatorLabels(discriminators) + _PLOTTERS
+print "Running %i of the %i tau modules" % (
+    len([label for label in moduleDependencies(process, _NEEDED_MODULES)
+         if label in process.PFTau.moduleNames()]),
+    len(process.PFTau.moduleNames()))
+process.main = minimalSequence(process, _NEEDED_MODULES)
 
 process.path = cms.Path(process.main)
 process.schedule = cms.Schedule(
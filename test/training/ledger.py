@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+'''
+
+ledger
+
+Keep a ledger of the resources used by each step of a training campaign.  Each
+finished pipeline task appends one JSON record (one per line) with its wall
+and CPU time, peak RSS, number of processed events and input/output bytes.
+
+Usage: ledger.py hpstancMLPNoTransform/ledger.jsonl [other/ledger.jsonl ...]
+
+Prints a per-stage comparison of the (latest) records in each ledger.
+
+'''
+
+import json
+import os
+import re
+import socket
+import sys
+import time
+
+# cmsRun prints this in the TrigReport when wantSummary = True
+_EVENTS_MATCHER = re.compile(r"TrigReport Events total = (?P<total>\d+)")
+
+# Extensions of text files containing lists of input files
+_FILE_LIST_EXTENSIONS = ['.list', '.test', '.tiny']
+
+def wait_with_rusage(process, block=False):
+    '''
+    Wait for a subprocess.Popen [process] and return (returncode, rusage), or
+    None if it hasn't finished and [block] is False.  The resource usage
+    includes all the processes the child waited for (i.e. cmsRun started by
+    the shell).
+    '''
+    pid, status, rusage = os.wait4(process.pid, not block and os.WNOHANG or 0)
+    if pid == 0:
+        return None
+    if os.WIFSIGNALED(status):
+        process.returncode = -os.WTERMSIG(status)
+    else:
+        process.returncode = os.WEXITSTATUS(status)
+    return process.returncode, rusage
+
+def file_bytes(paths):
+    '''
+    Sum the sizes of [paths].  For lists of input files, the sizes of the
+    listed files that are available locally are used.
+    '''
+    total = 0
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        if os.path.splitext(path)[1] in _FILE_LIST_EXTENSIONS:
+            file_list = open(path, 'r')
+            total += file_bytes(line.strip().replace('file:', '', 1)
+                                for line in file_list if line.strip())
+            file_list.close()
+        else:
+            total += os.path.getsize(path)
+    return total
+
+def events_processed(log_file):
+    ''' Get the number of events processed by cmsRun from its log '''
+    if not log_file or not os.path.exists(log_file):
+        return None
+    events = None
+    log = open(log_file, 'r')
+    for line in log:
+        match = _EVENTS_MATCHER.search(line)
+        if match:
+            events = int(match.group('total'))
+    log.close()
+    return events
+
+def make_record(campaign, task, wall_time, rusage, returncode, log_file=None):
+    ''' Build a ledger record for a finished pipeline Task '''
+    events = events_processed(log_file)
+    record = {
+        'campaign' : campaign,
+        'task' : task.name,
+        'stage' : task.stage,
+        'host' : socket.gethostname(),
+        'finished' : time.time(),
+        'returncode' : returncode,
+        'wall_time' : wall_time,
+        'user_time' : rusage.ru_utime,
+        'system_time' : rusage.ru_stime,
+        'cpu_time' : rusage.ru_utime + rusage.ru_stime,
+        # ru_maxrss is in kB on Linux
+        'peak_rss_mb' : rusage.ru_maxrss/1024.,
+        'events' : events,
+        'events_per_second' : (events is not None and wall_time > 0
+                               and events/wall_time or None),
+        'input_bytes' : file_bytes(task.inputs),
+        'output_bytes' : file_bytes(task.outputs),
+    }
+    return record
+
+def append(ledger_file, record):
+    ledger = open(ledger_file, 'a')
+    ledger.write(json.dumps(record, sort_keys=True) + '\n')
+    ledger.close()
+
+def load(ledger_file):
+    ''' Load a ledger, keeping only the latest record for each task '''
+    records = {}
+    ledger = open(ledger_file, 'r')
+    for line in ledger:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        records[record['task']] = record
+    ledger.close()
+    return records.values()
+
+def summarize_stages(records):
+    ''' Sum the records of a ledger for each stage '''
+    stages = {}
+    for record in records:
+        stage = stages.setdefault(record['stage'], {
+            'tasks' : 0, 'wall_time' : 0.0, 'cpu_time' : 0.0,
+            'peak_rss_mb' : 0.0, 'events' : 0, 'input_bytes' : 0,
+            'output_bytes' : 0,
+        })
+        stage['tasks'] += 1
+        for key in ['wall_time', 'cpu_time', 'input_bytes', 'output_bytes']:
+            stage[key] += record[key]
+        stage['events'] += record['events'] or 0
+        stage['peak_rss_mb'] = max(stage['peak_rss_mb'],
+                                   record['peak_rss_mb'])
+    for stage in stages.values():
+        stage['events_per_second'] = (stage['wall_time'] and
+                                      stage['events']/stage['wall_time'] or 0)
+    return stages
+
+def report(ledger_files):
+    ''' Print a per-stage comparison of several ledgers '''
+    summaries = []
+    for ledger_file in ledger_files:
+        records = load(ledger_file)
+        campaign = records and records[0]['campaign'] or ledger_file
+        summaries.append((campaign, summarize_stages(records)))
+    all_stages = sorted(set(stage for campaign, stages in summaries
+                            for stage in stages))
+    print "%-20s %-25s %5s %10s %10s %9s %10s %10s %10s" % (
+        'stage', 'campaign', 'tasks', 'wall [s]', 'cpu [s]', 'RSS [MB]',
+        'events/s', 'in [MB]', 'out [MB]')
+    for stage_name in all_stages:
+        for campaign, stages in summaries:
+            if stage_name not in stages:
+                continue
+            stage = stages[stage_name]
+            print "%-20s %-25s %5i %10.1f %10.1f %9.0f %10.1f %10.1f %10.1f" % (
+                stage_name, campaign, stage['tasks'], stage['wall_time'],
+                stage['cpu_time'], stage['peak_rss_mb'],
+                stage['events_per_second'], stage['input_bytes']/1048576.,
+                stage['output_bytes']/1048576.)
+    for campaign, stages in summaries:
+        total_wall = sum(stage['wall_time'] for stage in stages.values())
+        if not total_wall:
+            continue
+        dominant = max(stages, key=lambda name: stages[name]['wall_time'])
+        print "%s: %0.1fs total, dominated by %s (%0.0f%%)" % (
+            campaign, total_wall, dominant,
+            100*stages[dominant]['wall_time']/total_wall)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print "Usage: %s ledger.jsonl [ledger.jsonl ...]" % sys.argv[0]
+        sys.exit(1)
+    report(sys.argv[1:])
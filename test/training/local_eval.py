@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+'''
+
+local_eval
+
+Run the evaluation of a training (evaluate_cfg.py) as an array of local jobs,
+the same way the CRAB evaluation targets would on the grid.  The signal and
+background test file lists are split into shards of a few files each, and the
+shards are run in parallel on the cores of the machine.  Failed shards are
+retried, and the shard outputs are merged with hadd into signal_result.root and
+background_result.root.
+
+Shards that already succeeded with the same inputs are not rerun, so the job
+array can be resumed after a failure.  The assembled evaluate_cfg.py process
+is cached (see config_cache.py), so it is only built once: the shards starting
+at the same time wait for the first one to build it.
+
+Usage: local_eval.py -db computers.db -transform transforms.py -dir outdir
+
+'''
+
+import os
+import sys
+
+import pipeline
+
+# The evaluation jobs for each sample: (name, signal flag, default file list)
+_SAMPLES = [
+    ('signal', 1, 'signalfiles.test'),
+    ('background', 0, 'backgroundfiles.test'),
+]
+
+def read_file_list(file_list):
+    input = open(file_list, 'r')
+    files = [line.strip() for line in input if line.strip()]
+    input.close()
+    return files
+
+def write_shards(files, files_per_job, shard_dir, sample):
+    ''' Split [files] into lists of [files_per_job] files in [shard_dir] '''
+    if not os.path.exists(shard_dir):
+        os.makedirs(shard_dir)
+    shards = []
+    for index, first in enumerate(range(0, len(files), files_per_job)):
+        shard_file = os.path.join(shard_dir, '%s_%i.list' % (sample, index))
+        contents = "".join(
+            file + '\n' for file in files[first:first+files_per_job])
+        # Don't touch the shard lists if they didn't change
+        if not os.path.exists(shard_file) or \
+           open(shard_file, 'r').read() != contents:
+            output = open(shard_file, 'w')
+            output.write(contents)
+            output.close()
+        shards.append(shard_file)
+    return shards
+
+def build_tasks(db, transform, dir, file_lists, files_per_job, retries,
+                rekey_flight_path=1):
+    '''
+    Build the shard evaluation and merging tasks for each sample.  The flight
+    path method is passed explicitly, since the shards share one cached
+    process and can't each check their own input files.
+    '''
+    shard_dir = os.path.join(dir, 'shards')
+    result_dir = os.path.join(dir, 'res')
+    cache_dir = os.path.join(dir, 'config_cache')
+    tasks = []
+    for sample, signal, file_list in _SAMPLES:
+        shards = write_shards(read_file_list(file_lists[sample]),
+                              files_per_job, shard_dir, sample)
+        shard_outputs = []
+        for index, shard in enumerate(shards):
+            output = os.path.join(result_dir, '%s_%i.root' % (sample, index))
+            shard_outputs.append(output)
+            tasks.append(pipeline.Task(
+                'evaluate_%s_%i' % (sample, index),
+                # All the shards share the same cached process
+                './config_cache.py --cache-dir %s evaluate_cfg.py '
+                'inputFiles_load=%s signal=%i db=%s '
+                'transform=%s rekeyFlightPath=%i outputFile=%s' % (
+                    cache_dir, shard, signal, db, transform,
+                    rekey_flight_path, output),
+                inputs=['evaluate_cfg.py', 'config_cache.py', db, transform,
+                        shard],
+                outputs=[output], memory=pipeline._CMSRUN_EVAL_MEMORY,
+                retries=retries))
+        merged = os.path.join(dir, '%s_result.root' % sample)
+        tasks.append(pipeline.Task(
+            'hadd_' + sample, 'hadd -f %s %s' % (
+                merged, " ".join(shard_outputs)),
+            inputs=shard_outputs, outputs=[merged]))
+    return tasks
+
+if __name__ == "__main__":
+    from RecoLuminosity.LumiDB import argparse
+    import multiprocessing
+
+    parser = argparse.ArgumentParser(
+        description = "Evaluate a TaNC training with an array of local jobs")
+    parser.add_argument('-db', required=True, help='Database with trained MVA')
+    parser.add_argument('-transform', required=True,
+                        help='Python file containing TaNC transform')
+    parser.add_argument('-dir', required=True, help='Output directory')
+    parser.add_argument('-signal', default='signalfiles.test',
+                        help='Signal file list')
+    parser.add_argument('-background', default='backgroundfiles.test',
+                        help='Background file list')
+    parser.add_argument('-n', '--files-per-job', type=int, default=5,
+                        help='Number of input files per job')
+    parser.add_argument('-j', '--jobs', type=int,
+                        default=multiprocessing.cpu_count(),
+                        help='Maximum number of concurrent jobs')
+    parser.add_argument('--memory', type=int, default=pipeline._total_memory(),
+                        help='Maximum memory (MB) for concurrent jobs')
+    parser.add_argument('--retries', type=int, default=2,
+                        help='Number of times to retry a failed job')
+    parser.add_argument('--rekey-flight-path', type=int, choices=[0, 1],
+                        default=1,
+                        help='1 to get the flight path significance by '
+                        'matching the skim taus (skims without '
+                        'hpsTancTausFlightPathByJet), 0 to use '
+                        'hpsTancTausFlightPathByJet')
+    options = parser.parse_args()
+
+    tasks = build_tasks(
+        options.db, options.transform, options.dir,
+        {'signal' : options.signal, 'background' : options.background},
+        options.files_per_job, options.retries, options.rekey_flight_path)
+    runner = pipeline.Pipeline(
+        tasks, state_file=os.path.join(options.dir, 'local_eval_state.json'),
+        log_dir=os.path.join(options.dir, 'log'),
+        cpus=options.jobs, memory=options.memory,
+        ledger_file=os.path.join(options.dir, 'ledger.jsonl'),
+        campaign=os.path.basename(os.path.normpath(options.dir)))
+    if not runner.run([task.name for task in tasks]):
+        sys.exit(1)
+    sys.exit(0)
@@ -4,15 +4,28 @@
 Produce a plot comparing the discriminator performance for a number of different
 tau ID discriminator.
 
+Usage: make_eval_plots.py [--incremental] output.pdf signal.root background.root
+
+In incremental mode, each output plot is fingerprinted by the contents of the
+histograms it is built from and its styling parameters.  Plots whose
+fingerprint matches the one recorded in the manifest (output.pdf.manifest) of
+the previous run are not re-rendered.
+
 Author: Evan K. Friis
 
 '''
 import math
+import hashlib
+import json
+import os
 
 import sys
-output_file = sys.argv[1]
-signal_input = sys.argv[2]
-background_input = sys.argv[3]
+_INCREMENTAL = '--incremental' in sys.argv
+_args = [arg for arg in sys.argv[1:] if arg != '--incremental']
+output_file = _args[0]
+signal_input = _args[1]
+background_input = _args[2]
+manifest_file = output_file + '.manifest'
 
 import ROOT
 ROOT.gROOT.SetBatch(True)
@@ -89,16 +102,18 @@ discriminators['hpsPFTauProducer'] = [
     'hpsPFTauDiscriminationByTightIsolation',
 ]
 
+# The histograms of a discriminator with an instance label are named
+# [label][instance]
 discriminators['shrinkingConePFTauProducer'] = [
     #'shrinkingConePFTauDiscriminationByLeadingPionPtCut',
     #'shrinkingConePFTauDiscriminationByIsolation',
     #'shrinkingConePFTauDiscriminationByTrackIsolation',
     #'shrinkingConePFTauDiscriminationByECALIsolation',
     #'shrinkingConePFTauDiscriminationByTaNC',
-    #'shrinkingConePFTauDiscriminationByTaNCfrOnePercent',
-    'shrinkingConePFTauDiscriminationByTaNCfrHalfPercent',
-    #'shrinkingConePFTauDiscriminationByTaNCfrQuarterPercent',
-    #'shrinkingConePFTauDiscriminationByTaNCfrTenthPercent'
+    #'shrinkingConePFTauDiscriminationByTaNCWorkingPointsOnePercent',
+    'shrinkingConePFTauDiscriminationByTaNCWorkingPointsHalfPercent',
+    #'shrinkingConePFTauDiscriminationByTaNCWorkingPointsQuarterPercent',
+    #'shrinkingConePFTauDiscriminationByTaNCWorkingPointsTenthPercent'
 ]
 
 discriminators['hpsTancTaus'] = [
@@ -130,10 +145,10 @@ discriminator_translator = {
     'shrinkingConePFTauDiscriminationByTrackIsolation' : 'track isolation',
     'shrinkingConePFTauDiscriminationByECALIsolation' : 'ecal isolation',
     'shrinkingConePFTauDiscriminationByTaNC' : 'TaNC ',
-    'shrinkingConePFTauDiscriminationByTaNCfrOnePercent' : 'TaNC 1.00% ',
-    'shrinkingConePFTauDiscriminationByTaNCfrHalfPercent' : 'TaNC 0.50% ',
-    'shrinkingConePFTauDiscriminationByTaNCfrQuarterPercent' : 'TaNC 0.25% ',
-    'shrinkingConePFTauDiscriminationByTaNCfrTenthPercent' : 'TaNC 0.10% ',
+    'shrinkingConePFTauDiscriminationByTaNCWorkingPointsOnePercent' : 'TaNC 1.00% ',
+    'shrinkingConePFTauDiscriminationByTaNCWorkingPointsHalfPercent' : 'TaNC 0.50% ',
+    'shrinkingConePFTauDiscriminationByTaNCWorkingPointsQuarterPercent' : 'TaNC 0.25% ',
+    'shrinkingConePFTauDiscriminationByTaNCWorkingPointsTenthPercent' : 'TaNC 0.10% ',
     'hpsTancTausDiscriminationByDecayModeSelection' : 'decay finding',
     'hpsTancTausDiscriminationByTanc' : 'scan',
     'hpsTancTausDiscriminationByTancLoose' : 'loose',
@@ -150,7 +165,7 @@ disc_to_plot = ['shrinkingConePFTauProducer', 'hpsPFTauProducer', 'hpsTancTaus']
 
 pt_curves_to_plot = [
     #('shrinkingConePFTauProducer',
-     #'shrinkingConePFTauDiscriminationByTaNCfrHalfPercent'),
+     #'shrinkingConePFTauDiscriminationByTaNCWorkingPointsHalfPercent'),
     ('hpsPFTauProducer',
      'hpsPFTauDiscriminationByDecayModeFinding'),
     ('hpsPFTauProducer',
@@ -179,6 +194,13 @@ _DENOM_PLOT_TYPE = {
     'background' : '_pt_jetPt', # compare to reconstructed total jet pt
 }
 
+# Cut applied to the discriminator output when computing the pt and PU
+# efficiencies
+_DISCRIMINATOR_CUT = 0.975
+
+good_markers = [20, 21, 24, 26, 22, 26, 20, 21, 24, 26, 22 ]
+#good_colors = [ROOT.EColor.kRed, ROOT.EColor.kBlue, ROOT.EColor.kGreen + 2]
+
 def binomial_eff_and_error(passed, total):
     if total == 0:
         return (0,0)
@@ -186,105 +208,210 @@ def binomial_eff_and_error(passed, total):
     error = math.sqrt((passed*1.0/(total*total))*(1-eff))
     return (eff, error)
 
+def histogram_fingerprint(histo):
+    ''' Hash the binning and bin contents (incl. under/overflow) of a histo '''
+    digest = hashlib.md5(histo.ClassName())
+    for axis in [histo.GetXaxis(), histo.GetYaxis(), histo.GetZaxis()]:
+        digest.update("%i %r %r" % (
+            axis.GetNbins(), axis.GetXmin(), axis.GetXmax()))
+    contents = histo.GetArray()
+    contents.SetSize(histo.GetSize())
+    digest.update(buffer(contents))
+    return digest.hexdigest()
+
+def input_histograms(file, producer, discriminator, sample):
+    ''' Get the raw histograms used to make the plots for a discriminator '''
+    producer_folder = file.Get("plot"+producer)
+    return {
+        'raw' : producer_folder.Get(
+            discriminator + _DENOM_PLOT_TYPE[sample]),
+        'truePU' : producer_folder.Get(discriminator + "_truePU"),
+        'recoPU' : producer_folder.Get(discriminator + "_recoPU"),
+    }
+
+def plot_fingerprint(input_fingerprints, styling):
+    ''' Combine the input histogram fingerprints with the styling options '''
+    digest = hashlib.md5(repr(styling))
+    for input_fingerprint in input_fingerprints:
+        digest.update(input_fingerprint)
+    return digest.hexdigest()
+
+def load_manifest(filename):
+    if not os.path.exists(filename):
+        return {}
+    manifest = open(filename, 'r')
+    try:
+        return json.load(manifest)
+    except ValueError:
+        print "WARNING: can't parse plot manifest %s, ignoring it" % filename
+        return {}
+    finally:
+        manifest.close()
+
+def load_discriminator(sample, inputs):
+    ''' Build the projections and PU graphs for a given discriminator '''
+    raw_histo = inputs['raw']
+
+    min_denom_bin = raw_histo.GetZaxis().FindBin(_DENOM_CUT[sample])
+
+    # Get the minimum bin corresponding to the reco pt cut
+    min_pt_bin = raw_histo.GetYaxis().FindBin(_PT_CUT)
+
+    raw_histo.GetYaxis().SetRange(
+        min_pt_bin, raw_histo.GetNbinsY()+1)
+    raw_histo.GetZaxis().SetRange(
+        min_denom_bin, raw_histo.GetNbinsZ()+1)
+
+    projection = raw_histo.Project3D("x")
+
+    denom = raw_histo.Integral(
+        0, raw_histo.GetNbinsX()+1,
+        0, raw_histo.GetNbinsY()+1,
+        min_denom_bin, raw_histo.GetNbinsZ()+1)
+
+    # Now make projection for PT efficiency
+    raw_histo.GetXaxis().SetRange(0, raw_histo.GetNbinsX()+1)
+    raw_histo.GetYaxis().SetRange(0, raw_histo.GetNbinsY()+1)
+    pt_eff_denom = raw_histo.Project3D("denom_z")
+    pt_eff_vs_reco_pt_denom = raw_histo.Project3D("denom_y")
+
+    discriminator_cut = _DISCRIMINATOR_CUT
+
+    raw_histo.GetXaxis().SetRange(
+        raw_histo.GetXaxis().FindBin(discriminator_cut),
+        raw_histo.GetNbinsX()+1)
+    raw_histo.GetYaxis().SetRange(
+        min_pt_bin, raw_histo.GetNbinsY()+1)
+    pt_eff_numerator = raw_histo.Project3D("numerator_z")
+    pt_eff_vs_reco_pt_numerator = raw_histo.Project3D("numerator_y")
+
+    # Get the vertex information
+    vs_truePU = inputs['truePU']
+    vs_recoPU = inputs['recoPU']
+
+    truePU_graph = ROOT.TGraphErrors(vs_truePU.GetNbinsY())
+    recoPU_graph = ROOT.TGraphErrors(vs_recoPU.GetNbinsY())
+
+    # Compute the marginal efficiency in the numerator as a function
+    # of PU.
+    for histo, graph in [(vs_truePU, truePU_graph),
+                         (vs_recoPU, recoPU_graph)]:
+        for nPUVtx in range(0, histo.GetNbinsY()):
+            # TH2F bin index is offset by 1
+            ybin = nPUVtx + 1
+            vtx_projection = histo.ProjectionX(
+                "temp", ybin, ybin)
+            total_entries = vtx_projection.Integral()
+            passing_entries = vtx_projection.Integral(
+                vtx_projection.FindBin(discriminator_cut),
+                vtx_projection.GetNbinsX()+1)
+            efficiency = (
+                total_entries and passing_entries/total_entries
+                or 0.)
+            efficiency, error = binomial_eff_and_error(
+                passing_entries, total_entries)
+            graph.SetPoint(nPUVtx, nPUVtx, efficiency)
+            graph.SetPointError(nPUVtx, 0, error)
+            graph.Fit("pol1","Q")
+
+    #print "Mean X Proj:", projection.GetMean(1)
+    #print "Post cut entries:", projection.Integral()
+    return {
+        'disc' : projection,
+        'denominator' : denom,
+        'pt_eff_num' : pt_eff_numerator,
+        'pt_eff_denom' : pt_eff_denom,
+        'pt_eff_num_vs_reco_pt' : pt_eff_vs_reco_pt_numerator,
+        'pt_eff_denom_vs_reco_pt' : pt_eff_vs_reco_pt_denom,
+        'truePU' : truePU_graph,
+        'recoPU' : recoPU_graph
+    }
+
 canvas = ROOT.TCanvas("blah", "blah", 800, 1200)
 if __name__ == "__main__":
     steering = {}
     steering['signal'] = { 'file' : ROOT.TFile(signal_input, 'READ') }
     steering['background'] = { 'file' : ROOT.TFile(background_input, 'READ') }
 
-    print "Loading histograms"
-    # Load all the histograms
+    print "Fingerprinting input histograms"
+    # Get the raw histograms and fingerprint them.  The (expensive) projections
+    # are only built for the discriminators used by plots we actually redraw.
     for sample in ['signal', 'background']:
         sample_info = steering[sample]
+        sample_info['inputs'] = {}
+        sample_info['fingerprints'] = {}
         sample_info['algos'] = {}
         for producer in discriminators.keys():
+            sample_info['inputs'][producer] = {}
+            sample_info['fingerprints'][producer] = {}
             sample_info['algos'][producer] = {}
             for discriminator in discriminators[producer]:
-                print "Getting %s-%s" % (producer, discriminator)
-                producer_folder = sample_info['file'].Get("plot"+producer)
-                to_get = discriminator + _DENOM_PLOT_TYPE[sample]
-                raw_histo = producer_folder.Get(to_get)
-
-                min_denom_bin = raw_histo.GetZaxis().FindBin(_DENOM_CUT[sample])
-
-                # Get the minimum bin corresponding to the reco pt cut
-                min_pt_bin = raw_histo.GetYaxis().FindBin(_PT_CUT)
-
-                raw_histo.GetYaxis().SetRange(
-                    min_pt_bin, raw_histo.GetNbinsY()+1)
-                raw_histo.GetZaxis().SetRange(
-                    min_denom_bin, raw_histo.GetNbinsZ()+1)
-
-                projection = raw_histo.Project3D("x")
-
-                denom = raw_histo.Integral(
-                    0, raw_histo.GetNbinsX()+1,
-                    0, raw_histo.GetNbinsY()+1,
-                    min_denom_bin, raw_histo.GetNbinsZ()+1)
-
-                # Now make projection for PT efficiency
-                raw_histo.GetXaxis().SetRange(0, raw_histo.GetNbinsX()+1)
-                raw_histo.GetYaxis().SetRange(0, raw_histo.GetNbinsY()+1)
-                pt_eff_denom = raw_histo.Project3D("denom_z")
-                pt_eff_vs_reco_pt_denom = raw_histo.Project3D("denom_y")
-
-                discriminator_cut = 0.975
-
-                raw_histo.GetXaxis().SetRange(
-                    raw_histo.GetXaxis().FindBin(discriminator_cut),
-                    raw_histo.GetNbinsX()+1)
-                raw_histo.GetYaxis().SetRange(
-                    min_pt_bin, raw_histo.GetNbinsY()+1)
-                pt_eff_numerator = raw_histo.Project3D("numerator_z")
-                pt_eff_vs_reco_pt_numerator = raw_histo.Project3D("numerator_y")
-
-                # Get the vertex information
-                vs_truePU = producer_folder.Get(
-                    discriminator + "_truePU")
-                vs_recoPU = producer_folder.Get(
-                    discriminator + "_recoPU")
-
-                truePU_graph = ROOT.TGraphErrors(vs_truePU.GetNbinsY())
-                recoPU_graph = ROOT.TGraphErrors(vs_recoPU.GetNbinsY())
-
-                # Compute the marginal efficiency in the numerator as a function
-                # of PU.
-                for histo, graph in [(vs_truePU, truePU_graph),
-                                     (vs_recoPU, recoPU_graph)]:
-                    for nPUVtx in range(0, histo.GetNbinsY()):
-                        # TH2F bin index is offset by 1
-                        ybin = nPUVtx + 1
-                        vtx_projection = histo.ProjectionX(
-                            "temp", ybin, ybin)
-                        total_entries = vtx_projection.Integral()
-                        passing_entries = vtx_projection.Integral(
-                            vtx_projection.FindBin(discriminator_cut),
-                            vtx_projection.GetNbinsX()+1)
-                        efficiency = (
-                            total_entries and passing_entries/total_entries
-                            or 0.)
-                        efficiency, error = binomial_eff_and_error(
-                            passing_entries, total_entries)
-                        graph.SetPoint(nPUVtx, nPUVtx, efficiency)
-                        graph.SetPointError(nPUVtx, 0, error)
-                        graph.Fit("pol1","Q")
-
-                #print "Mean X Proj:", projection.GetMean(1)
-                #print "Post cut entries:", projection.Integral()
-                sample_info['algos'][producer][discriminator] = {
-                    'disc' : projection,
-                    'denominator' : denom,
-                    'pt_eff_num' : pt_eff_numerator,
-                    'pt_eff_denom' : pt_eff_denom,
-                    'pt_eff_num_vs_reco_pt' : pt_eff_vs_reco_pt_numerator,
-                    'pt_eff_denom_vs_reco_pt' : pt_eff_vs_reco_pt_denom,
-                    'truePU' : truePU_graph,
-                    'recoPU' : recoPU_graph
-                }
-                #sample_info['algos'][producer][discriminator + '_denominator']\
-                #        = projection.Integral()
-                #projection.Draw()
-                #canvas.SaveAs("hpstanc/eval/" +sample + "_"+ discriminator + ".png")
+                inputs = input_histograms(
+                    sample_info['file'], producer, discriminator, sample)
+                sample_info['inputs'][producer][discriminator] = inputs
+                sample_info['fingerprints'][producer][discriminator] = \
+                        [histogram_fingerprint(inputs[key])
+                         for key in sorted(inputs.keys())]
+
+    def get_algo(sample, producer, discriminator):
+        algos = steering[sample]['algos'][producer]
+        if discriminator not in algos:
+            print "Getting %s-%s" % (producer, discriminator)
+            algos[discriminator] = load_discriminator(
+                sample, steering[sample]['inputs'][producer][discriminator])
+        return algos[discriminator]
+
+    def fingerprint_inputs(producer_discriminators):
+        output = []
+        for sample in ['signal', 'background']:
+            for producer, discriminator in producer_discriminators:
+                output.extend(
+                    steering[sample]['fingerprints'][producer][discriminator])
+        return output
+
+    # Include the plotting code itself in the styling
+    this_script = open(__file__.replace('.pyc', '.py'), 'r')
+    script_fingerprint = hashlib.md5(this_script.read()).hexdigest()
+    this_script.close()
+
+    perf_curve_discriminators = [
+        (producer, discriminator) for producer in disc_to_plot
+        for discriminator in discriminators[producer]]
+    common_styling = (
+        script_fingerprint, good_colors, good_markers,
+        sorted(producer_translator.items()),
+        sorted(discriminator_translator.items()), _PT_CUT,
+        sorted(_DENOM_CUT.items()), sorted(_DENOM_PLOT_TYPE.items()),
+        _DISCRIMINATOR_CUT)
+
+    plot_files = {
+        'perf' : output_file,
+        'pt_eff' : output_file.replace('.pdf', '_pt_eff.pdf'),
+        'pt_eff_vs_reco_pt' : output_file.replace(
+            '.pdf', '_pt_eff_vs_reco_pt.pdf'),
+        'truePU' : output_file.replace('.pdf', '_truePU.pdf'),
+        'recoPU' : output_file.replace('.pdf', '_recoPU.pdf'),
+    }
+    plot_fingerprints = {}
+    plot_fingerprints['perf'] = plot_fingerprint(
+        fingerprint_inputs(perf_curve_discriminators),
+        ('perf', perf_curve_discriminators) + common_styling)
+    for plot in ['pt_eff', 'pt_eff_vs_reco_pt', 'truePU', 'recoPU']:
+        plot_fingerprints[plot] = plot_fingerprint(
+            fingerprint_inputs(pt_curves_to_plot),
+            (plot, pt_curves_to_plot) + common_styling)
+
+    previous_manifest = {}
+    if _INCREMENTAL:
+        previous_manifest = load_manifest(manifest_file)
+
+    def needs_update(plot):
+        filename = plot_files[plot]
+        if previous_manifest.get(filename) == plot_fingerprints[plot] and \
+           os.path.exists(filename):
+            print "%s is up to date, skipping" % filename
+            return False
+        return True
 
     # Build the master canvas and the sub pads
     #canvas = ROOT.TCanvas("blah", "blah", 800, 1200)
@@ -295,66 +422,71 @@ if __name__ == "__main__":
     #graph_pad = ROOT.TPad("graphpad", "graphpad", 0.1, 0.1, 0.7, 0.9)
     #graph_pad.cd()
 
-    good_markers = [20, 21, 24, 26, 22, 26, 20, 21, 24, 26, 22 ]
-    #good_colors = [ROOT.EColor.kRed, ROOT.EColor.kBlue, ROOT.EColor.kGreen + 2]
-    # The background histogram
-    histo = ROOT.TH1F("blank", "blank", 200, 0, 1.0)
-    histo.SetMinimum(8e-4)
-    histo.SetMaximum(0.5)
-    histo.GetXaxis().SetTitle("Signal efficiency")
-    histo.GetXaxis().SetRangeUser(0.0, 0.7)
-    histo.GetYaxis().SetTitle("Fake rate")
-    histo.SetTitle("")
-    #histo.SetStat(0)
-    histo.Draw()
-    #legend = ROOT.TLegend(0.6, 0.2, 0.9, 0.7)
-    legend = ROOT.TLegend(0.15, 0.4, 0.55, 0.85)
-    legend.SetFillStyle(0)
-    legend.SetBorderSize(0)
-
-    graphs = {}
-    for color, producer in zip(good_colors, disc_to_plot):
-        graphs[producer] = {}
-        for marker, discriminator in zip(
-            good_markers, discriminators[producer]):
-            print "Building perf curve graph:", producer, discriminator
-            new_graph = make_perf_curve2(
-                steering['signal']['algos'][producer][discriminator]['disc'],
-                steering['background']['algos'][producer][discriminator]['disc'],
-                steering['signal']['algos'][producer][discriminator]['denominator'],
-                steering['background']['algos'][producer][discriminator]['denominator'],
-            )
-            print "New graph has", new_graph.GetN(), " points"
-            new_graph.SetMarkerStyle(marker)
-            new_graph.SetMarkerColor(color)
-            new_graph.SetMarkerSize(1.5)
-            new_graph.SetLineColor(color)
-            new_graph.SetLineStyle(2)
-            new_graph.SetLineWidth(3)
-            graphs[producer][discriminator] = new_graph
-            print new_graph.GetN()
-            if new_graph.GetN() > 1:
-                new_graph.Draw("l")
-                legend.AddEntry(
-                    new_graph, "%s - %s" %
-                    (producer_translator[producer],
-                     discriminator_translator[discriminator]), "l")
-            else:
-                new_graph.Draw("P")
-                legend.AddEntry(
-                    new_graph, "%s - %s" %
-                    (producer_translator[producer],
-                     discriminator_translator[discriminator]), "p")
-
-    ROOT.gPad.SetLogy(True)
-    #legend_pad.cd()
-    legend.Draw()
-    ROOT.gPad.Update()
-    ROOT.gPad.SaveAs(output_file)
-
-    pt_legend = ROOT.TLegend(0.15, 0.65, 0.85, 0.85)
-    pt_legend.SetFillStyle(0)
-    pt_legend.SetBorderSize(0)
+    if needs_update('perf'):
+        # The background histogram
+        histo = ROOT.TH1F("blank", "blank", 200, 0, 1.0)
+        histo.SetMinimum(8e-4)
+        histo.SetMaximum(0.5)
+        histo.GetXaxis().SetTitle("Signal efficiency")
+        histo.GetXaxis().SetRangeUser(0.0, 0.7)
+        histo.GetYaxis().SetTitle("Fake rate")
+        histo.SetTitle("")
+        #histo.SetStat(0)
+        histo.Draw()
+        #legend = ROOT.TLegend(0.6, 0.2, 0.9, 0.7)
+        legend = ROOT.TLegend(0.15, 0.4, 0.55, 0.85)
+        legend.SetFillStyle(0)
+        legend.SetBorderSize(0)
+
+        graphs = {}
+        for color, producer in zip(good_colors, disc_to_plot):
+            graphs[producer] = {}
+            for marker, discriminator in zip(
+                good_markers, discriminators[producer]):
+                print "Building perf curve graph:", producer, discriminator
+                signal_algo = get_algo('signal', producer, discriminator)
+                background_algo = get_algo(
+                    'background', producer, discriminator)
+                new_graph = make_perf_curve2(
+                    signal_algo['disc'],
+                    background_algo['disc'],
+                    signal_algo['denominator'],
+                    background_algo['denominator'],
+                )
+                print "New graph has", new_graph.GetN(), " points"
+                new_graph.SetMarkerStyle(marker)
+                new_graph.SetMarkerColor(color)
+                new_graph.SetMarkerSize(1.5)
+                new_graph.SetLineColor(color)
+                new_graph.SetLineStyle(2)
+                new_graph.SetLineWidth(3)
+                graphs[producer][discriminator] = new_graph
+                print new_graph.GetN()
+                if new_graph.GetN() > 1:
+                    new_graph.Draw("l")
+                    legend.AddEntry(
+                        new_graph, "%s - %s" %
+                        (producer_translator[producer],
+                         discriminator_translator[discriminator]), "l")
+                else:
+                    new_graph.Draw("P")
+                    legend.AddEntry(
+                        new_graph, "%s - %s" %
+                        (producer_translator[producer],
+                         discriminator_translator[discriminator]), "p")
+
+        ROOT.gPad.SetLogy(True)
+        #legend_pad.cd()
+        legend.Draw()
+        ROOT.gPad.Update()
+        ROOT.gPad.SaveAs(plot_files['perf'])
+
+    def make_pt_legend():
+        pt_legend = ROOT.TLegend(0.15, 0.65, 0.85, 0.85)
+        pt_legend.SetFillStyle(0)
+        pt_legend.SetBorderSize(0)
+        return pt_legend
+
     pt_canvas = ROOT.TCanvas('pt', 'pt', 1000, 500)
     pt_canvas.Divide(2)
     signal_frame = ROOT.TH1F("sigbkg", "Signal efficiency", 10, 0, 300)
@@ -370,6 +502,9 @@ if __name__ == "__main__":
     for plot_type_suffix, sig_title, bkg_title in [
         ('', 'True tau p_{T}', 'Jet p_{T}'),
         ('_vs_reco_pt', 'Reco. vis. #tau p_{T}', 'Reco. vis. #tau p_{T}')]:
+        if not needs_update('pt_eff' + plot_type_suffix):
+            continue
+        pt_legend = make_pt_legend()
         pt_canvas.cd(1)
         signal_frame.GetXaxis().SetTitle(sig_title)
         signal_frame.Draw()
@@ -379,12 +514,10 @@ if __name__ == "__main__":
         background_frame.Draw()
         for color, (producer, discriminator) in zip(
             good_colors, pt_curves_to_plot):
-            signal_algos = steering['signal']['algos'][producer]
-            background_algos = steering['background']['algos'][producer]
-            signal_num = signal_algos[discriminator][
-                'pt_eff_num' + plot_type_suffix]
-            signal_denom = signal_algos[discriminator][
-                'pt_eff_denom' + plot_type_suffix]
+            signal_algo = get_algo('signal', producer, discriminator)
+            background_algo = get_algo('background', producer, discriminator)
+            signal_num = signal_algo['pt_eff_num' + plot_type_suffix]
+            signal_denom = signal_algo['pt_eff_denom' + plot_type_suffix]
             signal_num.Rebin(5)
             signal_denom.Rebin(5)
             pt_canvas.cd(1)
@@ -399,9 +532,8 @@ if __name__ == "__main__":
                     discriminator_translator[discriminator],
                 ), "p")
             keep.append(signal_eff)
-            background_num = background_algos[discriminator][
-                'pt_eff_num' + plot_type_suffix]
-            background_denom = background_algos[discriminator][
+            background_num = background_algo['pt_eff_num' + plot_type_suffix]
+            background_denom = background_algo[
                 'pt_eff_denom' + plot_type_suffix]
             background_num.Rebin(20)
             background_denom.Rebin(20)
@@ -414,8 +546,8 @@ if __name__ == "__main__":
             keep.append(background_eff)
 
         pt_legend.Draw()
-        pt_canvas.SaveAs(output_file.replace(
-            '.pdf', '_pt_eff' + plot_type_suffix + '.pdf'))
+        keep.append(pt_legend)
+        pt_canvas.SaveAs(plot_files['pt_eff' + plot_type_suffix])
 
     print "Making PU plots"
     vtx_signal = ROOT.TH1F("sig_vtx", "Efficiency vs. PU", 16, -0.5, 15.5)
@@ -429,16 +561,18 @@ if __name__ == "__main__":
 
     # Make vtx plots
     for puType in ['truePU', 'recoPU']:
+        if not needs_update(puType):
+            continue
+        pu_legend = make_pt_legend()
         pt_canvas.cd(1)
         vtx_signal.Draw()
         pt_canvas.cd(2)
         vtx_background.Draw()
         for color, (producer, discriminator) in zip(good_colors, pt_curves_to_plot):
             print "Making PU plots for", producer, discriminator
-            signal_algos = steering['signal']['algos'][producer]
-            background_algos = steering['background']['algos'][producer]
-            signal_graph = signal_algos[discriminator][puType]
-            background_graph = background_algos[discriminator][puType]
+            signal_graph = get_algo('signal', producer, discriminator)[puType]
+            background_graph = get_algo(
+                'background', producer, discriminator)[puType]
 
             signal_graph.SetMarkerStyle(20)
             signal_graph.SetMarkerColor(color)
@@ -450,6 +584,12 @@ if __name__ == "__main__":
             signal_graph.GetFunction("pol1").SetLineStyle(2)
             signal_graph.GetFunction("pol1").SetLineWidth(1)
             signal_graph.GetFunction("pol1").SetLineColor(color)
+            pu_legend.AddEntry(
+                signal_graph,
+                "%s - %s" % (
+                    producer_translator[producer],
+                    discriminator_translator[discriminator],
+                ), "p")
             keep.append(signal_graph)
 
             background_graph.SetMarkerStyle(20)
@@ -464,7 +604,12 @@ if __name__ == "__main__":
             background_graph.Draw("ep")
             keep.append(background_graph)
 
-        pt_legend.Draw()
-        pt_canvas.SaveAs(output_file.replace('.pdf', '_%s.pdf' % puType))
-
+        pu_legend.Draw()
+        keep.append(pu_legend)
+        pt_canvas.SaveAs(plot_files[puType])
 
+    # Record what we made, so the next incremental run can skip it
+    manifest = open(manifest_file, 'w')
+    json.dump(dict((plot_files[plot], plot_fingerprints[plot])
+                   for plot in plot_files), manifest, indent=2)
+    manifest.close()
@@ -0,0 +1,482 @@
+#!/usr/bin/env python
+'''
+
+pipeline
+
+Run the TaNC training chain (train -> dump -> merge -> transform -> evaluate ->
+plot) defined in the Makefile as a DAG of tasks.
+
+A task is only rerun if the content hash of its inputs (files and command
+line) changed since its last successful run, so modifying one decay mode's
+files does not retrigger the other decay modes.  Independent tasks are run in
+parallel within a CPU and memory budget.  The state of each task is saved as
+soon as it finishes, so rerunning after a failure resumes where it stopped.
+
+Usage: pipeline.py [-d hpstancMLPNoTransform] [-j 8] [--memory 16000] [target ...]
+
+'''
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+import ledger
+
+# Decay modes to train, and the (tracks, pizeros) they correspond to
+_DECAY_MODES = {
+    '1prong0pi0' : (1, 0),
+    '1prong1pi0' : (1, 1),
+    '1prong2pi0' : (1, 2),
+    '3prong0pi0' : (3, 0),
+}
+# There isn't enough signal to train the 1prong2pi0 MVA, use the 1prong1pi0
+_COPIED_DECAY_MODES = {
+    '1prong2pi0' : '1prong1pi0',
+}
+
+# Rough peak memory use (MB) of the different kinds of tasks
+_CMSRUN_TRAIN_MEMORY = 2000
+_CMSRUN_EVAL_MEMORY = 1500
+_CMSRUN_DB_MEMORY = 500
+_SCRIPT_MEMORY = 300
+
+# How often to check for finished tasks (seconds)
+_POLL_INTERVAL = 1.0
+
+class Task(object):
+    '''
+    A step in the pipeline.  The [command] is run with the shell after all the
+    tasks producing its [inputs] are finished, and must produce [outputs].
+    The [stage] (by default the name up to the first underscore) groups tasks
+    in the resource ledger.  A failed task is rerun up to [retries] times.
+    '''
+    def __init__(self, name, command, inputs, outputs,
+                 cpus=1, memory=_SCRIPT_MEMORY, stage=None, retries=0):
+        self.name = name
+        self.stage = stage or name.split('_')[0]
+        self.retries = retries
+        self.attempts = 0
+        self.command = command
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.cpus = cpus
+        self.memory = memory
+        # Filled by the pipeline
+        self.dependencies = []
+        self.hash = None
+        self.status = 'pending'
+        self.duration = 0.0
+        self.process = None
+        self.log = None
+        self.started = None
+
+class FileHasher(object):
+    ''' Compute content hashes of files, memoized on their size and mtime '''
+    def __init__(self, cache=None):
+        self.cache = cache is not None and cache or {}
+
+    def __call__(self, path):
+        if not os.path.exists(path):
+            return 'missing'
+        stat = os.stat(path)
+        stamp = [stat.st_size, stat.st_mtime]
+        cached = self.cache.get(path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        digest = hashlib.md5()
+        file = open(path, 'rb')
+        try:
+            block = file.read(1 << 20)
+            while block:
+                digest.update(block)
+                block = file.read(1 << 20)
+        finally:
+            file.close()
+        self.cache[path] = [stamp, digest.hexdigest()]
+        return digest.hexdigest()
+
+class Pipeline(object):
+    '''
+    Schedule a set of Tasks.  The state of the previous runs is stored in the
+    JSON [state_file].  The resources used by each task are appended to the
+    [ledger_file], if given.
+    '''
+    def __init__(self, tasks, state_file, log_dir, cpus=1, memory=None,
+                 ledger_file=None, campaign=None):
+        self.tasks = dict((task.name, task) for task in tasks)
+        self.state_file = state_file
+        self.ledger_file = ledger_file
+        self.campaign = campaign
+        self.log_dir = log_dir
+        self.cpus = cpus
+        self.memory = memory
+        self.state = {'tasks' : {}, 'files' : {}}
+        if os.path.exists(state_file):
+            state = open(state_file, 'r')
+            try:
+                self.state = json.load(state)
+            except ValueError:
+                print "WARNING: can't parse pipeline state %s, ignoring it" % (
+                    state_file)
+            state.close()
+        self.hasher = FileHasher(self.state['files'])
+        # Figure out the dependencies by matching inputs to outputs
+        producers = {}
+        for task in tasks:
+            for output in task.outputs:
+                producers[output] = task
+        for task in tasks:
+            task.dependencies = []
+            for input in task.inputs:
+                if input in producers and \
+                   producers[input] not in task.dependencies:
+                    task.dependencies.append(producers[input])
+
+    def select(self, targets):
+        ''' Get all the tasks needed to produce the named tasks or files '''
+        producers = {}
+        for task in self.tasks.values():
+            for output in task.outputs:
+                producers[output] = task
+        to_visit = []
+        for target in targets:
+            if target in self.tasks:
+                to_visit.append(self.tasks[target])
+            elif target in producers:
+                to_visit.append(producers[target])
+            else:
+                raise KeyError("Unknown pipeline target: %s" % target)
+        selected = {}
+        while to_visit:
+            task = to_visit.pop()
+            if task.name not in selected:
+                selected[task.name] = task
+                to_visit.extend(task.dependencies)
+        return selected
+
+    def compute_hash(self, task):
+        digest = hashlib.md5(task.command)
+        for input in task.inputs:
+            digest.update(input)
+            digest.update(self.hasher(input))
+        return digest.hexdigest()
+
+    def up_to_date(self, task):
+        previous = self.state['tasks'].get(task.name, {})
+        return (previous.get('status') == 'done' and
+                previous.get('hash') == task.hash and
+                all(os.path.exists(output) for output in task.outputs))
+
+    def save_state(self):
+        temp_file = self.state_file + '.tmp'
+        state = open(temp_file, 'w')
+        json.dump(self.state, state, indent=2)
+        state.close()
+        os.rename(temp_file, self.state_file)
+
+    def log_file(self, task):
+        return os.path.join(self.log_dir, task.name + '.log')
+
+    def start(self, task):
+        for output in task.outputs:
+            output_dir = os.path.dirname(output)
+            if output_dir and not os.path.exists(output_dir):
+                os.makedirs(output_dir)
+        log_file = self.log_file(task)
+        print "Starting %s (log: %s)" % (task.name, log_file)
+        log = open(log_file, 'w')
+        log.write(task.command + '\n')
+        log.flush()
+        task.process = subprocess.Popen(
+            task.command, shell=True, stdout=log, stderr=subprocess.STDOUT)
+        task.log = log
+        task.started = time.time()
+        task.attempts += 1
+        task.status = 'running'
+
+    def finish(self, task, returncode, rusage):
+        task.log.close()
+        task.duration = time.time() - task.started
+        if self.ledger_file:
+            ledger.append(self.ledger_file, ledger.make_record(
+                self.campaign, task, task.duration, rusage, returncode,
+                self.log_file(task)))
+        missing = [output for output in task.outputs
+                   if not os.path.exists(output)]
+        if returncode == 0 and not missing:
+            task.status = 'done'
+            print "Finished %s in %0.1fs" % (task.name, task.duration)
+        elif task.attempts <= task.retries:
+            task.status = 'retry'
+            print "Retrying %s (exit code %i, attempt %i of %i)" % (
+                task.name, returncode, task.attempts, task.retries + 1)
+        else:
+            task.status = 'failed'
+            print "FAILED: %s (exit code %i, missing outputs: %s)" % (
+                task.name, returncode, " ".join(missing))
+        self.state['tasks'][task.name] = {
+            'hash' : task.hash,
+            'status' : task.status,
+            'duration' : task.duration,
+        }
+        self.save_state()
+
+    def run(self, targets, dry_run=False):
+        '''
+        Run all the tasks needed to produce [targets].  Returns True if
+        everything succeeded.
+        '''
+        if not os.path.exists(self.log_dir):
+            os.makedirs(self.log_dir)
+        selected = self.select(targets)
+        pending = dict(selected)
+        running = []
+        start_time = time.time()
+        while pending or running:
+            # Find tasks whose dependencies are all done
+            for name, task in sorted(pending.items()):
+                dep_status = [dep.status for dep in task.dependencies]
+                if 'failed' in dep_status or 'skipped' in dep_status:
+                    print "Skipping %s, a dependency failed" % name
+                    task.status = 'skipped'
+                    del pending[name]
+                    continue
+                if [status for status in dep_status if status != 'done']:
+                    continue
+                if task.hash is None:
+                    task.hash = self.compute_hash(task)
+                if self.up_to_date(task):
+                    task.status = 'done'
+                    del pending[name]
+                    continue
+                if dry_run:
+                    print "Would run %s: %s" % (name, task.command)
+                    task.status = 'done'
+                    del pending[name]
+                    continue
+                # Check if we have enough resources to start it.  Always start
+                # something if nothing is running, even if it is over budget.
+                cpus_used = sum(running_task.cpus for running_task in running)
+                memory_used = sum(running_task.memory
+                                  for running_task in running)
+                if running and (
+                    cpus_used + task.cpus > self.cpus or
+                    (self.memory and memory_used + task.memory > self.memory)):
+                    continue
+                self.start(task)
+                running.append(task)
+                del pending[name]
+            if not running:
+                continue
+            time.sleep(_POLL_INTERVAL)
+            for task in list(running):
+                result = ledger.wait_with_rusage(task.process)
+                if result is not None:
+                    running.remove(task)
+                    self.finish(task, *result)
+                    if task.status == 'retry':
+                        task.status = 'pending'
+                        pending[task.name] = task
+        self.summarize(selected, time.time() - start_time)
+        return not [task for task in selected.values()
+                    if task.status in ('failed', 'skipped')]
+
+    def summarize(self, tasks, wall_time):
+        ''' Print the timing of the tasks on the critical path '''
+        finish_times = {}
+        critical_parent = {}
+        def finish_time(task):
+            if task.name not in finish_times:
+                parent = None
+                start = 0.0
+                for dep in task.dependencies:
+                    if finish_time(dep) > start:
+                        start = finish_time(dep)
+                        parent = dep
+                finish_times[task.name] = start + task.duration
+                critical_parent[task.name] = parent
+            return finish_times[task.name]
+        for task in tasks.values():
+            finish_time(task)
+        print "Pipeline summary: %i tasks, %0.1fs wall time" % (
+            len(tasks), wall_time)
+        for status in ['done', 'failed', 'skipped']:
+            names = sorted(name for name, task in tasks.iteritems()
+                           if task.status == status)
+            if names:
+                print " %s: %s" % (status, " ".join(names))
+        if not finish_times:
+            return
+        last = max(tasks.values(), key=lambda task: finish_times[task.name])
+        path = []
+        while last is not None:
+            path.append(last)
+            last = critical_parent[last.name]
+        print "Critical path (%0.1fs):" % finish_times[path[0].name]
+        for task in reversed(path):
+            print "  %-40s %8.1fs" % (task.name, task.duration)
+
+def build_tasks(dir, train_dir='train'):
+    '''
+    Build the list of tasks corresponding to the Makefile targets for the
+    training in [dir].
+    '''
+    trans = os.path.join(dir, 'transform')
+    db = os.path.join(dir, 'db')
+    eval = os.path.join(dir, 'eval')
+    xml = os.path.join(dir, 'xml')
+    tasks = []
+
+    # Train all the MVAs in one pass
+    trained_modes = [mode for mode in sorted(_DECAY_MODES.keys())
+                     if mode not in _COPIED_DECAY_MODES]
+    db_file = os.path.join(db, 'training.db')
+    temp_db_file = os.path.join(db, 'training.db.temp.db')
+    xml_files = [os.path.join(xml, mode + '.xml') for mode in trained_modes]
+    tasks.append(Task(
+        'train',
+        'nice cmsRun train_cfg.py xml=%s '
+        'inputFiles_load=signalfiles.list '
+        'inputFiles_load=backgroundfiles.list '
+        'outputFile=%s && mv %s %s' % (
+            ",".join(xml_files), temp_db_file, temp_db_file, db_file),
+        inputs=xml_files + ['signalfiles.list', 'backgroundfiles.list',
+                            'train_cfg.py'],
+        outputs=[db_file], memory=_CMSRUN_TRAIN_MEMORY))
+
+    # Dump the .mva files and merge the computers (incl. the copied ones)
+    # together in one job
+    computers = os.path.join(db, 'computers.db')
+    mva_files = [os.path.join(db, mode + '.mva')
+                 for mode in sorted(_DECAY_MODES.keys())]
+    tasks.append(Task(
+        'bulk_db', 'rm -f %s && ./bulk_db.py db=%s:Train %s dumpDir=%s '
+        'outputDB=%s outputTag=Tanc' % (
+            computers, db_file, " ".join(
+                'copy=%s:%s' % (mode, source_mode) for mode, source_mode in
+                sorted(_COPIED_DECAY_MODES.items())),
+            db, computers),
+        inputs=[db_file, 'bulk_db.py'], outputs=mva_files + [computers],
+        memory=_CMSRUN_DB_MEMORY, stage='db'))
+
+    # Training control plots (the copied MVAs don't have any)
+    for mode in sorted(_DECAY_MODES.keys()):
+        if mode in _COPIED_DECAY_MODES:
+            continue
+        mva_file = os.path.join(db, mode + '.mva')
+        tasks.append(Task(
+            'traincontrol_' + mode,
+            './training_control_plots.py %s %s' % (
+                os.path.join(train_dir, 'train_%s_%s_output.root' % (
+                    mode, os.path.basename(dir))),
+                os.path.join(eval, mode)),
+            inputs=[mva_file, 'training_control_plots.py'],
+            outputs=[os.path.join(eval, mode, 'correlations.png')]))
+
+    # Fill the TaNC output of all decay modes in one pass over each sample
+    modes = sorted(_DECAY_MODES.keys())
+    transform_inputs = {}
+    for sample, signal, file_list in [
+        ('signal', 1, 'signalfiles.list'),
+        ('background', 0, 'backgroundfiles.list')]:
+        output = os.path.join(trans, '%s_transform.root' % sample)
+        transform_inputs[sample] = output
+        tasks.append(Task(
+            'evaluateMode_' + sample,
+            './evaluateMode_cfg.py inputFiles_load=%s db=%s '
+            'outputFile=%s signal=%i modes=%s' % (
+                file_list, computers, output, signal, ",".join(modes)),
+            inputs=[computers, 'evaluateMode_cfg.py', 'sampling.py',
+                    file_list],
+            outputs=[output], memory=_CMSRUN_EVAL_MEMORY))
+
+    # Compute the transformations for each decay mode
+    transforms = []
+    for mode in modes:
+        transform = os.path.join(trans, 'transform_%s.py' % mode)
+        transforms.append(transform)
+        tasks.append(Task(
+            'computeTransform_' + mode,
+            './computeTransform.py -s %s -b %s -m %s -o %s' % (
+                transform_inputs['signal'], transform_inputs['background'],
+                mode, transform),
+            inputs=[transform_inputs['signal'], transform_inputs['background'],
+                    'computeTransform.py'],
+            outputs=[transform]))
+
+    merged_transform = os.path.join(trans, 'transforms.py')
+    tasks.append(Task(
+        'mergeTransforms', './mergeTransforms.py %s %s' % (
+            merged_transform, " ".join(transforms)),
+        inputs=transforms + ['mergeTransforms.py'],
+        outputs=[merged_transform]))
+
+    # Evaluate the performance
+    eval_outputs = {}
+    for sample, signal, file_list in [
+        ('signal', 1, 'signalfiles.test'),
+        ('background', 0, 'backgroundfiles.test')]:
+        output = os.path.join(eval, 'eval_%s.root' % sample)
+        eval_outputs[sample] = output
+        tasks.append(Task(
+            'evaluate_' + sample,
+            './evaluate_cfg.py inputFiles_load=%s signal=%i db=%s '
+            'transform=%s outputFile=%s' % (
+                file_list, signal, computers, merged_transform, output),
+            inputs=['evaluate_cfg.py', computers, merged_transform, file_list],
+            outputs=[output], memory=_CMSRUN_EVAL_MEMORY))
+
+    eval_pdf = os.path.join(eval, 'eval.pdf')
+    tasks.append(Task(
+        'eval_plots', './make_eval_plots.py --incremental %s %s %s' % (
+            eval_pdf, eval_outputs['signal'], eval_outputs['background']),
+        inputs=['make_eval_plots.py', eval_outputs['signal'],
+                eval_outputs['background']],
+        outputs=[eval_pdf], stage='plot'))
+    return tasks
+
+def _total_memory():
+    ''' Get the total memory of the machine in MB, if we can '''
+    try:
+        meminfo = open('/proc/meminfo', 'r')
+        for line in meminfo:
+            if line.startswith('MemTotal:'):
+                return int(line.split()[1])/1024
+    except IOError:
+        pass
+    return None
+
+if __name__ == "__main__":
+    from RecoLuminosity.LumiDB import argparse
+    import multiprocessing
+
+    parser = argparse.ArgumentParser(
+        description = "Run the TaNC training and evaluation pipeline")
+    parser.add_argument('targets', nargs='*',
+                        help='Task names or output files to produce '
+                        '(default: everything)')
+    parser.add_argument('-d', '--dir', default='hpstancMLPNoTransform',
+                        help='Training directory')
+    parser.add_argument('-j', '--cpus', type=int,
+                        default=multiprocessing.cpu_count(),
+                        help='Maximum number of CPUs to use')
+    parser.add_argument('--memory', type=int, default=_total_memory(),
+                        help='Maximum memory (MB) for concurrent tasks')
+    parser.add_argument('-n', '--dry-run', action='store_true',
+                        help="Only print the tasks that would be run")
+    options = parser.parse_args()
+
+    tasks = build_tasks(options.dir)
+    pipeline = Pipeline(
+        tasks, state_file=os.path.join(options.dir, 'pipeline_state.json'),
+        log_dir=os.path.join(options.dir, 'log'),
+        cpus=options.cpus, memory=options.memory,
+        ledger_file=os.path.join(options.dir, 'ledger.jsonl'),
+        campaign=os.path.basename(os.path.normpath(options.dir)))
+    targets = options.targets or [task.name for task in tasks]
+    if not pipeline.run(targets, dry_run=options.dry_run):
+        sys.exit(1)
+    sys.exit(0)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+'''
+
+sampling
+
+Draw a representative sub-sample of a list of EDM input files, so that quick
+iterations (i.e. of the TaNC transformation) can run on a fraction of the data.
+Two modes are supported:
+
+    file   : every input file contributes the same fraction of its events.
+             All files are still opened and read, but only every Nth event is
+             processed (with a Prescaler at the start of the path).
+    sample : the files are grouped by sample id (the dataset directory) and
+             whole files are drawn evenly from each sample, in proportion to
+             the number of events in the sample.  Files that aren't drawn are
+             not read at all.
+
+The number of events in each file is obtained with edmFileUtil and cached in a
+JSON file, so it only needs to be looked up once.  The sampling plan (events
+available and selected in each sample, and the corresponding weights) is
+written next to the output file, so the results can be reweighted.
+
+Usage: sampling.py eventcounts.json files.list [files.list ...]
+
+Fills the event count cache for the given file lists.
+
+'''
+
+import json
+import math
+import os
+import re
+import subprocess
+import sys
+
+import config_cache
+
+# edmFileUtil prints i.e. (1 runs, 12 lumis, 3402 events, 123456 bytes)
+_EVENT_COUNT_MATCHER = re.compile(r"(?P<events>\d+) events")
+# The directory with the hash CRAB appends to the output dataset name
+_CRAB_HASH_MATCHER = re.compile("^[0-9a-f]{32}$")
+
+def sample_id(file):
+    '''
+    Get the sample a file belongs to from its path, i.e.
+    /store/.../TancTraining_v2_Reskim_v1_WplusJets/<hash>/selected_events_1.root
+    belongs to TancTraining_v2_Reskim_v1_WplusJets.
+    '''
+    directory = os.path.dirname(file)
+    if _CRAB_HASH_MATCHER.match(os.path.basename(directory)):
+        directory = os.path.dirname(directory)
+    return os.path.basename(directory)
+
+def count_events(file):
+    '''
+    Get the number of events in an EDM file using edmFileUtil.  Raises an
+    IOError if it can't be found.
+    '''
+    try:
+        process = subprocess.Popen(['edmFileUtil', file],
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT)
+    except OSError, error:
+        raise IOError("Can't run edmFileUtil on %s: %s" % (file, error))
+    output = process.communicate()[0]
+    match = _EVENT_COUNT_MATCHER.search(output)
+    if process.returncode or not match:
+        raise IOError("Can't get the number of events in %s:\n%s" % (
+            file, output))
+    return int(match.group('events'))
+
+def event_counts(files, cache_file):
+    ''' Get the number of events for each of [files], using [cache_file] '''
+    counts = {}
+    if os.path.exists(cache_file):
+        cache = open(cache_file, 'r')
+        counts = json.load(cache)
+        cache.close()
+    missing = [file for file in files if file not in counts]
+    try:
+        for file in missing:
+            counts[file] = count_events(file)
+    finally:
+        # Keep the counts already found, even if one of the files failed
+        if missing:
+            cache = open(cache_file, 'w')
+            json.dump(counts, cache, indent=2, sort_keys=True)
+            cache.close()
+    return dict((file, counts[file]) for file in files)
+
+def _strata(files):
+    ''' Group the [files] by sample id, keeping their order '''
+    output = {}
+    for file in files:
+        output.setdefault(sample_id(file), []).append(file)
+    return output
+
+def _even_picks(n_items, n_picks):
+    ''' Choose [n_picks] indices spread evenly over range(n_items) '''
+    n_picks = min(n_items, n_picks)
+    return [int((i + 0.5)*n_items/n_picks) for i in range(n_picks)]
+
+def plan(files, counts, quota, mode):
+    '''
+    Build a sampling plan to process about [quota] of the events in [files],
+    given the number of events in each file [counts].  Returns a dictionary
+    with the files to read, the prescale to apply, and the number of events
+    available/selected in each sample.
+    '''
+    if mode not in ['file', 'sample']:
+        raise ValueError("Unknown sampling mode: %s" % mode)
+    total = sum(counts[file] for file in files)
+    strata = _strata(files)
+    output = {
+        'mode' : mode,
+        'quota' : quota,
+        'total_events' : total,
+        'prescale' : 1,
+        'files' : list(files),
+        'samples' : {},
+    }
+    if mode == 'file':
+        if quota > 0 and total > quota:
+            output['prescale'] = int(math.ceil(float(total)/quota))
+        for sample, sample_files in strata.iteritems():
+            sample_total = sum(counts[file] for file in sample_files)
+            output['samples'][sample] = {
+                'total_events' : sample_total,
+                'files' : len(sample_files),
+            }
+    else:
+        output['files'] = []
+        for sample, sample_files in sorted(strata.items()):
+            sample_total = sum(counts[file] for file in sample_files)
+            sample_quota = total and (quota > 0 and
+                                      quota*float(sample_total)/total
+                                      or sample_total) or 0
+            # Take enough files to fill the quota on average
+            mean_events = float(sample_total)/len(sample_files)
+            n_files = mean_events and \
+                    max(1, int(math.ceil(sample_quota/mean_events))) or 0
+            selected = [sample_files[i] for i in
+                        _even_picks(len(sample_files), n_files)]
+            output['files'].extend(selected)
+            output['samples'][sample] = {
+                'total_events' : sample_total,
+                'files' : len(sample_files),
+                'selected_files' : len(selected),
+                'selected_events' : sum(counts[file] for file in selected),
+            }
+    for sample in output['samples'].values():
+        if mode == 'file':
+            sample['selected_events'] = \
+                    sample['total_events']/output['prescale']
+            sample['selected_files'] = sample['files']
+        # The weight to apply to a selected event to recover the full sample
+        sample['weight'] = sample['selected_events'] and \
+                float(sample['total_events'])/sample['selected_events'] or 0
+    output['selected_events'] = sum(
+        sample['selected_events'] for sample in output['samples'].values())
+    return output
+
+def write_plan(sampling_plan, file_name):
+    # The plan is written while the config is assembled, so it has to be
+    # known to the config cache.
+    config_cache.write_file(
+        file_name, json.dumps(sampling_plan, indent=2, sort_keys=True))
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print "Usage: %s eventcounts.json files.list [files.list ...]" % (
+            sys.argv[0])
+        sys.exit(1)
+    files = []
+    for file_list in sys.argv[2:]:
+        input = open(file_list, 'r')
+        files.extend(line.strip() for line in input if line.strip())
+        input.close()
+    counts = event_counts(files, sys.argv[1])
+    for sample, sample_files in sorted(_strata(files).items()):
+        print "%-50s %5i files %10i events" % (
+            sample, len(sample_files),
+            sum(counts[file] for file in sample_files))
@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+'''
+
+separation_metrics
+
+Compute the signal/background separation (Gini index, ROC AUC and
+Kolmogorov-Smirnov distance) of all the MVA input variables of a decay mode at
+once.  The input variable distributions are converted to NumPy arrays of shape
+(n_variables, n_bins) and all the metrics are computed on the whole array,
+without building any intermediate graphs.
+
+Usage: separation_metrics.py train_1prong0pi0_output.root [...]
+
+Prints a table for each TMVA training output file, with the input variables
+ranked by their KS distance.
+
+'''
+
+import fnmatch
+import re
+import sys
+
+import numpy
+
+# Matches the TMVA input variable histogram names, i.e. Pt__Signal_Id
+_VARIABLE_MATCHER = re.compile("(?P<name>[^_]*)__(?P<type>[A-Za-z0-9]*)_Id")
+
+def iter_keys(directory, class_name=None, pattern=None):
+    '''
+    Iterate over the keys in [directory], without reading the objects.  Only
+    keys whose stored class inherits from [class_name] and whose name matches
+    the shell-style [pattern] (i.e. 'Method_*') are returned.
+    '''
+    import ROOT
+    base_class = class_name and ROOT.TClass.GetClass(class_name)
+    inherits = {}
+    for key in directory.GetListOfKeys():
+        if pattern is not None and not fnmatch.fnmatchcase(
+            key.GetName(), pattern):
+            continue
+        if base_class:
+            key_class = key.GetClassName()
+            if key_class not in inherits:
+                inherits[key_class] = bool(
+                    ROOT.TClass.GetClass(key_class).InheritsFrom(base_class))
+            if not inherits[key_class]:
+                continue
+        yield key
+
+def histogram_contents(histo):
+    '''
+    Get the bin contents of a TH1 as an array.  The under/overflow bins are
+    left out, as in the TH1::GetIntegral used by the old gini index.
+    '''
+    return numpy.array(
+        [histo.GetBinContent(ibin) for ibin in range(1, histo.GetNbinsX() + 1)],
+        dtype=numpy.float64)
+
+def stack_histograms(histograms):
+    '''
+    Stack a list of TH1s into an (n_histograms, max_n_bins) array.  Shorter
+    histograms are padded with empty bins after their last bin, which does not
+    change their cumulative distributions.
+    '''
+    contents = [histogram_contents(histo) for histo in histograms]
+    output = numpy.zeros((len(contents), max(len(row) for row in contents)))
+    for irow, row in enumerate(contents):
+        output[irow, :len(row)] = row
+    return output
+
+def _normalize(contents):
+    totals = contents.sum(axis=1)[:, numpy.newaxis]
+    # Don't divide by zero for empty distributions
+    totals[totals == 0] = 1.0
+    return contents/totals
+
+def separation_metrics(signal, background):
+    '''
+    Compute the separation metrics for each row of the [signal] and
+    [background] bin content arrays.  Returns a dictionary of arrays with one
+    entry per row:
+
+        gini : same definition as the one used to label the training control
+               plots, 0.5 minus the area between the signal fraction vs.
+               total sample fraction curve and the diagonal.  0.5 means no
+               separation.
+        auc  : area under the ROC curve, i.e. the probability that a signal
+               entry is in a higher bin than a background entry.
+        ks   : the maximum distance between the signal and background
+               cumulative distributions.
+    '''
+    signal = _normalize(numpy.asarray(signal, dtype=numpy.float64))
+    background = _normalize(numpy.asarray(background, dtype=numpy.float64))
+
+    # Cumulative distributions, starting at zero
+    zeros = numpy.zeros((signal.shape[0], 1))
+    signal_cdf = numpy.hstack([zeros, signal.cumsum(axis=1)])
+    background_cdf = numpy.hstack([zeros, background.cumsum(axis=1)])
+
+    # The Lorenz-like curve used by the control plots.  Compute the area of
+    # the closed polygon (shoelace formula) like TGraph::Integral does.
+    x = (signal_cdf + background_cdf)/2.0
+    y = signal_cdf
+    x_next = numpy.roll(x, -1, axis=1)
+    y_next = numpy.roll(y, -1, axis=1)
+    area = 0.5*numpy.abs(((x + x_next)*(y_next - y)).sum(axis=1))
+    gini = 0.5 - area
+
+    # P(signal > background), with ties counted half
+    background_below = background_cdf[:, :-1]
+    auc = (signal*(background_below + 0.5*background)).sum(axis=1)
+
+    ks = numpy.abs(signal_cdf - background_cdf).max(axis=1)
+
+    return {
+        'gini' : gini,
+        'auc' : auc,
+        'ks' : ks,
+    }
+
+def input_variable_histograms(directory):
+    '''
+    Get the signal & background input variable histograms from a TMVA
+    InputVariables directory, as a dictionary keyed by variable name.
+    '''
+    output = {}
+    for key in iter_keys(directory, "TH1"):
+        match = _VARIABLE_MATCHER.match(key.GetName())
+        if not match:
+            continue
+        output.setdefault(match.group('name'), {})[match.group('type')] = \
+                key.ReadObj()
+    return output
+
+def compute_for_histograms(input_distributions):
+    '''
+    Compute the separation metrics for a dictionary mapping
+    variable -> {'Signal' : TH1, 'Background' : TH1}.
+
+    Returns a list of (variable, {metric : value}) tuples ranked by the KS
+    distance.
+    '''
+    variables = sorted(variable for variable, histograms in
+                       input_distributions.iteritems()
+                       if 'Signal' in histograms and 'Background' in histograms)
+    if not variables:
+        return []
+    metrics = separation_metrics(
+        stack_histograms(
+            [input_distributions[var]['Signal'] for var in variables]),
+        stack_histograms(
+            [input_distributions[var]['Background'] for var in variables]),
+    )
+    output = []
+    for index, variable in enumerate(variables):
+        output.append((variable, dict(
+            (metric, values[index]) for metric, values in metrics.iteritems())))
+    output.sort(key=lambda (variable, metrics): metrics['ks'], reverse=True)
+    return output
+
+def format_table(ranked, title=None):
+    ''' Make a text table from the output of compute_for_histograms '''
+    lines = []
+    if title is not None:
+        lines.append(title)
+    lines.append("%4s %-30s %8s %8s %8s" % ('rank', 'variable', 'KS', 'AUC',
+                                           'gini'))
+    for rank, (variable, metrics) in enumerate(ranked):
+        lines.append("%4i %-30s %8.3f %8.3f %8.3f" % (
+            rank+1, variable, metrics['ks'], metrics['auc'], metrics['gini']))
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    import ROOT
+    ROOT.gROOT.SetBatch(True)
+    for input_file in sys.argv[1:]:
+        file = ROOT.TFile(input_file, "READ")
+        input_var_dir = file.Get("InputVariables_NoTransform")
+        if not input_var_dir:
+            input_var_dir = file.Get("InputVariables_Id")
+        if not input_var_dir:
+            print "WARNING: no input variables found in %s!" % input_file
+            continue
+        print format_table(
+            compute_for_histograms(input_variable_histograms(input_var_dir)),
+            title=input_file)
+        print
+        file.Close()
@@ -28,6 +28,8 @@ filterType ="filterWJets_cfi"
 sampleId = -999
 conditions="ErrorParsingCLI"
 _hltProcess = "HLT"
+# Process which made the jets in the input files
+_recoProcess = "RECO"
 
 if not hasattr(sys, "argv"):
     print "ERROR: Can't extract CLI arguments!"
@@ -43,6 +45,8 @@ else:
     print "Found %i for sample id" % sampleId
     conditions = rawOptions.split(',')[2]
     _hltProcess = rawOptions.split(',')[3]
+    if len(rawOptions.split(',')) > 4:
+        _recoProcess = rawOptions.split(',')[4]
 
 print "Loading filter type"
 
@@ -128,6 +132,34 @@ process.dataQualityFilters = cms.Sequence(
     process.HBHENoiseFilter
 )
 
+#################################################################
+# Prefilter on the existing jets
+#################################################################
+
+# The rereco below copies the whole PF collection and remakes the jets from
+# it, which gives the same jets as in the input file.  So events without any
+# input jet passing the kinematic and lead object selections can't contribute,
+# and are removed before the rereco.
+process.prefilterJets = cms.EDFilter(
+    "JetViewRefSelector",
+    src = cms.InputTag(common.jet_collection.getModuleLabel(), "",
+                       _recoProcess),
+    cut = cms.string("(%s) & (%s)" % (
+        common.kinematic_selection.value(),
+        common.lead_object_jet_selection.value())),
+    filter = cms.bool(True),
+)
+
+# The PF candidates are only kept around the input jets passing the kinematic
+# selection.  These are a superset of the selectedRecoJets below, so all the
+# jets used in the trigger bias removal are rebuilt exactly.
+process.slimmingJets = cms.EDFilter(
+    "JetViewRefSelector",
+    src = process.prefilterJets.src,
+    cut = common.kinematic_selection,
+    filter = cms.bool(False),
+)
+
 #################################################################
 # Rebuild the PF event content.
 #################################################################
@@ -140,16 +172,22 @@ process.load("Configuration.StandardSequences.Geometry_cff")
 process.load('Configuration/StandardSequences/FrontierConditions_GlobalTag_cff')
 process.GlobalTag.globaltag = '%s::All' % conditions
 
-# Make our own PF collection
+# Make our own PF collection.  Only the candidates near the slimmingJets are
+# kept, which is enough to rebuild them.
 process.particleFlow = cms.EDProducer(
     "PFCandidateCollectionCopier",
     src = cms.InputTag("particleFlow"),
     cut = cms.string(''),
+    jets = cms.InputTag("slimmingJets"),
+    maxDeltaR = cms.double(0.8),
     embedTracks = cms.bool(True),
     embedGsfTracks = cms.bool(True),
     embedMuons = cms.bool(True)
 )
 
+# The rho for PU subtraction needs the whole event, so use the original PF
+# collection
+process.kt6PFJets.src = cms.InputTag("particleFlow", "", _recoProcess)
 process.kt6PFJets.doRhoFastjet = True
 process.kt6PFJets.Rho_EtaMax = cms.double( 4.4)
 
@@ -274,7 +312,7 @@ if mc_mode:
 
 # Plot discriminants
 process.plotBackgroundJets = cms.EDAnalyzer(
-    "CandViewHistoAnalyzer",
+    "RecoTauCandViewHistoAnalyzer",
     src = cms.InputTag("backgroundJets"),
     histograms = common.jet_histograms
 )
@@ -289,7 +327,7 @@ process.backgroundJetsLeadObject = cms.EDFilter(
 )
 
 process.plotBackgroundJetsLeadObject = cms.EDAnalyzer(
-    "CandViewHistoAnalyzer",
+    "RecoTauCandViewHistoAnalyzer",
     src = cms.InputTag("backgroundJetsLeadObject"),
     histograms = common.jet_histograms
 )
@@ -319,7 +357,7 @@ process.backgroundJetsRecoTauPiZeros = PiZeroProd.ak5PFJetsRecoTauPiZeros.clone(
 )
 
 process.plotPreselectedBackgroundJets = cms.EDAnalyzer(
-    "CandViewHistoAnalyzer",
+    "RecoTauCandViewHistoAnalyzer",
     src = cms.InputTag("preselectedBackgroundJets"),
     histograms = common.jet_histograms
 )
@@ -394,6 +432,20 @@ configtools.massSearchReplaceAnyInputTag(
 )
 process.buildTaus += process.recoTauHPSTancSequenceBackground
 
+# Store the flight path significance keyed by the jets the taus are built from.
+# The vertices aren't kept in the skim, so when the taus are rebuilt from the
+# same jets in the evaluation, it is read from here instead of recomputed.
+for tauType in ["Background"]:
+    flightPathByJet = cms.EDProducer(
+        "RecoTauJetValueMapFromDiscriminator",
+        jetSrc = cms.InputTag("preselected%sJets" % tauType),
+        discriminator = cms.InputTag(
+            "hpsTancTausDiscriminationByFlightPath" + tauType),
+        defaultValue = cms.double(0.),
+    )
+    setattr(process, "hpsTancTausFlightPathByJet" + tauType, flightPathByJet)
+    process.buildTaus += flightPathByJet
+
 process.qualitySequence = cms.Sequence(
     process.trigger *
     process.dataQualityFilters
@@ -406,6 +458,8 @@ if mc_mode:
 process.selectBackground = cms.Path(
     process.qualitySequence *
     process.selectEnrichedEvents * # <-- defined in filterType.py
+    process.prefilterJets *
+    process.slimmingJets *
     process.rereco *
     process.selectAndMatchJets *
     process.removeBiasedJets *
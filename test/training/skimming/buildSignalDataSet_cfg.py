@@ -10,6 +10,10 @@ Build a reduced dataset containing gen-level infomration and reco::PFJets
 that are matched to "common" hadronic tau decay modes.  Used to build the signal
 training sample for the TaNC.
 
+If the list of events passing the generator level selection made by
+listSignalEvents_cfg.py is given as an optional fourth argument, only these
+events are read.
+
 Author: Evan K. Friis (UC Davis)
 
 '''
@@ -19,6 +23,7 @@ Author: Evan K. Friis (UC Davis)
 sampleId = -999
 sampleName = "ErrorParsingCLI"
 _hltProcess = "HLT"
+eventListFile = None
 
 if not hasattr(sys, "argv"):
     #raise ValueError, "Can't extract CLI arguments!"
@@ -32,6 +37,8 @@ else:
     _hltProcess = args.split(',')[2]
     sampleId = int(args.split(',')[1])
     sampleName = args.split(',')[0]
+    if len(args.split(',')) > 3:
+        eventListFile = args.split(',')[3]
     print "Found %i for sample id" % sampleId
     print "Running on sample: %s" % sampleName
     print "HLT Process: %s" % _hltProcess
@@ -61,6 +68,12 @@ process.TFileService = cms.Service(
     fileName = cms.string("signal_skim_plots_%s.root" % sampleName)
 )
 
+# Skip the events we already know fail the generator level selection
+if eventListFile:
+    import signalGenSelection_cfi as genSelection
+    print "Reading only the %i events in %s" % (
+        genSelection.UseEventList(process, eventListFile), eventListFile)
+
 #################################################################
 # Rebuild the PF event content.
 #################################################################
@@ -103,14 +116,8 @@ process.rereco = cms.Sequence(
 # Load tau truth builders
 process.load("RecoTauTag.TauTagTools.TauTruthProduction_cfi")
 
-process.selectedTrueHadronicTaus = cms.EDFilter(
-    "GenJetSelector",
-    # We only care about hadronic decay modes we will use later
-    src = cms.InputTag("trueCommonHadronicTaus"),
-    cut = cms.string('pt > 5.0 & abs(eta) < 2.5'),
-    # Don't keep events that have no good taus
-    filter = cms.bool(True),
-)
+# The true tau selection, shared with listSignalEvents_cfg.py
+process.load("signalGenSelection_cfi")
 
 # Require a minimum PT cut on our jets
 process.selectedRecoJets = cms.EDFilter(
@@ -152,7 +159,7 @@ process.signalJets = cms.EDProducer(
 
 # Plot signal jets
 process.plotSignalJets = cms.EDAnalyzer(
-    "CandViewHistoAnalyzer",
+    "RecoTauCandViewHistoAnalyzer",
     src = cms.InputTag("signalJets"),
     histograms = common.jet_histograms
 )
@@ -166,7 +173,7 @@ process.signalJetsLeadObject = cms.EDFilter(
 )
 
 process.plotSignalJetsLeadObject = cms.EDAnalyzer(
-    "CandViewHistoAnalyzer",
+    "RecoTauCandViewHistoAnalyzer",
     src = cms.InputTag("signalJetsLeadObject"),
     histograms = common.jet_histograms
 )
@@ -189,7 +196,7 @@ process.preselectedSignalJets = cms.EDProducer(
 )
 
 process.plotPreselectedSignalJets = cms.EDAnalyzer(
-    "CandViewHistoAnalyzer",
+    "RecoTauCandViewHistoAnalyzer",
     src = cms.InputTag("preselectedSignalJets"),
     histograms = common.jet_histograms
 )
@@ -297,14 +304,26 @@ configtools.massSearchReplaceAnyInputTag(
 process.buildTaus += process.recoTauHPSTancSequenceSignal
 process.buildTaus += process.recoTauHPSTancSequenceBackground
 
+# Store the flight path significance keyed by the jets the taus are built from.
+# The vertices aren't kept in the skim, so when the taus are rebuilt from the
+# same jets in the evaluation, it is read from here instead of recomputed.
+for tauType in ["Signal", "Background"]:
+    flightPathByJet = cms.EDProducer(
+        "RecoTauJetValueMapFromDiscriminator",
+        jetSrc = cms.InputTag("preselected%sJets" % tauType),
+        discriminator = cms.InputTag(
+            "hpsTancTausDiscriminationByFlightPath" + tauType),
+        defaultValue = cms.double(0.),
+    )
+    setattr(process, "hpsTancTausFlightPathByJet" + tauType, flightPathByJet)
+    process.buildTaus += flightPathByJet
+
 ################################################################################
 #  Define signal path
 ################################################################################
 
 process.selectSignal = cms.Path(
-    process.tauGenJets *
-    process.trueCommonHadronicTaus *
-    process.selectedTrueHadronicTaus *
+    process.signalGenSelection *
     process.rereco *
     process.selectedRecoJets *
     process.recoJetsTruthMatching *
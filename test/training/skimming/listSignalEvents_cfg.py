@@ -0,0 +1,64 @@
+import FWCore.ParameterSet.Config as cms
+import sys
+
+'''
+
+listSignalEvents_cfg
+
+Cheap first pass of the signal skim.  Apply the generator level selection of
+buildSignalDataSet_cfg.py, reading only the genParticles, and write the
+run:lumi:event IDs of the passing events to signal_events_[sample].txt.
+
+To only read these events in the signal skim, give the list as the fourth
+argument of buildSignalDataSet_cfg.py.  Takes the same arguments as
+buildSignalDataSet_cfg.py.  If it runs in several jobs, concatenate their
+lists into one file.  The list records the selection it was made with, so the
+skim refuses it if the selection changed.
+
+'''
+
+sampleName = "ErrorParsingCLI"
+
+if not hasattr(sys, "argv"):
+    print "ERROR: Can't extract CLI arguments!"
+else:
+    argOffset = 0
+    if sys.argv[0] != 'cmsRun':
+        argOffset = 1
+    args = sys.argv[2 - argOffset]
+    sampleName = args.split(',')[0]
+    print "Running on sample: %s" % sampleName
+
+process = cms.Process("TANCLIST")
+
+process.maxEvents = cms.untracked.PSet( input = cms.untracked.int32(-1) )
+readFiles = cms.untracked.vstring()
+process.source = cms.Source(
+    "PoolSource", fileNames = readFiles,
+    # Only the generator level information is needed
+    inputCommands = cms.untracked.vstring(
+        'drop *',
+        'keep *_genParticles_*_*',
+    ),
+    dropDescendantsOfDroppedBranches = cms.untracked.bool(False),
+)
+
+readFiles.extend([
+    "rfio:/castor/cern.ch/user/f/friis/CMSSW_4_1_x/skims/ZTT_PU/ZTT_PU_10_3_Uws.root",
+])
+
+process.load("signalGenSelection_cfi")
+import signalGenSelection_cfi as genSelection
+
+process.writeEventList = cms.EDAnalyzer(
+    "RecoTauEventListWriter",
+    fileName = cms.string(genSelection.EventListFile(sampleName)),
+    header = genSelection.EventListHeader(),
+)
+
+process.selectSignal = cms.Path(
+    process.signalGenSelection *
+    process.writeEventList
+)
+
+process.options = cms.untracked.PSet( wantSummary = cms.untracked.bool(True) )
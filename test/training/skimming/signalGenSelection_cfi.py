@@ -0,0 +1,89 @@
+import FWCore.ParameterSet.Config as cms
+import hashlib
+import os
+
+'''
+
+signalGenSelection_cfi
+
+Generator level selection of the signal skim, and the event lists used to
+apply it before reading the full events.
+
+The selection only needs the genParticles, so listSignalEvents_cfg.py runs it
+alone and records the passing events in signal_events_[sample].txt.  If this
+list is given to buildSignalDataSet_cfg.py, it only reads these events, so the
+events failing the selection are never reconstructed again.
+
+The list starts with a hash of the selection it was made with, and a list
+made with a different selection is refused.
+
+'''
+
+from RecoTauTag.TauTagTools.TauTruthProduction_cfi import tauGenJets, \
+        trueTausByDecayMode
+
+selectedTrueHadronicTaus = cms.EDFilter(
+    "GenJetSelector",
+    # We only care about hadronic decay modes we will use later
+    src = cms.InputTag("trueTausByDecayMode", "commonHadronic"),
+    cut = cms.string('pt > 5.0 & abs(eta) < 2.5'),
+    # Don't keep events that have no good taus
+    filter = cms.bool(True),
+)
+
+signalGenSelection = cms.Sequence(
+    tauGenJets *
+    trueTausByDecayMode *
+    selectedTrueHadronicTaus
+)
+
+def EventListFile(sampleName):
+    return "signal_events_%s.txt" % sampleName
+
+def SelectionHash():
+    ''' Identify the selection, so a list made with another one is refused '''
+    hash = hashlib.sha1()
+    for module in [tauGenJets, trueTausByDecayMode, selectedTrueHadronicTaus]:
+        hash.update(module.dumpPython())
+    return hash.hexdigest()
+
+def EventListHeader():
+    ''' Header lines of the event list, see RecoTauEventListWriter '''
+    return cms.vstring("selection %s" % SelectionHash())
+
+def ReadEventList(fileName):
+    ''' Get the run:lumi:event list written by RecoTauEventListWriter '''
+    selection = SelectionHash()
+    events = set()
+    nHeaders = 0
+    input = open(fileName, 'r')
+    # The lists of several jobs may have been concatenated
+    for line in input:
+        line = line.strip()
+        if line.startswith('#'):
+            fields = line[1:].split()
+            if len(fields) == 2 and fields[0] == 'selection':
+                if fields[1] != selection:
+                    raise ValueError, "The event list %s was made with a"\
+                            " different generator level selection!" % fileName
+                nHeaders += 1
+        elif line:
+            events.add(line)
+    input.close()
+    if not nHeaders:
+        raise ValueError, "The event list %s doesn't say which selection it"\
+                " was made with!" % fileName
+    return cms.untracked.VEventRange(sorted(events))
+
+def UseEventList(process, fileName):
+    ''' Only read the events in [fileName] '''
+    if not os.path.exists(fileName):
+        raise IOError, "The event list %s doesn't exist!" % fileName
+    events = ReadEventList(fileName)
+    if len(events):
+        process.source.eventsToProcess = events
+    else:
+        # An empty eventsToProcess would read everything
+        process.maxEvents = cms.untracked.PSet(
+            input = cms.untracked.int32(0))
+    return len(events)
@@ -165,20 +165,33 @@ decay_mode_translator = {
     (3, 1) : 'threeProng1Pi0',
 }
 
-# For signal, select true hadronic tau decays that match the desired decay mode
-from RecoTauTag.TauTagTools.TauTruthProduction_cfi import trueHadronicTaus
-process.selectedTrueHadronicTausMatchingDM = trueHadronicTaus.clone(
+# For signal, select true hadronic tau decays that match the desired decay
+# mode.  Only the category of this decay mode is built.
+from RecoTauTag.TauTagTools.TauTruthProduction_cfi import trueTausByDecayMode
+process.selectedTrueHadronicTausByDM = trueTausByDecayMode.clone(
     src = cms.InputTag('selectedTrueHadronicTaus'),
-    select = cms.vstring(decay_mode_translator[_decay_mode]),
-    filter = cms.bool(True)
+    categories = cms.PSet(),
+)
+setattr(process.selectedTrueHadronicTausByDM.categories,
+        decay_mode_translator[_decay_mode],
+        cms.vstring(decay_mode_translator[_decay_mode]))
+process.signalSequence += process.selectedTrueHadronicTausByDM
+
+# Don't process the events without a true tau in this decay mode any further
+process.selectedTrueHadronicTausByDMCount = cms.EDFilter(
+    "CandViewCountFilter",
+    src = cms.InputTag("selectedTrueHadronicTausByDM",
+                       decay_mode_translator[_decay_mode]),
+    minNumber = cms.uint32(1),
 )
-process.signalSequence += process.selectedTrueHadronicTausMatchingDM
+process.signalSequence += process.selectedTrueHadronicTausByDMCount
 
 # Reselect our signal jets, using only those matched to this decay mode
 process.signalJetsDMTruthMatching = cms.EDProducer(
     "GenJetMatcher",
     src = cms.InputTag("preselectedSignalJets"),
-    matched = cms.InputTag("selectedTrueHadronicTausMatchingDM"),
+    matched = cms.InputTag("selectedTrueHadronicTausByDM",
+                           decay_mode_translator[_decay_mode]),
     mcPdgId     = cms.vint32(),                      # n/a
     mcStatus    = cms.vint32(),                      # n/a
     checkCharge = cms.bool(False),
@@ -2,6 +2,10 @@
 
 TaNC MVA trainer
 
+Several decay mode MVAs can be trained in one pass over the input files by
+passing several xml files (xml=1prong0pi0.xml,1prong1pi0.xml).  All the trained
+computers are saved in the same output database.
+
 Author: Evan K. Friis (UC Davis)
 
 '''
@@ -15,23 +19,25 @@ options = VarParsing.VarParsing ('analysis')
 # Register options
 options.register(
     'xml', '',
-    VarParsing.VarParsing.multiplicity.singleton,
+    VarParsing.VarParsing.multiplicity.list,
     VarParsing.VarParsing.varType.string,
-    "XML file with MVA configuration")
+    "XML file(s) with MVA configuration")
 
 options.parseArguments()
 
-# Map the XML file name to a nice computer name
-_computer_name = os.path.basename(os.path.splitext(options.xml)[0])
-print _computer_name
-
 decay_mode_map = {
     '1prong0pi0' : 0,
     '1prong1pi0' : 1,
     '1prong2pi0' : 2,
     '3prong0pi0' : 10,
 }
-_decay_mode = decay_mode_map[_computer_name]
+
+# Map the XML file names to nice computer names
+_computers = []
+for xml in options.xml:
+    computer_name = os.path.basename(os.path.splitext(xml)[0])
+    print computer_name
+    _computers.append((computer_name, xml, decay_mode_map[computer_name]))
 
 process = cms.Process("TrainMVA")
 process.maxEvents = cms.untracked.PSet( input = cms.untracked.int32(-1) )
@@ -64,23 +70,27 @@ process.PoolDBOutputService = cms.Service(
 
 process.MVATrainerSave = cms.EDAnalyzer(
     "TauMVATrainerSave",
-    toPut = cms.vstring(_computer_name),
+    toPut = cms.vstring(),
     toCopy = cms.vstring()
 )
 
-setattr(process.MVATrainerSave, _computer_name,
-        cms.string(_computer_name + ".mva"))
-
+# All the MVAs are trained by the same looper
 process.looper = cms.Looper(
     "TauMVATrainerLooper",
-    trainers = cms.VPSet(cms.PSet(
-        calibrationRecord = cms.string(_computer_name),
+    trainers = cms.VPSet()
+)
+
+for computer_name, xml, decay_mode in _computers:
+    process.MVATrainerSave.toPut.append(computer_name)
+    setattr(process.MVATrainerSave, computer_name,
+            cms.string(computer_name + ".mva"))
+    process.looper.trainers.append(cms.PSet(
+        calibrationRecord = cms.string(computer_name),
         saveState = cms.untracked.bool(True),
-        trainDescription = cms.untracked.string(options.xml),
+        trainDescription = cms.untracked.string(xml),
         loadState = cms.untracked.bool(False),
         doMonitoring = cms.bool(True),
     ))
-)
 
 ###############################################################################
 # Define signal and background paths Each path only gets run if the appropriate
@@ -99,63 +109,68 @@ discriminantConfiguration.FlightPathSignificance.discSrc = cms.VInputTag(
 
 _MIN_PT = 10
 
-process.signalExists = cms.EDFilter(
-    "CandCollectionExistFilter",
-    src = cms.InputTag(
-        "selectedHpsTancTrainTausDecayMode%iSignal" % _decay_mode),
-)
-
-process.selectedSignal = cms.EDFilter(
-    "PFTauViewRefSelector",
-    src = cms.InputTag(
-        "selectedHpsTancTrainTausDecayMode%iSignal" % _decay_mode),
-    cut = cms.string("pt > %f" % _MIN_PT),
-    filter = cms.bool(False)
-)
-
-process.backgroundExists = cms.EDFilter(
-    "CandCollectionExistFilter",
-    src = cms.InputTag(
-        "selectedHpsTancTrainTausDecayMode%iBackground" % _decay_mode),
-)
-process.selectedBackground = cms.EDFilter(
-    "PFTauViewRefSelector",
-    src = cms.InputTag(
-        "selectedHpsTancTrainTausDecayMode%iBackground" % _decay_mode),
-    cut = cms.string("pt > %f" % _MIN_PT),
-    filter = cms.bool(False)
-)
-
-process.signalPath = cms.Path(
-    process.signalExists*
-    process.selectedSignal
-)
-
-process.backgroundPath = cms.Path(
-    process.backgroundExists*
-    process.selectedBackground
-)
-
-process.trainer = cms.EDAnalyzer(
-    "RecoTauMVATrainer",
-    signalSrc = cms.InputTag("selectedSignal"),
-    backgroundSrc = cms.InputTag("selectedBackground"),
-    computerName = cms.string(_computer_name),
-    dbLabel = cms.string("trainer"),
-    backgroundWeightFunction = cms.string("jetRef().pt()"),
-    discriminantOptions = discriminantConfiguration
-)
-
-process.trainPath = cms.Path(
-    process.trainer)
+process.schedule = cms.Schedule()
+
+for computer_name, xml, decay_mode in _computers:
+    # Don't change the module names if we only train one MVA
+    suffix = len(_computers) > 1 and "DecayMode%i" % decay_mode or ""
+
+    signalExists = cms.EDFilter(
+        "CandCollectionExistFilter",
+        src = cms.InputTag(
+            "selectedHpsTancTrainTausDecayMode%iSignal" % decay_mode),
+    )
+    setattr(process, "signalExists" + suffix, signalExists)
+
+    selectedSignal = cms.EDFilter(
+        "PFTauViewRefSelector",
+        src = cms.InputTag(
+            "selectedHpsTancTrainTausDecayMode%iSignal" % decay_mode),
+        cut = cms.string("pt > %f" % _MIN_PT),
+        filter = cms.bool(False)
+    )
+    setattr(process, "selectedSignal" + suffix, selectedSignal)
+
+    backgroundExists = cms.EDFilter(
+        "CandCollectionExistFilter",
+        src = cms.InputTag(
+            "selectedHpsTancTrainTausDecayMode%iBackground" % decay_mode),
+    )
+    setattr(process, "backgroundExists" + suffix, backgroundExists)
+
+    selectedBackground = cms.EDFilter(
+        "PFTauViewRefSelector",
+        src = cms.InputTag(
+            "selectedHpsTancTrainTausDecayMode%iBackground" % decay_mode),
+        cut = cms.string("pt > %f" % _MIN_PT),
+        filter = cms.bool(False)
+    )
+    setattr(process, "selectedBackground" + suffix, selectedBackground)
+
+    signalPath = cms.Path(signalExists*selectedSignal)
+    setattr(process, "signalPath" + suffix, signalPath)
+
+    backgroundPath = cms.Path(backgroundExists*selectedBackground)
+    setattr(process, "backgroundPath" + suffix, backgroundPath)
+
+    trainer = cms.EDAnalyzer(
+        "RecoTauMVATrainer",
+        signalSrc = cms.InputTag("selectedSignal" + suffix),
+        backgroundSrc = cms.InputTag("selectedBackground" + suffix),
+        computerName = cms.string(computer_name),
+        dbLabel = cms.string("trainer"),
+        backgroundWeightFunction = cms.string("jetRef().pt()"),
+        discriminantOptions = discriminantConfiguration
+    )
+    setattr(process, "trainer" + suffix, trainer)
+
+    trainPath = cms.Path(trainer)
+    setattr(process, "trainPath" + suffix, trainPath)
+
+    process.schedule.extend([signalPath, backgroundPath, trainPath])
 
 process.outpath = cms.EndPath(process.MVATrainerSave)
 
-process.schedule = cms.Schedule(
-    process.signalPath,
-    process.backgroundPath,
-    process.trainPath,
-    process.outpath
-)
+process.schedule.append(process.outpath)
 
 process.options = cms.untracked.PSet( wantSummary = cms.untracked.bool(True) )
@@ -17,28 +17,13 @@ ROOT.gROOT.SetBatch(True)
 ROOT.gROOT.SetStyle("Plain")
 ROOT.gStyle.SetPalette(1)
 
+import separation_metrics
+from separation_metrics import iter_keys
 
-def get_by_type(directory, type):
-    for key in directory.GetListOfKeys():
-        object = key.ReadObj()
-        if isinstance(object, type):
-            yield object
-
-def gini_index(signal, background):
-    signal_integral = signal.GetIntegral()
-    background_integral = background.GetIntegral()
-    total = signal.Integral() + background.Integral()
-    linear = ROOT.TGraph(signal.GetNbinsX()+1)
-    signal_fraction = ROOT.TGraph(signal.GetNbinsX()+1)
-    for ibin in range(0, signal.GetNbinsX()+1):
-        total_fraction_of_sample = (
-        signal_integral[ibin] + background_integral[ibin])/2.0
-        linear.SetPoint(
-            ibin, total_fraction_of_sample, total_fraction_of_sample)
-        total_fraction_of_signal = signal_integral[ibin]
-        signal_fraction.SetPoint(
-            ibin, total_fraction_of_sample, total_fraction_of_signal)
-    return 0.5-signal_fraction.Integral()
+def get_by_type(directory, type, pattern=None):
+    ''' Read the objects in [directory] of the given type, as they are used '''
+    for key in iter_keys(directory, type.Class().GetName(), pattern):
+        yield key.ReadObj()
 
 colors = {
     'Signal' : ROOT.EColor.kRed,
@@ -73,8 +58,7 @@ if __name__ == "__main__":
     method_canvas = ROOT.TCanvas("method", "method", 800, 800)
     method_canvas.cd()
     # Find the MVA result directory
-    for method_dir in [dir for dir in get_by_type(file, ROOT.TDirectory)
-                       if 'Method_' in dir.GetName()]:
+    for method_dir in get_by_type(file, ROOT.TDirectory, 'Method_*'):
         method_canvas.SetLogy(False)
         # Strip prefix
         method_type = method_dir.GetName().replace('Method_', '')
@@ -105,7 +89,7 @@ if __name__ == "__main__":
     matcher = re.compile("(?P<name>[^_]*)__(?P<type>[A-Za-z0-9]*)_Id")
 
     input_distributions = {}
-    for histo in get_by_type(input_var_dir, ROOT.TH1F):
+    for histo in get_by_type(input_var_dir, ROOT.TH1F, '*__*_Id'):
         rawname = histo.GetName()
         match = matcher.match(rawname)
         name = match.group('name')
@@ -115,14 +99,19 @@ if __name__ == "__main__":
         histo_info = input_distributions.setdefault(name, {})
         histo_info[type] = histo
 
+    # Compute the separation of all the variables at once
+    ranked_variables = separation_metrics.compute_for_histograms(
+        input_distributions)
+    print separation_metrics.format_table(ranked_variables, title=input_file)
+    separation = dict(ranked_variables)
+
     variable_canvas = ROOT.TCanvas("var", "var", 1000, 1000)
     for variable, histograms in input_distributions.iteritems():
         maximum = max(histograms[type].GetMaximum()
                       for type in ['Signal', 'Background'])
         for type in ['Signal', 'Background']:
             histograms[type].SetLineWidth(2)
-        # Tgraph integral not in ROOT 5.27?
-        gini = gini_index(histograms['Signal'], histograms['Background'])
+        gini = separation[variable]['gini']
         histograms['Signal'].SetMaximum(1.2*maximum)
         histograms['Signal'].SetTitle(variable + " gini: %0.2f" % gini)
         histograms['Signal'].Draw()
@@ -3,6 +3,8 @@
 import FWCore.ParameterSet.Config as cms
 import FWCore.ParameterSet.VarParsing as VarParsing
 import sys
+from RecoTauTag.TauTagTools.MVAPayloadManifest import \
+        DefaultManifest, SourceHashes, CheckUpload
 
 options = VarParsing.VarParsing ('standard')
 
@@ -31,8 +33,27 @@ options.register ('to',
                   VarParsing.VarParsing.varType.string,          # string, int, or float
                   "Database to copy payload to")
 
+options.register ('manifest',
+                  DefaultManifest, # default value
+                  VarParsing.VarParsing.multiplicity.singleton, # singleton or list
+                  VarParsing.VarParsing.varType.string,          # string, int, or float
+                  "Manifest of the payloads already uploaded")
+
+options.register ('force',
+                  0, # default value
+                  VarParsing.VarParsing.multiplicity.singleton, # singleton or list
+                  VarParsing.VarParsing.varType.int,          # string, int, or float
+                  "Upload even if the computers didn't change")
+
 options.parseArguments()
 
+computers = [
+    '1prong0pi0',
+    '1prong1pi0',
+    '1prong2pi0',
+    '3prong0pi0',
+]
+
 print "***************************************************"
 print "******  Upload Tau Conditions to DB          ******"
 print "***************************************************"
@@ -46,9 +67,19 @@ if not options.totag:
     print "You must specify an output tag! [totag]"
     sys.exit(1)
 
+# Check which computers changed since the last upload to this tag
+payloadHashes = SourceHashes(computers, options.source, options.sourcetag)
+upload = CheckUpload(options.manifest, options.to, options.totag,
+                     payloadHashes, options.force)
+if upload:
+    print "* To record the upload, run this through:"
+    print "*   python -m RecoTauTag.TauTagTools.MVAPayloadManifest run"
+
 process = cms.Process("DBupload")
 process.source = cms.Source("EmptySource")
 process.maxEvents = cms.untracked.PSet(input = cms.untracked.int32(1))
+if not upload:
+    process.maxEvents.input = 0
 
 # Setup from database
 process.load("RecoTauTag.TauTagTools.TancConditions_cff")
@@ -58,12 +89,7 @@ process.TauTagMVAComputerRecord.toGet[0].tag = options.sourcetag
 process.saver = cms.EDAnalyzer(
     "TauMVATrainerSave",
     toPut = cms.vstring(),
-    toCopy = cms.vstring(
-        '1prong0pi0',
-        '1prong1pi0',
-        '1prong2pi0',
-        '3prong0pi0',
-    )
+    toCopy = cms.vstring(computers)
 )
 
 # Setup output database
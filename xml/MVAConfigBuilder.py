@@ -5,38 +5,154 @@ MVAConfigBuilder.py
 
 Author: Evan K. Friis, UC Davis friis@physics.ucdavis.edu
 
-Usage: Any objects with file type [name].mvac will be turned into [name].xml with the correct format
+Usage: MVAConfigBuilder.py [-f] [-j jobs]
+
+Any objects with file type [name].mvac will be turned into [name].xml with the correct format,
+and into [name]Iso.xml, a copy with the isolation (Outlier) inputs removed.
 
 A configuration script to automate changes in available MVA input variables (for the PhysicsTools/MVAComputer framework)
 across numerous MVA configurations.
 
-This is total kludge and will be deprecated when 
+Only the input variables and helper processors that each configuration actually uses are included,
+so the unused discriminants are not computed for it.
+
+Only the outputs older than their .mvac file, the fragments or this script are rebuilt, unless -f is given.
+The files are built in parallel.
+
+This is total kludge and will be deprecated when
         a. I figure out how you use <xi:include... success full (xml sucks)
         b. Proposed changes to the MVA objects allow classification steering in a single xml file
 """
 
-import os
 import glob
-import string
-
-filesToConvert = glob.glob("./*.mvac")
+import multiprocessing
+import optparse
+import os
+import re
+import shutil
 
 RemoveNumEventsSpecifiers = True
 
-for aFile in filesToConvert:
-   xmlFileName = string.replace(aFile, "mvac", "xml")
-   if os.path.exists(xmlFileName):
-      os.system("cp %s %s.bak" % (xmlFileName, xmlFileName))
-      os.remove(xmlFileName)
+# Only declare the inputs and helpers used by each configuration
+PruneInputs = True
+
+PreambleFragment = "Preamble.xml.fragment"
+InputsFragment   = "Inputs.xml.fragment"
+HelpersFragment  = "Helpers.xml.fragment"
+FinaleFragment   = "Finale.xml.fragment"
+Fragments = [PreambleFragment, InputsFragment, HelpersFragment, FinaleFragment]
+
+NumEventsSpecifiers = re.compile(r'(NSigTest|NBkgTest|NSigTrain|NBkgTrain)=[0-9]*')
 
-   print "Building %s..." % xmlFileName
-   os.system("cat Preamble.xml.fragment >  %s" %         xmlFileName)  
-   os.system("cat Inputs.xml.fragment   >> %s" %         xmlFileName)  
-   os.system("cat Helpers.xml.fragment  >> %s" %         xmlFileName)  
+def ReadFile(fileName):
+   input = open(fileName, 'r')
+   contents = input.read()
+   input.close()
+   return contents
+
+def PlainBody(mvac):
    if RemoveNumEventsSpecifiers:
-      os.system("cat %s | sed 's|NSigTest=[0-9]*|NSigTest=0|' | sed 's|NBkgTest=[0-9]*|NBkgTest=0|' | sed 's|NSigTrain=[0-9]*|NSigTrain=0|' | sed 's|NBkgTrain=[0-9]*|NBkgTrain=0|' >> %s" % (aFile, xmlFileName)) 
-   else:
-      os.system("cat %s                    >> %s" % (aFile, xmlFileName)) 
-   os.system("cat Finale.xml.fragment   >> %s" %         xmlFileName)  
+      return NumEventsSpecifiers.sub(r'\1=0', mvac)
+   return mvac
+
+def IsoBody(mvac):
+   # Remove the isolation inputs
+   return "".join(line for line in mvac.splitlines(True) if "Outlier" not in line)
+
+VariableSource = re.compile(r'<var\s+source="([^"]*)"\s+name="([^"]*)"')
+InputDeclaration = re.compile(r'<var\s+name="([^"]*)"')
+Processor = re.compile(r'<processor\s+id="([^"]*)".*?</processor>\s*?\n', re.DOTALL)
+
+def SplitProcessors(helpers):
+   ''' Split the helpers into (id, text) blocks, the text includes the comments before each processor '''
+   blocks = []
+   start = 0
+   for match in Processor.finditer(helpers):
+      blocks.append((match.group(1), helpers[start:match.end()]))
+      start = match.end()
+   return blocks, helpers[start:]
+
+def PruneConfig(inputs, helpers, body):
+   ''' Get the (inputs, helpers) fragments with only what [body] uses '''
+   blocks, trailer = SplitProcessors(helpers)
+   processorInputs = dict((id, VariableSource.findall(text)) for id, text in blocks)
+   # Find all the processors needed by the body
+   usedProcessors = set()
+   usedInputs = set()
+   toVisit = VariableSource.findall(body)
+   while toVisit:
+      source, name = toVisit.pop()
+      if source == "input":
+         usedInputs.add(name)
+      elif source in processorInputs and source not in usedProcessors:
+         usedProcessors.add(source)
+         toVisit.extend(processorInputs[source])
+   prunedHelpers = "".join(text for id, text in blocks if id in usedProcessors) + trailer
+   # Keep the helper (__NAME__) variables, which are always provided
+   prunedInputs = "".join(
+      line for line in inputs.splitlines(True)
+      if not InputDeclaration.search(line) or
+      InputDeclaration.search(line).group(1) in usedInputs or
+      InputDeclaration.search(line).group(1).startswith("__"))
+   return prunedInputs, prunedHelpers
+
+def BuildXml(fragments, body):
+   preamble, inputs, helpers, finale = fragments
+   if PruneInputs:
+      inputs, helpers = PruneConfig(inputs, helpers, body)
+   return preamble + inputs + helpers + body + finale
+
+def OutputFiles(mvacFile):
+   stem = os.path.splitext(mvacFile)[0]
+   return [(stem + ".xml", PlainBody), (stem + "Iso.xml", IsoBody)]
+
+def NeedsRebuild(outputFile, sources):
+   if not os.path.exists(outputFile):
+      return True
+   outputTime = os.path.getmtime(outputFile)
+   return max(os.path.getmtime(source) for source in sources) > outputTime
+
+def BuildConfigs(args):
+   ''' Build the outputs of one .mvac file, returns the names of the files built '''
+   mvacFile, fragments, sources, force = args
+   mvac = None
+   built = []
+   for xmlFileName, body in OutputFiles(mvacFile):
+      if not force and not NeedsRebuild(xmlFileName, sources + [mvacFile]):
+         continue
+      if mvac is None:
+         mvac = ReadFile(mvacFile)
+      if os.path.exists(xmlFileName):
+         shutil.copy(xmlFileName, xmlFileName + ".bak")
+      output = open(xmlFileName, 'w')
+      output.write(BuildXml(fragments, body(mvac)))
+      output.close()
+      built.append(xmlFileName)
+   return built
+
+if __name__ == "__main__":
+   parser = optparse.OptionParser(usage="%prog [-f] [-j jobs]")
+   parser.add_option("-f", "--force", action="store_true", default=False,
+                     help="Rebuild all the outputs")
+   parser.add_option("-j", "--jobs", type="int", default=multiprocessing.cpu_count(),
+                     help="Number of files to build in parallel")
+   (options, args) = parser.parse_args()
+
+   fragments = [ReadFile(fragment) for fragment in Fragments]
+   sources = Fragments + [os.path.abspath(__file__)]
+
+   tasks = [(mvacFile, fragments, sources, options.force)
+            for mvacFile in sorted(glob.glob("./*.mvac"))]
 
+   pool = multiprocessing.Pool(max(1, options.jobs))
+   results = pool.map(BuildConfigs, tasks)
+   pool.close()
+   pool.join()
 
+   nBuilt = 0
+   for built in results:
+      for xmlFileName in built:
+         print "Built %s" % xmlFileName
+         nBuilt += 1
+   if not nBuilt:
+      print "All the xml files are up to date"